@@ -2,7 +2,7 @@
 API v1 router combining all endpoints
 """
 from fastapi import APIRouter
-from app.api.v1.endpoints import mood, chat, health
+from app.api.v1.endpoints import mood, chat, health, alerts, admin
 
 api_router = APIRouter()
 
@@ -10,3 +10,5 @@ api_router = APIRouter()
 api_router.include_router(mood.router, prefix="/mood", tags=["mood"])
 api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
 api_router.include_router(health.router, tags=["health"])
+api_router.include_router(alerts.router, prefix="/alerts", tags=["alerts"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
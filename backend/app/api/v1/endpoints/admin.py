@@ -0,0 +1,103 @@
+"""
+Admin-only runtime diagnostics endpoints
+"""
+import asyncio
+import secrets
+import threading
+import time
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from app.config.settings import settings
+from app.core.executor import compute_executor
+from app.core.instrumentation import loop_lag_monitor, sampling_profiler
+from app.core.structured_logging import logging_pipeline
+from app.models.schemas import ErrorResponse
+from app.services.chat_sessions import chat_sessions
+from app.services.quality_service import quality_monitor
+from app.services.scoring_rules import scoring_rules
+
+router = APIRouter()
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Dependency guarding admin endpoints with the ADMIN_TOKEN header"""
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.get(
+    "/runtime",
+    dependencies=[Depends(require_admin)],
+    responses={403: {"model": ErrorResponse, "description": "Invalid admin token"}},
+    summary="Runtime Stats",
+    description="Event loop lag percentiles, logging pipeline, compute pool, data quality, chat session and scoring rule counters"
+)
+async def runtime_stats() -> dict:
+    """Runtime stats endpoint"""
+    return {
+        "timestamp": time.time(),
+        "loop_lag": loop_lag_monitor.stats(),
+        "logging": logging_pipeline.stats(),
+        "profiler_running": sampling_profiler.running,
+        "compute": compute_executor.stats(),
+        "data_quality": quality_monitor.stats(),
+        "chat_sessions": chat_sessions.stats(),
+        "scoring_rules": scoring_rules.stats()
+    }
+
+
+@router.post(
+    "/profile",
+    dependencies=[Depends(require_admin)],
+    response_class=PlainTextResponse,
+    responses={
+        200: {"description": "Collapsed stacks", "content": {"text/plain": {}}},
+        403: {"model": ErrorResponse, "description": "Invalid admin token"},
+        409: {"model": ErrorResponse, "description": "A profile is already running"}
+    },
+    summary="Sample Event Loop Stacks",
+    description="Sample the event loop thread for a number of seconds and return collapsed stacks "
+                "ready for flamegraph.pl or speedscope"
+)
+async def profile(
+    seconds: float = Query(5.0, gt=0, description="Sampling duration in seconds"),
+    interval_ms: float = Query(5.0, ge=1, le=1000, description="Sampling interval in milliseconds")
+) -> PlainTextResponse:
+    """Sampling profiler endpoint"""
+    if seconds > settings.profiler_max_seconds:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Seconds must not exceed {settings.profiler_max_seconds:g}"
+        )
+    loop_thread = threading.get_ident()
+    try:
+        stacks = await asyncio.to_thread(sampling_profiler.profile, loop_thread, seconds, interval_ms / 1000)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(
+        sampling_profiler.render(stacks),
+        headers={"X-Profile-Samples": str(sum(stacks.values()))}
+    )
+
+
+@router.post(
+    "/scoring/reload",
+    dependencies=[Depends(require_admin)],
+    responses={
+        400: {"model": ErrorResponse, "description": "No scoring rules file configured"},
+        403: {"model": ErrorResponse, "description": "Invalid admin token"},
+        422: {"model": ErrorResponse, "description": "Rules file failed to load; previous rules kept"}
+    },
+    summary="Reload Scoring Rules",
+    description="Reload SCORING_RULES_FILE in this process now instead of waiting for the next file check"
+)
+async def reload_scoring_rules() -> dict:
+    """Scoring rules reload endpoint"""
+    if not scoring_rules.path:
+        raise HTTPException(status_code=400, detail="SCORING_RULES_FILE is not set")
+    if not scoring_rules.reload():
+        raise HTTPException(status_code=422, detail=f"Scoring rules not reloaded: {scoring_rules.last_error}")
+    return scoring_rules.stats()
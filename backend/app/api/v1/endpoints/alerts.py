@@ -0,0 +1,103 @@
+"""
+Alert-related API endpoints
+"""
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from app.core.pagination import encode_cursor, decode_cursor
+from app.models.schemas import (
+    AlertListResponse,
+    AlertResponse,
+    AlertPage,
+    ErrorResponse
+)
+from app.services.alert_service import alert_engine, SEVERITIES
+
+router = APIRouter()
+
+
+@router.get(
+    "",
+    response_model=AlertListResponse,
+    responses={
+        200: {"description": "Alerts retrieved successfully"},
+        400: {"model": ErrorResponse, "description": "Invalid parameters"},
+        500: {"model": ErrorResponse, "description": "Internal server error"}
+    },
+    summary="List Alerts",
+    description="List active and recently resolved environmental alerts, newest first, with cursor pagination"
+)
+async def list_alerts(
+    status: str = Query("active", description="active, resolved or all"),
+    severity: Optional[str] = Query(None, description="Filter by severity"),
+    limit: int = Query(50, ge=1, le=500, description="Page size"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page")
+) -> AlertListResponse:
+    """List alerts"""
+    if status not in ("active", "resolved", "all"):
+        raise HTTPException(
+            status_code=400,
+            detail="Status must be one of: active, resolved, all"
+        )
+    if severity is not None and severity not in SEVERITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Severity must be one of: {', '.join(SEVERITIES)}"
+        )
+
+    before = None
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+            before = (float(position["t"]), str(position["id"]))
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    try:
+        alerts, next_position = alert_engine.list_alerts(
+            limit=limit,
+            before=before,
+            status=status,
+            severity=severity
+        )
+        next_cursor = None
+        if next_position:
+            next_cursor = encode_cursor({"t": next_position[0], "id": next_position[1]})
+
+        return AlertListResponse(
+            success=True,
+            data=AlertPage(
+                alerts=alerts,
+                next_cursor=next_cursor,
+                active_count=alert_engine.store.active_count
+            ),
+            message=f"Retrieved {len(alerts)} alerts"
+        )
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error retrieving alerts: {str(e)}"
+        )
+
+
+@router.get(
+    "/{alert_id}",
+    response_model=AlertResponse,
+    responses={
+        200: {"description": "Alert retrieved successfully"},
+        404: {"model": ErrorResponse, "description": "Alert not found"}
+    },
+    summary="Get Alert",
+    description="Retrieve a single alert by ID"
+)
+async def get_alert(alert_id: str) -> AlertResponse:
+    """Get a single alert"""
+    alert = alert_engine.store.get(alert_id)
+    if alert is None:
+        raise HTTPException(status_code=404, detail=f"Alert {alert_id} not found")
+
+    return AlertResponse(
+        success=True,
+        data=alert,
+        message="Alert retrieved successfully"
+    )
@@ -8,6 +8,9 @@ from app.models.schemas import (
     ErrorResponse
 )
 from app.services.ai_service import AIService
+from app.services.chat_context import chat_context
+from app.services.chat_sessions import chat_sessions
+from app.services.data_service import DataService
 
 router = APIRouter()
 
@@ -17,6 +20,11 @@ async def get_ai_service() -> AIService:
     return AIService()
 
 
+async def get_data_service() -> DataService:
+    """Dependency injection for data service"""
+    return DataService()
+
+
 @router.post(
     "/chat",
     response_model=ChatResponseWrapper,
@@ -26,11 +34,12 @@ async def get_ai_service() -> AIService:
         500: {"model": ErrorResponse, "description": "Internal server error"}
     },
     summary="Chat with AI",
-    description="Send a message to the AI assistant for environmental insights"
+    description="Send a message to the AI assistant for environmental insights grounded in current data"
 )
 async def chat_with_ai(
     message: ChatMessage,
-    ai_service: AIService = Depends(get_ai_service)
+    ai_service: AIService = Depends(get_ai_service),
+    data_service: DataService = Depends(get_data_service)
 ) -> ChatResponseWrapper:
     """Chat with AI assistant"""
     try:
@@ -41,8 +50,17 @@ async def chat_with_ai(
                 detail="Message cannot be empty"
             )
         
+        # Normally kept current by the ingest loop; workers refresh on demand
+        await chat_context.ensure_fresh(data_service)
+        
+        # Continue the client's conversation, or start a new one
+        session_id = message.session_id or chat_sessions.new_id()
+        session = await chat_sessions.get(session_id)
+        
         # Generate AI response
-        response = await ai_service.generate_chat_response(message)
+        response = await ai_service.generate_chat_response(message, session)
+        await chat_sessions.record(session_id, session, message.message, response.response)
+        response.session_id = session_id
         
         return ChatResponseWrapper(
             success=True,
@@ -2,9 +2,13 @@
 Health check and monitoring endpoints
 """
 import time
+from datetime import datetime, timezone
 from fastapi import APIRouter, HTTPException
 from app.models.schemas import HealthCheck, ErrorResponse
 from app.config.settings import settings
+from app.services.health_service import health_monitor
+from app.services.quality_service import quality_monitor
+from app.services.resilience import upstream_guards
 
 router = APIRouter()
 
@@ -12,6 +16,33 @@ router = APIRouter()
 startup_time = time.time()
 
 
+def _build_health_check() -> HealthCheck:
+    """Assemble a health response from cached probe results (no I/O)"""
+    results = health_monitor.results()
+    services_status = {name: result.status for name, result in results.items()}
+
+    # Breaker state is already in memory, so report it per upstream
+    for name, guard in upstream_guards.items():
+        services_status[f"upstream_{name}"] = guard.breaker.state
+
+    overall_status = health_monitor.overall_status()
+    if overall_status == "unhealthy":
+        raise HTTPException(
+            status_code=503,
+            detail="One or more services are unhealthy"
+        )
+
+    return HealthCheck(
+        status=overall_status,
+        timestamp=time.time(),
+        version=settings.app_version,
+        uptime=time.time() - startup_time,
+        services=services_status,
+        checked_at=datetime.fromtimestamp(health_monitor.last_run, tz=timezone.utc),
+        checks={name: result.to_dict() for name, result in results.items()}
+    )
+
+
 @router.get(
     "/health",
     response_model=HealthCheck,
@@ -20,40 +51,50 @@ startup_time = time.time()
         503: {"model": ErrorResponse, "description": "Service is unhealthy"}
     },
     summary="Health Check",
-    description="Check the health status of the GaiaPulse API"
+    description="Check the health status of the GaiaPulse API from cached dependency probes"
 )
 async def health_check() -> HealthCheck:
     """Health check endpoint"""
     try:
-        uptime = time.time() - startup_time
-        
-        # Check dependent services (mock for now)
-        services_status = {
-            "database": "healthy",
-            "ai_service": "healthy",
-            "data_service": "healthy",
-            "external_apis": "healthy"
-        }
-        
-        # Determine overall status
-        overall_status = "healthy" if all(
-            status == "healthy" for status in services_status.values()
-        ) else "unhealthy"
-        
-        if overall_status == "unhealthy":
-            raise HTTPException(
-                status_code=503,
-                detail="One or more services are unhealthy"
-            )
-        
-        return HealthCheck(
-            status=overall_status,
-            timestamp=time.time(),
-            version=settings.app_version,
-            uptime=uptime,
-            services=services_status
+        # Probes normally run in the background; only the very first hit
+        # before the monitor has completed a round runs them inline
+        if not health_monitor.has_results:
+            await health_monitor.run_probes()
+
+        return _build_health_check()
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Health check failed: {str(e)}"
         )
-        
+
+
+@router.get(
+    "/health/deep",
+    response_model=HealthCheck,
+    responses={
+        200: {"description": "Service is healthy"},
+        429: {"model": ErrorResponse, "description": "Deep checks are rate limited"},
+        503: {"model": ErrorResponse, "description": "Service is unhealthy"}
+    },
+    summary="Deep Health Check",
+    description="Run every dependency probe now instead of serving cached results (rate limited)"
+)
+async def deep_health_check() -> HealthCheck:
+    """Deep health check endpoint"""
+    retry_after = health_monitor.deep_check_retry_after()
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=429,
+            detail="Deep health checks are rate limited",
+            headers={"Retry-After": str(int(retry_after) + 1)}
+        )
+    try:
+        await health_monitor.deep_check()
+        return _build_health_check()
     except HTTPException:
         raise
     except Exception as e:
@@ -63,6 +104,45 @@ async def health_check() -> HealthCheck:
         )
 
 
+@router.get(
+    "/health/live",
+    summary="Liveness Probe",
+    description="Report whether the process is running and serving requests"
+)
+async def liveness() -> dict:
+    """Liveness endpoint"""
+    return {"status": "alive", "timestamp": time.time()}
+
+
+@router.get(
+    "/health/ready",
+    responses={
+        200: {"description": "Service is ready"},
+        503: {"model": ErrorResponse, "description": "Service is not ready"}
+    },
+    summary="Readiness Probe",
+    description="Report whether critical dependencies are healthy according to the latest probes"
+)
+async def readiness() -> dict:
+    """Readiness endpoint"""
+    if not health_monitor.is_ready():
+        raise HTTPException(
+            status_code=503,
+            detail="Service is not ready"
+        )
+    return {"status": "ready", "timestamp": time.time(), "checked_at": health_monitor.last_run}
+
+
+@router.get(
+    "/health/data_quality",
+    summary="Data Quality",
+    description="Per-source sample counts, quality flag counts and flagged ratio since startup"
+)
+async def data_quality() -> dict:
+    """Data quality metrics endpoint"""
+    return {"timestamp": time.time(), "sources": quality_monitor.stats()}
+
+
 @router.get(
     "/ping",
     summary="Simple Ping",
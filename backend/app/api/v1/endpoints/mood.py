@@ -1,20 +1,36 @@
 """
 Mood-related API endpoints
 """
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Optional
+import json
+import time
+from datetime import datetime, timedelta
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from typing import Any, Dict, Optional, Union
+from app.config.settings import settings
+from app.core.executor import ExecutorBusyError, JobCancelledError
+from app.core.polling import poll_headers
 from app.models.schemas import (
     CurrentMoodResponse, 
     PulseHistoryResponse, 
     ErrorResponse,
     CurrentMood,
+    MoodTimeline,
+    MoodTimelineResponse,
+    MoodScoreRequest,
+    MoodScoreResponse,
     PulseHistory
 )
 from app.services.ai_service import AIService
-from app.services.data_service import DataService
+from app.services.data_service import DataService, HISTORY_STEP
+from app.services.export_service import EXPORT_FORMATS, stream_export
+from app.services.mood_timeline import mood_timeline
 
 router = APIRouter()
 
+# Largest page a single history request may ask for (one year of hourly points)
+MAX_PAGE_SIZE = 365 * 24
+
 
 async def get_ai_service() -> AIService:
     """Dependency injection for AI service"""
@@ -26,38 +42,149 @@ async def get_data_service() -> DataService:
     return DataService()
 
 
+def _mood_response(
+    body: Union[bytes, memoryview],
+    meta: Optional[Dict[str, Any]],
+    patch: Optional[Union[bytes, memoryview]],
+    since_version: Optional[int]
+) -> Response:
+    """Full body, patch or 204 for a client that already holds `since_version`"""
+    if meta is None:
+        return Response(content=body, media_type="application/json")
+    headers = {"X-Mood-Version": str(meta["version"])}
+    if since_version == meta["version"]:
+        return Response(status_code=204, headers={**headers, **poll_headers(meta["next_update"], retry_after=True)})
+    headers.update(poll_headers(meta["next_update"]))
+    if patch is not None and since_version is not None and since_version == meta["base_version"]:
+        return Response(content=patch, media_type="application/json", headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.get(
     "/current_mood",
     response_model=CurrentMoodResponse,
     responses={
-        200: {"description": "Current mood data retrieved successfully"},
+        200: {
+            "description": "Current mood data retrieved successfully, or a CurrentMoodPatchResponse "
+                           "when `since_version` is the previous version"
+        },
+        204: {"description": "The mood has not changed since `since_version`"},
         500: {"model": ErrorResponse, "description": "Internal server error"}
     },
     summary="Get Current Earth Mood",
-    description="Retrieve the current mood status of Earth based on environmental data analysis"
+    description="Retrieve the current mood status of Earth based on environmental data analysis. "
+                "Send the `X-Mood-Version` of the last response as `since_version` to get 204 when nothing "
+                "changed or only the changed fields; `X-Poll-Interval` says when the next update is due."
 )
 async def get_current_mood(
+    since_version: Optional[int] = Query(None, description="X-Mood-Version of the mood the client already has"),
     ai_service: AIService = Depends(get_ai_service),
     data_service: DataService = Depends(get_data_service)
-) -> CurrentMoodResponse:
+) -> Union[CurrentMoodResponse, Response]:
     """Get current Earth mood status"""
+    # Serving workers return the leader's pre-encoded body without re-analysing
+    if data_service.snapshot is not None:
+        body = data_service.snapshot.get("current_mood")
+        if body is not None:
+            meta = data_service.snapshot.get("current_mood_meta")
+            return _mood_response(
+                body,
+                json.loads(bytes(meta)) if meta is not None else None,
+                data_service.snapshot.get("current_mood_patch"),
+                since_version
+            )
+    
+    # Mood is materialized once per ingest tick; requests only read it
+    body = mood_timeline.latest_body
+    if body is not None:
+        return _mood_response(body, mood_timeline.meta, mood_timeline.latest_patch, since_version)
+    
     try:
-        # Get environmental data
+        # Nothing ingested yet (first request before the pipeline's first tick)
         env_data = await data_service.get_current_environmental_data()
-        
-        # Analyze with AI
         mood = await ai_service.analyze_environmental_data(env_data)
+        mood_timeline.record(mood)
+        return _mood_response(mood_timeline.latest_body, mood_timeline.meta, None, since_version)
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error retrieving current mood: {str(e)}"
+        )
+
+
+@router.get(
+    "/timeline",
+    response_model=MoodTimelineResponse,
+    responses={
+        200: {"description": "Mood timeline retrieved successfully"},
+        500: {"model": ErrorResponse, "description": "Internal server error"}
+    },
+    summary="Get Mood Timeline",
+    description="Recent materialized moods, one per ingest tick. Use `changes_only` to list only mood transitions."
+)
+async def get_mood_timeline(
+    limit: int = Query(100, ge=1, le=10000, description="Maximum number of entries, newest kept"),
+    since: Optional[datetime] = Query(None, description="Only entries newer than this timestamp"),
+    changes_only: bool = Query(False, description="Only include entries where the mood changed"),
+    data_service: DataService = Depends(get_data_service)
+) -> MoodTimelineResponse:
+    """Get mood timeline"""
+    try:
+        # Workers mirror the leader's published timeline once per snapshot
+        if data_service.snapshot is not None and data_service.snapshot.seq != mood_timeline.synced_seq:
+            seq = data_service.snapshot.seq
+            blob = data_service.snapshot.get("mood_timeline")
+            if blob is not None:
+                mood_timeline.replace([CurrentMood(**entry) for entry in json.loads(bytes(blob))], seq)
         
-        return CurrentMoodResponse(
+        entries = mood_timeline.entries(limit=limit, since=since, changes_only=changes_only)
+        return MoodTimelineResponse(
             success=True,
-            data=mood,
-            message="Current mood data retrieved successfully"
+            data=MoodTimeline(
+                entries=entries,
+                changes_only=changes_only,
+                capacity=mood_timeline.capacity
+            ),
+            message=f"Retrieved {len(entries)} mood timeline entries"
         )
         
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Error retrieving current mood: {str(e)}"
+            detail=f"Error retrieving mood timeline: {str(e)}"
+        )
+
+
+@router.post(
+    "/score",
+    response_model=MoodScoreResponse,
+    responses={
+        200: {"description": "Snapshots scored successfully"},
+        422: {"description": "Empty batch or more than MOOD_SCORE_BATCH_MAX snapshots"},
+        500: {"model": ErrorResponse, "description": "Internal server error"}
+    },
+    summary="Score Snapshots",
+    description="Score a batch of environmental snapshots with the same rules as the current mood"
+)
+async def score_snapshots(
+    request: MoodScoreRequest,
+    ai_service: AIService = Depends(get_ai_service)
+) -> MoodScoreResponse:
+    """Batch mood scoring"""
+    # MOOD_SCORE_BATCH_MAX is enforced by MoodScoreRequest during validation
+    try:
+        batch = await ai_service.score_snapshots(request.snapshots)
+        return MoodScoreResponse(
+            success=True,
+            data=batch,
+            message=f"Scored {len(batch.scores)} snapshots"
+        )
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error scoring snapshots: {str(e)}"
         )
 
 
@@ -70,12 +197,20 @@ async def get_current_mood(
         500: {"model": ErrorResponse, "description": "Internal server error"}
     },
     summary="Get Pulse History",
-    description="Retrieve historical pulse data for environmental monitoring"
+    description="Retrieve historical pulse data for a number of days or a start/end window. "
+                "Use `since` to poll for new points only, and `limit` with `cursor` to page through large ranges."
 )
 async def get_pulse_history(
+    request: Request,
+    response: Response,
     days: Optional[int] = 7,
+    start: Optional[datetime] = Query(None, description="Start of the time range (ISO 8601)"),
+    end: Optional[datetime] = Query(None, description="End of the time range (ISO 8601), defaults to now"),
+    since: Optional[datetime] = Query(None, description="Only return points newer than this timestamp"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page, used with the same limit"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Maximum points per page"),
     data_service: DataService = Depends(get_data_service)
-) -> PulseHistoryResponse:
+) -> Union[PulseHistoryResponse, Response]:
     """Get historical pulse data"""
     try:
         # Validate days parameter
@@ -85,13 +220,46 @@ async def get_pulse_history(
                 detail="Days parameter must be between 1 and 365"
             )
         
+        # A new hourly point exists after the next step boundary, and is in
+        # the leader's precomputed windows one ingest tick later
+        step = HISTORY_STEP.total_seconds()
+        next_point = (time.time() // step + 1) * step
+        hints = poll_headers(next_point + settings.data_update_interval)
+        
+        # Plain day windows are precomputed by the leader on every ingest tick
+        if data_service.snapshot is not None and start is None and end is None and since is None and cursor is None and limit is None:
+            body = data_service.snapshot.get(f"history:{days or 7}")
+            if body is not None:
+                return Response(content=body, media_type="application/json", headers=hints)
+        
         # Get pulse history
-        history = await data_service.get_pulse_history(days=days or 7)
+        try:
+            history = await data_service.get_pulse_history(
+                days=days or 7,
+                start=start,
+                end=end,
+                since=since,
+                cursor=cursor,
+                limit=limit,
+                is_disconnected=request.is_disconnected
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except ExecutorBusyError as e:
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy generating history, please retry",
+                headers={"Retry-After": str(int(e.retry_after))}
+            )
+        except JobCancelledError:
+            # The client is gone; nothing will read this response
+            raise HTTPException(status_code=499, detail="Client closed request")
         
+        response.headers.update(hints)
         return PulseHistoryResponse(
             success=True,
             data=history,
-            message=f"Pulse history data retrieved successfully for {days} days"
+            message=f"Pulse history data retrieved successfully for {history.period}"
         )
         
     except HTTPException:
@@ -101,3 +269,69 @@ async def get_pulse_history(
             status_code=500,
             detail=f"Error retrieving pulse history: {str(e)}"
         )
+
+
+@router.get(
+    "/pulse_history/export",
+    responses={
+        200: {"description": "Pulse history stream", "content": {"application/x-ndjson": {}, "text/csv": {}}},
+        400: {"model": ErrorResponse, "description": "Invalid parameters"}
+    },
+    summary="Export Pulse History",
+    description="Stream hourly or raw pulse history samples as NDJSON or CSV. "
+                "Memory use is constant regardless of the range, so multi-year exports are supported."
+)
+async def export_pulse_history(
+    request: Request,
+    format: str = Query("ndjson", description="ndjson or csv"),
+    granularity: str = Query("hourly", description="hourly or raw samples"),
+    days: int = Query(7, ge=1, description="Number of days when no start is given"),
+    start: Optional[datetime] = Query(None, description="Start of the time range (ISO 8601)"),
+    end: Optional[datetime] = Query(None, description="End of the time range (ISO 8601), defaults to now"),
+    data_service: DataService = Depends(get_data_service)
+) -> StreamingResponse:
+    """Stream pulse history export"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Format must be one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    if granularity not in ("hourly", "raw"):
+        raise HTTPException(
+            status_code=400,
+            detail="Granularity must be one of: hourly, raw"
+        )
+    max_span = timedelta(days=settings.export_max_days)
+    if start is None and days > settings.export_max_days:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Days parameter must not exceed {settings.export_max_days}"
+        )
+    
+    step = HISTORY_STEP if granularity == "hourly" else timedelta(seconds=settings.raw_sample_interval)
+    try:
+        first, last, period = data_service.resolve_history_window(
+            days=days,
+            start=start,
+            end=end,
+            step=step,
+            max_span=max_span
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    samples = data_service.iter_pulse_samples(first, last, step=step)
+    filename = f"pulse_history_{first:%Y%m%dT%H%M}_{last:%Y%m%dT%H%M}_{granularity}.{format}"
+    return StreamingResponse(
+        stream_export(
+            samples,
+            format,
+            chunk_size=settings.export_chunk_size,
+            is_disconnected=request.is_disconnected
+        ),
+        media_type=EXPORT_FORMATS[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Export-Period": period
+        }
+    )
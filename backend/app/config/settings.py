@@ -18,6 +18,13 @@ class Settings:
         self.host = os.getenv("HOST", "0.0.0.0")
         self.port = int(os.getenv("PORT", "8787"))
         
+        # Serving ("standalone" does everything in-process, "worker" serves the
+        # leader's shared snapshot, see serve.py)
+        self.serving_role = os.getenv("SERVING_ROLE", "standalone")
+        self.snapshot_shm_name = os.getenv("SNAPSHOT_SHM_NAME")
+        self.snapshot_slot_size = int(os.getenv("SNAPSHOT_SLOT_SIZE", str(16 * 1024 * 1024)))
+        self.snapshot_history_tiers = [int(days) for days in os.getenv("SNAPSHOT_HISTORY_TIERS", "7,30,365").split(",") if days]
+        
         # Database
         self.database_url = os.getenv("DATABASE_URL")
         
@@ -30,22 +37,123 @@ class Settings:
         self.nasa_api_key = os.getenv("NASA_API_KEY")
         self.weather_api_key = os.getenv("WEATHER_API_KEY")
         self.air_quality_api_key = os.getenv("AIR_QUALITY_API_KEY")
+        # Base URLs are overridable to point at a local upstream simulator
+        self.nasa_api_url = os.getenv("NASA_API_URL", "https://api.nasa.gov").rstrip("/")
+        self.weather_api_url = os.getenv("WEATHER_API_URL", "https://api.openweathermap.org").rstrip("/")
+        self.air_quality_api_url = os.getenv("AIR_QUALITY_API_URL", "https://api.openweathermap.org").rstrip("/")
+        self.upstream_location = os.getenv("UPSTREAM_LOCATION", "0,0")
         
         # Real-time Data
         self.redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
+        self.redis_configured = "REDIS_URL" in os.environ
         self.websocket_enabled = os.getenv("WEBSOCKET_ENABLED", "true").lower() == "true"
         
         # Monitoring & Logging
         self.log_level = os.getenv("LOG_LEVEL", "INFO")
+        self.log_format = os.getenv("LOG_FORMAT", "json")
+        self.log_queue_size = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+        self.log_access = os.getenv("LOG_ACCESS", "true").lower() == "true"
+        # Fraction of requests whose INFO lines are kept, per route path
+        self.log_sample_rates = os.getenv("LOG_SAMPLE_RATES", "/api/v1/health=0.01,/api/v1/ping=0.01,/api/v1/mood/pulse_history=0.1")
+        # INFO lines per second allowed for each distinct log message
+        self.log_rate_limit = float(os.getenv("LOG_RATE_LIMIT", "20"))
         self.sentry_dsn = os.getenv("SENTRY_DSN")
+        self.health_check_interval = float(os.getenv("HEALTH_CHECK_INTERVAL", "15"))
+        self.health_probe_timeout = float(os.getenv("HEALTH_PROBE_TIMEOUT", "2"))
+        self.health_deep_min_interval = float(os.getenv("HEALTH_DEEP_MIN_INTERVAL", "10"))
+        self.startup_profile = os.getenv("STARTUP_PROFILE", "false").lower() == "true"
+        self.startup_profile_top = int(os.getenv("STARTUP_PROFILE_TOP", "15"))
+        self.startup_budget_ms = float(os.getenv("STARTUP_BUDGET_MS", "1500"))
+        self.loop_lag_interval = float(os.getenv("LOOP_LAG_INTERVAL", "0.1"))
+        self.loop_lag_warn_ms = float(os.getenv("LOOP_LAG_WARN_MS", "100"))
+        self.slow_request_ms = float(os.getenv("SLOW_REQUEST_MS", "500"))
+        self.profiler_max_seconds = float(os.getenv("PROFILER_MAX_SECONDS", "30"))
         
         # Security
         self.secret_key = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
+        # Admin endpoints are disabled unless a token is configured
+        self.admin_token = os.getenv("ADMIN_TOKEN")
         self.cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:5173,http://localhost:5174,http://localhost:3000").split(",")
         
+        # Rate limiting (token buckets per IP / API key)
+        self.rate_limit_enabled = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+        self.rate_limit_backend = os.getenv("RATE_LIMIT_BACKEND", "memory")
+        self.rate_limit_capacity = float(os.getenv("RATE_LIMIT_CAPACITY", "60"))
+        self.rate_limit_refill_rate = float(os.getenv("RATE_LIMIT_REFILL_RATE", "1"))
+        self.rate_limit_trust_proxy = os.getenv("RATE_LIMIT_TRUST_PROXY", "false").lower() == "true"
+        self.rate_limit_max_clients = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "100000"))
+        # Only these X-Api-Key values get their own bucket; other requests are keyed by IP
+        self.rate_limit_api_keys = [key.strip() for key in os.getenv("RATE_LIMIT_API_KEYS", "").split(",") if key.strip()]
+        
         # Data Sources
         self.enable_mock_data = os.getenv("ENABLE_MOCK_DATA", "true").lower() == "true"
         self.data_update_interval = int(os.getenv("DATA_UPDATE_INTERVAL", "30"))
+        self.raw_sample_interval = int(os.getenv("RAW_SAMPLE_INTERVAL", "600"))
+        # Moods kept in the timeline (24 hours at the default update interval)
+        self.mood_timeline_size = int(os.getenv("MOOD_TIMELINE_SIZE", "2880"))
+        
+        # CPU-bound work ("thread" or "process" pool, or "inline" on the event loop)
+        self.compute_executor = os.getenv("COMPUTE_EXECUTOR", "thread")
+        self.compute_workers = int(os.getenv("COMPUTE_WORKERS", "2"))
+        self.compute_queue_size = int(os.getenv("COMPUTE_QUEUE_SIZE", "8"))
+        # Jobs up to this many points (30 days of hourly history) run inline
+        self.compute_inline_max_points = int(os.getenv("COMPUTE_INLINE_MAX_POINTS", "720"))
+        
+        # History storage ("synthetic" generates history, "store" serves ingested data)
+        self.history_backend = os.getenv("HISTORY_BACKEND", "synthetic")
+        self.history_metric = os.getenv("HISTORY_METRIC", "temperature")
+        self.history_db_path = os.getenv("HISTORY_DB_PATH", "gaiapulse_history.db")
+        
+        # Data quality validation
+        self.quality_window = int(os.getenv("QUALITY_WINDOW", "48"))
+        self.quality_z_threshold = float(os.getenv("QUALITY_Z_THRESHOLD", "4"))
+        self.quality_gap_factor = float(os.getenv("QUALITY_GAP_FACTOR", "2.5"))
+        
+        # History export
+        self.export_max_days = int(os.getenv("EXPORT_MAX_DAYS", "10950"))
+        self.export_chunk_size = int(os.getenv("EXPORT_CHUNK_SIZE", "65536"))
+        
+        # Client polling hints
+        self.poll_min_interval = int(os.getenv("POLL_MIN_INTERVAL", "5"))
+        self.poll_max_interval = int(os.getenv("POLL_MAX_INTERVAL", "600"))
+        self.poll_grace = float(os.getenv("POLL_GRACE", "2"))
+        
+        # Mood scoring
+        self.scoring_rules_file = os.getenv("SCORING_RULES_FILE")
+        self.scoring_rules_check_interval = float(os.getenv("SCORING_RULES_CHECK_INTERVAL", "5"))
+        self.mood_score_batch_max = int(os.getenv("MOOD_SCORE_BATCH_MAX", "10000"))
+        
+        # Chat retrieval
+        self.chat_corpus_file = os.getenv("CHAT_CORPUS_FILE")
+        self.chat_top_k = int(os.getenv("CHAT_TOP_K", "3"))
+        
+        # Chat sessions
+        self.chat_session_max_bytes = int(os.getenv("CHAT_SESSION_MAX_BYTES", str(64 * 1024 * 1024)))
+        self.chat_session_ttl = int(os.getenv("CHAT_SESSION_TTL", "1800"))
+        self.chat_session_max_turns = int(os.getenv("CHAT_SESSION_MAX_TURNS", "16"))
+        self.chat_session_token_budget = int(os.getenv("CHAT_SESSION_TOKEN_BUDGET", "1024"))
+        self.chat_session_summary_tokens = int(os.getenv("CHAT_SESSION_SUMMARY_TOKENS", "128"))
+        # Write every session through to Redis so any worker can continue it
+        self.chat_session_spill = os.getenv("CHAT_SESSION_SPILL", "false").lower() == "true"
+        # Set when a proxy pins each client to one worker; otherwise serve.py
+        # needs the Redis tier above to run more than one worker
+        self.chat_session_sticky = os.getenv("CHAT_SESSION_STICKY", "false").lower() == "true"
+        
+        # Alerting
+        self.alert_rules_file = os.getenv("ALERT_RULES_FILE")
+        self.alert_history_size = int(os.getenv("ALERT_HISTORY_SIZE", "1000"))
+        self.alert_rate_min_interval = int(os.getenv("ALERT_RATE_MIN_INTERVAL", "300"))
+        
+        # Upstream resilience
+        self.upstream_timeout = float(os.getenv("UPSTREAM_TIMEOUT", "10"))
+        self.upstream_timeout_min = float(os.getenv("UPSTREAM_TIMEOUT_MIN", "0.5"))
+        self.upstream_timeout_max = float(os.getenv("UPSTREAM_TIMEOUT_MAX", "15"))
+        self.upstream_max_retries = int(os.getenv("UPSTREAM_MAX_RETRIES", "2"))
+        self.upstream_backoff_base = float(os.getenv("UPSTREAM_BACKOFF_BASE", "0.2"))
+        self.retry_budget_ratio = float(os.getenv("RETRY_BUDGET_RATIO", "0.2"))
+        self.breaker_failure_threshold = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+        self.breaker_reset_timeout = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+        self.last_good_max_age = float(os.getenv("LAST_GOOD_MAX_AGE", "3600"))
 
 
 # Global settings instance
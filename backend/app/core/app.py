@@ -2,28 +2,52 @@
 Main FastAPI application configuration
 """
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 import time
+import uuid
 
 from app.config.settings import settings
 from app.api.v1.api import api_router
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.executor import compute_executor
+from app.core.instrumentation import loop_lag_monitor, request_spans_var, summarize_spans
+from app.core.startup import startup_profiler
+from app.core.structured_logging import logging_pipeline, request_id_var, request_path_var
+from app.services.health_service import health_monitor
+from app.services.ingestion import ingestion_pipeline
 
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, settings.log_level),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
+access_logger = logging.getLogger("gaiapulse.access")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background tasks with the application"""
+    logging_pipeline.start()
+    await health_monitor.start()
+    await loop_lag_monitor.start()
+    # Serving workers read the leader's snapshot instead of ingesting
+    if settings.serving_role != "worker":
+        await ingestion_pipeline.start()
+    startup_profiler.ready()
+    yield
+    await ingestion_pipeline.stop()
+    await loop_lag_monitor.stop()
+    await health_monitor.stop()
+    compute_executor.shutdown()
+    logging_pipeline.stop()
 
 
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application"""
     
     app = FastAPI(
+        lifespan=lifespan,
         title=settings.app_name,
         version=settings.app_version,
         description="Environmental monitoring and AI-powered insights API",
@@ -32,6 +56,10 @@ def create_app() -> FastAPI:
         openapi_url="/openapi.json"
     )
     
+    # Add rate limiting before CORS so 429 responses still carry CORS headers
+    if settings.rate_limit_enabled:
+        app.add_middleware(RateLimitMiddleware)
+    
     # Add CORS middleware
     app.add_middleware(
         CORSMiddleware,
@@ -39,15 +67,58 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # Browser clients read the poll hints and mood version from these
+        expose_headers=["Retry-After", "X-Poll-Interval", "X-Mood-Version"],
     )
     
-    # Add request timing middleware
+    # Add request timing, request ID and access log middleware
     @app.middleware("http")
     async def add_process_time_header(request: Request, call_next):
         start_time = time.time()
+        cpu_start = time.thread_time()
+        request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+        request_id_var.set(request_id)
+        request_path_var.set(request.url.path)
+        spans = {}
+        request_spans_var.set(spans)
         response = await call_next(request)
         process_time = time.time() - start_time
+        # Thread time on the loop thread; includes concurrently interleaved requests
+        cpu_time = time.thread_time() - cpu_start
         response.headers["X-Process-Time"] = str(process_time)
+        response.headers["X-Request-ID"] = request_id
+        route = getattr(request.scope.get("route"), "path", None)
+        if settings.log_access:
+            access_logger.info(
+                "%s %s %d %.1fms",
+                request.method,
+                request.url.path,
+                response.status_code,
+                process_time * 1000,
+                extra={
+                    "method": request.method,
+                    "path": request.url.path,
+                    "route": route,
+                    "status": response.status_code,
+                    "duration_ms": round(process_time * 1000, 2),
+                    "cpu_ms": round(cpu_time * 1000, 2)
+                }
+            )
+        if process_time * 1000 >= settings.slow_request_ms:
+            summary = summarize_spans(spans)
+            logger.warning(
+                "Slow request %s %s took %.0fms (dominated by %s)",
+                request.method,
+                request.url.path,
+                process_time * 1000,
+                summary[0]["name"] if summary else "untraced code",
+                extra={
+                    "route": route,
+                    "duration_ms": round(process_time * 1000, 2),
+                    "cpu_ms": round(cpu_time * 1000, 2),
+                    "spans": summary
+                }
+            )
         return response
     
     # Add error handling middleware
@@ -60,7 +131,8 @@ def create_app() -> FastAPI:
                 "error": exc.detail,
                 "code": f"HTTP_{exc.status_code}",
                 "details": {"path": request.url.path}
-            }
+            },
+            headers=getattr(exc, "headers", None)
         )
     
     @app.exception_handler(RequestValidationError)
@@ -80,7 +152,7 @@ def create_app() -> FastAPI:
     
     @app.exception_handler(Exception)
     async def general_exception_handler(request: Request, exc: Exception):
-        logger.error(f"Unhandled exception: {exc}", exc_info=True)
+        logger.error("Unhandled exception: %s", exc, exc_info=True, extra={"path": request.url.path})
         return JSONResponse(
             status_code=500,
             content={
@@ -0,0 +1,142 @@
+"""
+Execution layer for CPU-bound service work
+"""
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_MODES = ("thread", "process", "inline")
+
+
+class ExecutorBusyError(Exception):
+    """Raised when the compute queue is full"""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Compute pool is saturated")
+        self.retry_after = retry_after
+
+
+class JobCancelledError(Exception):
+    """Raised when a job is abandoned because its client disconnected"""
+
+
+class ComputeExecutor:
+    """Runs small jobs inline and large ones on a bounded thread or process pool.
+
+    Jobs that accept a `cancel` keyword receive a threading.Event that is set
+    when the client disconnects (inline and thread modes). Queued jobs are
+    cancelled in every mode; a running process job completes and its result
+    is discarded.
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        workers: int = 2,
+        queue_size: int = 8,
+        inline_max_cost: float = 720,
+        disconnect_poll_interval: float = 0.1
+    ):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Executor mode must be one of: {', '.join(EXECUTOR_MODES)}")
+        self.mode = mode
+        self.workers = workers
+        self.queue_size = queue_size
+        self.inline_max_cost = inline_max_cost
+        self.disconnect_poll_interval = disconnect_poll_interval
+        self._pool: Optional[Executor] = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.cancelled = 0
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.mode == "process":
+                # Spawned workers avoid forking a process with a running event loop
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="compute")
+        return self._pool
+
+    def should_offload(self, cost: float) -> bool:
+        """Policy: only jobs above the inline cost threshold leave the event loop"""
+        return self.mode != "inline" and cost > self.inline_max_cost
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        cost: float = 0,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+        cancellable: bool = False
+    ) -> Any:
+        """Run `fn(*args)` according to the offload policy"""
+        cancel = threading.Event() if cancellable and self.mode != "process" else None
+        kwargs: Dict[str, Any] = {"cancel": cancel} if cancellable else {}
+
+        if not self.should_offload(cost):
+            return fn(*args, **kwargs)
+
+        # Bounded admission: running jobs plus a short queue, then shed load
+        if self.pending >= self.workers + self.queue_size:
+            self.rejected += 1
+            raise ExecutorBusyError(retry_after=1.0)
+
+        self.pending += 1
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._get_pool(), _call, fn, args, kwargs)
+        try:
+            while True:
+                done, _ = await asyncio.wait({future}, timeout=self.disconnect_poll_interval if is_disconnected else None)
+                if done:
+                    self.completed += 1
+                    return future.result()
+                if await is_disconnected():
+                    self.cancelled += 1
+                    if cancel is not None:
+                        cancel.set()
+                    future.cancel()
+                    raise JobCancelledError("Client disconnected")
+        except asyncio.CancelledError:
+            if cancel is not None:
+                cancel.set()
+            future.cancel()
+            raise
+        finally:
+            self.pending -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "cancelled": self.cancelled
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def _call(fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> Any:
+    return fn(*args, **kwargs)
+
+
+# Global compute executor instance
+compute_executor = ComputeExecutor(
+    mode=settings.compute_executor,
+    workers=settings.compute_workers,
+    queue_size=settings.compute_queue_size,
+    inline_max_cost=settings.compute_inline_max_points
+)
@@ -0,0 +1,175 @@
+"""
+Runtime instrumentation: event loop lag, per-request CPU time, service spans
+and an on-demand sampling profiler
+"""
+import asyncio
+import functools
+import logging
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, List, Optional, TypeVar
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Per-request span totals {name: [calls, wall_s, cpu_s]}, installed by the
+# request middleware so traced service calls can report into it
+request_spans_var: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("request_spans", default=None)
+
+
+def _record_span(name: str, wall: float, cpu: float) -> None:
+    spans = request_spans_var.get()
+    if spans is None:
+        return
+    totals = spans.get(name)
+    if totals is None:
+        spans[name] = [1, wall, cpu]
+    else:
+        totals[0] += 1
+        totals[1] += wall
+        totals[2] += cpu
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Record wall and CPU time of a service function against the current request.
+
+    CPU time is thread time on the event loop thread, so for async functions it
+    also includes other tasks that ran while this one was suspended; a
+    function that blocks the loop still shows up as the clear maximum.
+    """
+    def decorator(func: F) -> F:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                wall_start, cpu_start = time.perf_counter(), time.thread_time()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    _record_span(name, time.perf_counter() - wall_start, time.thread_time() - cpu_start)
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            wall_start, cpu_start = time.perf_counter(), time.thread_time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record_span(name, time.perf_counter() - wall_start, time.thread_time() - cpu_start)
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+def summarize_spans(spans: Dict[str, List[float]]) -> List[Dict[str, Any]]:
+    """Spans sorted by wall time, largest first"""
+    return [
+        {"name": name, "calls": int(calls), "wall_ms": round(wall * 1000, 2), "cpu_ms": round(cpu * 1000, 2)}
+        for name, (calls, wall, cpu) in sorted(spans.items(), key=lambda item: item[1][1], reverse=True)
+    ]
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a periodic timer"""
+
+    def __init__(self, interval: float = 0.1, window: int = 600, warn_ms: float = 100.0):
+        self.interval = interval
+        self.warn_ms = warn_ms
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.max_lag_ms = 0.0
+        self.last_lag_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (loop.time() - expected) * 1000)
+            self.last_lag_ms = lag_ms
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+            self._samples.append(lag_ms)
+            if lag_ms >= self.warn_ms:
+                logger.warning("Event loop blocked for %.0f ms", lag_ms, extra={"loop_lag_ms": round(lag_ms, 1)})
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, float]:
+        samples = sorted(self._samples)
+        if not samples:
+            return {"last_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0, "samples": 0}
+        return {
+            "last_ms": round(self.last_lag_ms, 2),
+            "p50_ms": round(samples[len(samples) // 2], 2),
+            "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 2),
+            "max_ms": round(self.max_lag_ms, 2),
+            "samples": len(samples)
+        }
+
+
+class SamplingProfiler:
+    """Samples one thread's Python stack from a background thread.
+
+    Output is in collapsed-stack format (`frame;frame;frame count`), which
+    flamegraph.pl and speedscope read directly. Sampling from another thread
+    means a blocked event loop is captured rather than hidden.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def profile(self, thread_id: int, seconds: float, interval: float) -> Counter:
+        """Sample `thread_id` every `interval` seconds for `seconds` (blocking)"""
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+        try:
+            stacks: Counter = Counter()
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                frame = sys._current_frames().get(thread_id)
+                if frame is not None:
+                    stacks[self._collapse(frame)] += 1
+                time.sleep(interval)
+            return stacks
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}:{frame.f_lineno}")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    @staticmethod
+    def render(stacks: Counter) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+# Global instrumentation instances
+loop_lag_monitor = LoopLagMonitor(
+    interval=settings.loop_lag_interval,
+    warn_ms=settings.loop_lag_warn_ms
+)
+sampling_profiler = SamplingProfiler()
@@ -0,0 +1,45 @@
+"""
+Opaque cursor helpers for paginated endpoints
+"""
+import base64
+import hashlib
+import hmac
+import json
+from typing import Any, Dict
+
+from app.config.settings import settings
+
+# Truncated HMAC-SHA256 tag; enough to stop clients forging positions
+_SIGNATURE_BYTES = 16
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode((text + "=" * (-len(text) % 4)).encode())
+
+
+def _sign(raw: bytes) -> bytes:
+    return hmac.new(settings.secret_key.encode(), raw, hashlib.sha256).digest()[:_SIGNATURE_BYTES]
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """Encode a pagination position as an opaque, signed URL-safe cursor"""
+    raw = json.dumps(position, separators=(",", ":"), sort_keys=True).encode()
+    return _b64encode(raw) + "." + _b64encode(_sign(raw))
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a cursor produced by encode_cursor, raising ValueError if malformed or forged"""
+    try:
+        payload, _, signature = cursor.partition(".")
+        raw = _b64decode(payload)
+        valid = hmac.compare_digest(_b64decode(signature), _sign(raw))
+        position = json.loads(raw) if valid else None
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(position, dict):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return position
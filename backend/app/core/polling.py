@@ -0,0 +1,38 @@
+"""
+Poll interval hints for endpoints that clients refresh on a timer
+"""
+import math
+import time
+from datetime import datetime, timezone
+from typing import Dict, Union
+
+from app.config.settings import settings
+
+POLL_INTERVAL_HEADER = "X-Poll-Interval"
+
+
+def _epoch(timestamp: Union[datetime, float]) -> float:
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return timestamp.timestamp()
+    return float(timestamp)
+
+
+def poll_interval(next_update: Union[datetime, float]) -> int:
+    """Seconds a client should wait before polling again for data due at `next_update`.
+
+    The grace period lets the update land first. Once `next_update` has
+    passed (a late ingest), clients fall back to the minimum interval.
+    """
+    remaining = _epoch(next_update) - time.time() + settings.poll_grace
+    return int(min(settings.poll_max_interval, max(settings.poll_min_interval, math.ceil(remaining))))
+
+
+def poll_headers(next_update: Union[datetime, float], retry_after: bool = False) -> Dict[str, str]:
+    """Poll hint headers; `Retry-After` is added for "nothing new yet" responses"""
+    seconds = str(poll_interval(next_update))
+    headers = {POLL_INTERVAL_HEADER: seconds}
+    if retry_after:
+        headers["Retry-After"] = seconds
+    return headers
@@ -0,0 +1,240 @@
+"""
+Per-client token bucket rate limiting with per-route cost weights
+"""
+import json
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+QueryParams = Dict[str, List[str]]
+RouteCost = Union[float, Callable[[QueryParams], float]]
+
+
+def _int_param(params: QueryParams, name: str, default: int) -> int:
+    try:
+        return int(params[name][0])
+    except (KeyError, IndexError, ValueError):
+        return default
+
+
+def _utc(timestamp: datetime) -> datetime:
+    """Aware UTC datetime; naive values are UTC as everywhere in the service"""
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc)
+
+
+def _window_days(params: QueryParams) -> Optional[float]:
+    """Days covered by the days/start/end parameters, None when they do not parse"""
+    if "start" not in params:
+        return float(_int_param(params, "days", 7))
+    try:
+        start = _utc(datetime.fromisoformat(params["start"][0]))
+        end = _utc(datetime.fromisoformat(params["end"][0])) if "end" in params else datetime.now(timezone.utc)
+    except (ValueError, TypeError):
+        return None
+    return (end - start).total_seconds() / 86400
+
+
+def _history_cost(params: QueryParams) -> float:
+    """Pulse history cost grows with the number of points requested (one token per week)"""
+    if "limit" in params:
+        return max(1.0, _int_param(params, "limit", 168) / 168)
+    # `since` only trims the window and a cursor always comes with a limit,
+    # so neither makes a request cheaper than its window
+    days = _window_days(params)
+    return 1.0 if days is None else max(1.0, days / 7)
+
+
+def _export_cost(params: QueryParams) -> float:
+    """Export cost grows with the rows streamed: one token per 168, as for history"""
+    days = _window_days(params)
+    if days is None:
+        return 1.0
+    granularity = params.get("granularity", ["hourly"])[0]
+    rows_per_day = 86400 / settings.raw_sample_interval if granularity == "raw" else 24
+    return max(1.0, days * rows_per_day / 168)
+
+
+# Token cost per request path; paths not listed cost DEFAULT_COST, zero means unlimited
+ROUTE_COSTS: Dict[str, RouteCost] = {
+    "/api/v1/mood/pulse_history": _history_cost,
+    "/api/v1/mood/pulse_history/export": _export_cost,
+    "/api/v1/mood/current_mood": 1.0,
+    "/api/v1/chat/chat": 5.0,
+    "/api/v1/health": 0.0,
+    "/api/v1/health/live": 0.0,
+    "/api/v1/health/ready": 0.0,
+    "/api/v1/ping": 0.0,
+}
+DEFAULT_COST = 1.0
+
+
+class MemoryBackend:
+    """In-process token buckets; each worker limits independently"""
+
+    def __init__(self, capacity: float, refill_rate: float, max_clients: int = 100000):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.max_clients = max_clients
+        # client key -> [tokens, last refill (monotonic)]
+        self._buckets: Dict[str, List[float]] = {}
+
+    def acquire(self, key: str, cost: float) -> Tuple[bool, float]:
+        """Take `cost` tokens; returns (allowed, seconds until enough tokens)"""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_clients:
+                self._evict(now)
+            bucket = self._buckets[key] = [self.capacity, now]
+        else:
+            bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.refill_rate)
+            bucket[1] = now
+        if bucket[0] >= cost:
+            bucket[0] -= cost
+            return True, 0.0
+        return False, (cost - bucket[0]) / self.refill_rate
+
+    def _evict(self, now: float) -> None:
+        """Drop buckets that have refilled completely, then the oldest half if still full"""
+        idle = self.capacity / self.refill_rate
+        self._buckets = {key: b for key, b in self._buckets.items() if now - b[1] < idle}
+        if len(self._buckets) >= self.max_clients:
+            keep = list(self._buckets.items())[len(self._buckets) // 2:]
+            self._buckets = dict(keep)
+
+
+# Atomic token bucket in Redis: KEYS[1]=bucket, ARGV=capacity, rate, cost, now
+_REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBackend:
+    """Token buckets shared by all workers through Redis"""
+
+    def __init__(self, url: str, capacity: float, refill_rate: float, prefix: str = "gaiapulse:ratelimit:"):
+        import redis.asyncio as aioredis
+
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.prefix = prefix
+        self._client = aioredis.from_url(url)
+        self._script = self._client.register_script(_REDIS_TOKEN_BUCKET)
+
+    async def acquire(self, key: str, cost: float) -> Tuple[bool, float]:
+        allowed, tokens = await self._script(
+            keys=[self.prefix + key],
+            args=[self.capacity, self.refill_rate, cost, time.time()]
+        )
+        if allowed:
+            return True, 0.0
+        return False, (cost - float(tokens)) / self.refill_rate
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware so the per-request overhead stays a few dict lookups"""
+
+    def __init__(
+        self,
+        app,
+        capacity: Optional[float] = None,
+        refill_rate: Optional[float] = None,
+        backend: Optional[str] = None,
+        trust_proxy: Optional[bool] = None,
+        api_keys: Optional[List[str]] = None
+    ):
+        self.app = app
+        self.capacity = capacity or settings.rate_limit_capacity
+        self.refill_rate = refill_rate or settings.rate_limit_refill_rate
+        self.trust_proxy = settings.rate_limit_trust_proxy if trust_proxy is None else trust_proxy
+        self.api_keys = frozenset(settings.rate_limit_api_keys if api_keys is None else api_keys)
+        backend = backend or settings.rate_limit_backend
+        self._memory: Optional[MemoryBackend] = None
+        self._redis: Optional[RedisBackend] = None
+        if backend == "redis":
+            self._redis = RedisBackend(settings.redis_url, self.capacity, self.refill_rate)
+        else:
+            self._memory = MemoryBackend(self.capacity, self.refill_rate, settings.rate_limit_max_clients)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        cost = ROUTE_COSTS.get(scope["path"], DEFAULT_COST)
+        if callable(cost):
+            cost = cost(parse_qs(scope["query_string"].decode("latin-1")))
+        if cost <= 0:
+            return await self.app(scope, receive, send)
+        cost = min(cost, self.capacity)
+
+        key = self._client_key(scope)
+        if self._memory is not None:
+            allowed, retry_after = self._memory.acquire(key, cost)
+        else:
+            try:
+                allowed, retry_after = await self._redis.acquire(key, cost)
+            except Exception as e:
+                # Fail open: a Redis outage must not take the API down
+                logger.error("Rate limit backend error: %s", e)
+                allowed, retry_after = True, 0.0
+
+        if allowed:
+            return await self.app(scope, receive, send)
+        await self._reject(scope, send, retry_after)
+
+    def _client_key(self, scope) -> str:
+        forwarded_for = None
+        for name, value in scope["headers"]:
+            if name == b"x-api-key":
+                # Unknown keys are ignored, otherwise every new value would be a fresh bucket
+                api_key = value.decode("latin-1")
+                if api_key in self.api_keys:
+                    return "key:" + api_key
+            elif name == b"x-forwarded-for":
+                forwarded_for = value
+        if self.trust_proxy and forwarded_for:
+            return "ip:" + forwarded_for.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    async def _reject(self, scope, send, retry_after: float) -> None:
+        body = json.dumps({
+            "success": False,
+            "error": "Rate limit exceeded",
+            "code": "RATE_LIMITED",
+            "details": {"path": scope["path"], "retry_after": round(retry_after, 3)}
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,168 @@
+"""
+Shared-memory snapshot distribution between the ingestion leader and
+read-only serving workers
+"""
+import json
+import logging
+import struct
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Optional, Tuple
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Region layout:
+#   header (64 bytes): magic, layout version, published sequence, slot size
+#   two slots of `slot_size` bytes, double buffered by sequence parity
+# Slot layout: slot sequence (Q), directory length (I), JSON directory
+# {key: [offset, length]}, then the concatenated blobs.
+_MAGIC = b"GPSS"
+_LAYOUT_VERSION = 1
+_HEADER = struct.Struct("<4sIQQ")
+_HEADER_SIZE = 64
+_SEQ_OFFSET = 8
+_SLOT_HEADER = struct.Struct("<QI")
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing region without taking ownership of it.
+
+    Processes started by serve.py share the creator's resource tracker, which
+    already knows the segment; a process with its own tracker must stop it from
+    unlinking the segment when that process exits.
+    """
+    shared_tracker = getattr(resource_tracker._resource_tracker, "_fd", None) is not None
+    shm = shared_memory.SharedMemory(name=name)
+    if not shared_tracker:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class SnapshotPublisher:
+    """Owns the shared region and publishes new snapshots into the inactive slot"""
+
+    def __init__(self, name: Optional[str] = None, slot_size: int = 16 * 1024 * 1024, create: bool = True):
+        if create:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=_HEADER_SIZE + 2 * slot_size)
+            _HEADER.pack_into(self._shm.buf, 0, _MAGIC, _LAYOUT_VERSION, 0, slot_size)
+        else:
+            # Publishing into a region another process created (and will unlink)
+            self._shm = _attach(name)
+            slot_size = _HEADER.unpack_from(self._shm.buf, 0)[3]
+        self.slot_size = slot_size
+        self._owner = create
+        self._seq = struct.unpack_from("<Q", self._shm.buf, _SEQ_OFFSET)[0]
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    def publish(self, blobs: Dict[str, bytes]) -> int:
+        """Write blobs into the slot readers are not using, then flip the sequence"""
+        seq = self._seq + 1
+        directory: Dict[str, Tuple[int, int]] = {}
+        offset = 0
+        for key, blob in blobs.items():
+            directory[key] = (offset, len(blob))
+            offset += len(blob)
+        encoded_directory = json.dumps(directory, separators=(",", ":")).encode()
+        data_start = _SLOT_HEADER.size + len(encoded_directory)
+        if data_start + offset > self.slot_size:
+            raise ValueError(f"Snapshot of {data_start + offset} bytes exceeds slot size {self.slot_size}")
+
+        buf = self._shm.buf
+        base = _HEADER_SIZE + (seq % 2) * self.slot_size
+        _SLOT_HEADER.pack_into(buf, base, seq, len(encoded_directory))
+        buf[base + _SLOT_HEADER.size:base + data_start] = encoded_directory
+        position = base + data_start
+        for blob in blobs.values():
+            buf[position:position + len(blob)] = blob
+            position += len(blob)
+
+        # Readers pick their slot from the header sequence, so this is the commit point
+        struct.pack_into("<Q", buf, _SEQ_OFFSET, seq)
+        self._seq = seq
+        return seq
+
+    def close(self) -> None:
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+class SnapshotReader:
+    """Read-only view of a published snapshot region"""
+
+    def __init__(self, name: str):
+        self._shm = _attach(name)
+        magic, version, _, self.slot_size = _HEADER.unpack_from(self._shm.buf, 0)
+        if magic != _MAGIC or version != _LAYOUT_VERSION:
+            raise ValueError(f"Shared memory region {name} is not a GaiaPulse snapshot")
+        self._directory: Dict[str, Tuple[int, int]] = {}
+        self._directory_seq = 0
+        self._data_base = 0
+
+    @property
+    def seq(self) -> int:
+        return struct.unpack_from("<Q", self._shm.buf, _SEQ_OFFSET)[0]
+
+    def get(self, key: str) -> Optional[memoryview]:
+        """Zero-copy view of a blob in the latest snapshot, or None if absent.
+
+        The view stays valid until the leader publishes twice more, which at
+        the ingest interval is far longer than any single response write.
+        """
+        seq = self.seq
+        if seq == 0:
+            return None
+        if seq != self._directory_seq and not self._load_directory(seq):
+            return None
+        entry = self._directory.get(key)
+        if entry is None:
+            return None
+        offset, length = entry
+        start = self._data_base + offset
+        return self._shm.buf[start:start + length]
+
+    def _load_directory(self, seq: int, attempts: int = 3) -> bool:
+        buf = self._shm.buf
+        for _ in range(attempts):
+            base = _HEADER_SIZE + (seq % 2) * self.slot_size
+            slot_seq, directory_length = _SLOT_HEADER.unpack_from(buf, base)
+            if slot_seq == seq:
+                start = base + _SLOT_HEADER.size
+                try:
+                    directory = json.loads(bytes(buf[start:start + directory_length]))
+                except ValueError:
+                    directory = None
+                # A slot is only rewritten two publishes later
+                if directory is not None and self.seq - seq < 2:
+                    self._directory = {key: (entry[0], entry[1]) for key, entry in directory.items()}
+                    self._directory_seq = seq
+                    self._data_base = start + directory_length
+                    return True
+            seq = self.seq
+        logger.warning("Could not read a consistent shared snapshot")
+        return False
+
+
+_snapshot_reader: Optional[SnapshotReader] = None
+_attach_failed = False
+
+
+def get_snapshot_reader() -> Optional[SnapshotReader]:
+    """Attach to the leader's snapshot when running as a serving worker"""
+    global _snapshot_reader, _attach_failed
+    if _snapshot_reader is None and not _attach_failed and settings.serving_role == "worker" and settings.snapshot_shm_name:
+        try:
+            _snapshot_reader = SnapshotReader(settings.snapshot_shm_name)
+        except (FileNotFoundError, ValueError) as e:
+            # Fall back to computing locally rather than retrying on every request
+            logger.error("Error attaching to shared snapshot %s: %s", settings.snapshot_shm_name, e)
+            _attach_failed = True
+    return _snapshot_reader
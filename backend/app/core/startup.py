@@ -0,0 +1,139 @@
+"""
+Startup-time profiling: per-module import cost and cold start timing
+"""
+import importlib.abc
+import logging
+import sys
+import time
+from typing import Any, List, Optional, Tuple
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Imported first thing by main.py, so this approximates interpreter-ready time
+_PROCESS_T0 = time.perf_counter()
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Delegates to the real loader and times module execution"""
+
+    def __init__(self, loader: Any, profiler: "ImportProfiler"):
+        self.loader = loader
+        self.profiler = profiler
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        # Hand the module back its real loader so resources, source lookup
+        # and reloads behave exactly as without profiling
+        module.__loader__ = self.loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self.loader
+        self.profiler._enter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.profiler._exit(module.__name__)
+
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """In-process equivalent of `python -X importtime` for the boot log.
+
+    Records self and cumulative execution time (microseconds) for every module
+    imported while installed, in completion order like the CPython report.
+    """
+
+    def __init__(self):
+        self.records: List[Tuple[str, int, int, int]] = []  # (module, self_us, cumulative_us, depth)
+        self._stack: List[List[float]] = []  # [start, time spent in nested imports]
+        self._finding = False
+        self.started_at: Optional[float] = None
+        self.imports_done_at: Optional[float] = None
+
+    def install(self) -> None:
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+        self.started_at = time.perf_counter()
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+        self.imports_done_at = time.perf_counter()
+
+    def find_spec(self, fullname, path, target=None):
+        if self._finding:
+            return None
+        self._finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = _TimedLoader(spec.loader, self)
+                    return spec
+            return None
+        finally:
+            self._finding = False
+
+    def _enter(self) -> None:
+        self._stack.append([time.perf_counter(), 0.0])
+
+    def _exit(self, name: str) -> None:
+        started, nested = self._stack.pop()
+        cumulative = time.perf_counter() - started
+        if self._stack:
+            self._stack[-1][1] += cumulative
+        self.records.append((name, int((cumulative - nested) * 1e6), int(cumulative * 1e6), len(self._stack)))
+
+    def report(self, top: Optional[int] = None) -> str:
+        """Format records as `import time: self [us] | cumulative | imported package`"""
+        records = self.records
+        if top is not None:
+            records = sorted(records, key=lambda record: record[2], reverse=True)[:top]
+        lines = ["import time: self [us] | cumulative | imported package"]
+        for name, self_us, cumulative_us, depth in records:
+            lines.append(f"import time: {self_us:>9} | {cumulative_us:>10} | {'  ' * depth}{name}")
+        return "\n".join(lines)
+
+
+class StartupProfiler:
+    """Tracks cold start phases and optionally profiles imports"""
+
+    def __init__(self):
+        self.imports = ImportProfiler()
+        self.enabled = False
+        self.ready_at: Optional[float] = None
+
+    def start(self) -> None:
+        """Begin import profiling when STARTUP_PROFILE is enabled"""
+        self.enabled = settings.startup_profile
+        if self.enabled:
+            self.imports.install()
+
+    def imports_done(self) -> None:
+        self.imports.uninstall()
+
+    def ready(self) -> float:
+        """Mark the application ready to serve and log the startup report"""
+        self.ready_at = time.perf_counter()
+        cold_start_ms = (self.ready_at - _PROCESS_T0) * 1000
+        imports_ms = ((self.imports.imports_done_at or self.ready_at) - _PROCESS_T0) * 1000
+        logger.info(
+            "Cold start: imports %.0f ms, ready in %.0f ms",
+            imports_ms,
+            cold_start_ms,
+            extra={"imports_ms": round(imports_ms, 1), "cold_start_ms": round(cold_start_ms, 1)}
+        )
+        if cold_start_ms > settings.startup_budget_ms:
+            logger.warning("Cold start of %.0f ms exceeds the %.0f ms budget", cold_start_ms, settings.startup_budget_ms)
+        if self.enabled:
+            logger.info("Slowest imports:\n%s", self.imports.report(top=settings.startup_profile_top))
+        return cold_start_ms
+
+
+# Global startup profiler instance
+startup_profiler = StartupProfiler()
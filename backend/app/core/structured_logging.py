@@ -0,0 +1,183 @@
+"""
+Structured, non-blocking, sampled logging
+"""
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+import zlib
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from app.config.settings import settings
+
+# Set per request by the access log middleware
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+request_path_var: ContextVar[str] = ContextVar("request_path", default="")
+
+# Attributes every LogRecord has; anything else came from `extra=` and is
+# emitted as a structured field
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id", "request_path"}
+
+
+def parse_sample_rates(raw: str) -> Dict[str, float]:
+    """Parse `path=rate,path=rate` into a mapping of route path to keep rate"""
+    rates = {}
+    for item in raw.split(","):
+        if "=" in item:
+            path, rate = item.split("=", 1)
+            rates[path.strip()] = max(0.0, min(1.0, float(rate)))
+    return rates
+
+
+class RequestContextFilter(logging.Filter):
+    """Attach the current request ID and path to every record"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.request_path = request_path_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Sample and rate limit high-volume INFO/DEBUG lines; warnings always pass.
+
+    Sampling is decided per request ID, so a kept request keeps all of its
+    lines. Rate limits are token buckets per (logger, message template).
+    """
+
+    def __init__(self, sample_rates: Dict[str, float], rate_limit: float, burst: Optional[float] = None):
+        super().__init__()
+        self.sample_rates = sample_rates
+        self.rate_limit = rate_limit
+        self.burst = burst if burst is not None else max(rate_limit, 1.0)
+        self._buckets: Dict[Tuple[str, int, str], list] = {}
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        rate = self.sample_rates.get(getattr(record, "request_path", ""))
+        if rate is not None and rate < 1.0:
+            if (zlib.crc32(getattr(record, "request_id", "-").encode()) % 10000) >= rate * 10000:
+                self.suppressed += 1
+                return False
+
+        if self.rate_limit > 0:
+            key = (record.name, record.levelno, str(record.msg))
+            now = time.monotonic()
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.burst, now]
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate_limit)
+            bucket[1] = now
+            if bucket[0] < 1.0:
+                self.suppressed += 1
+                return False
+            bucket[0] -= 1.0
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with request context and `extra=` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", "-")
+        if request_id != "-":
+            entry["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Freeze the message on the calling thread; JSON encoding and
+        # traceback formatting happen on the listener thread
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LoggingPipeline:
+    """Owns the queue listener that performs the actual log I/O"""
+
+    def __init__(self):
+        self.handler: Optional[NonBlockingQueueHandler] = None
+        self.sampler: Optional[SamplingFilter] = None
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._pid: Optional[int] = None
+
+    def start(self) -> None:
+        """Route root logging through a bounded queue to a background writer.
+
+        A forked child (the serve.py leader) inherits the listener but not its
+        thread, so starting again in another process builds a fresh pipeline.
+        """
+        if self._listener is not None and self._pid == os.getpid():
+            return
+        output = logging.StreamHandler(sys.stderr)
+        if settings.log_format == "json":
+            output.setFormatter(JsonFormatter())
+        else:
+            output.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"))
+
+        self.handler = NonBlockingQueueHandler(queue.Queue(maxsize=settings.log_queue_size))
+        self.sampler = SamplingFilter(parse_sample_rates(settings.log_sample_rates), settings.log_rate_limit)
+        # Context is captured on the request's thread, before the record is queued
+        self.handler.addFilter(RequestContextFilter())
+        self.handler.addFilter(self.sampler)
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(self.handler)
+        root.setLevel(getattr(logging, settings.log_level.upper(), logging.INFO))
+
+        self._listener = logging.handlers.QueueListener(self.handler.queue, output, respect_handler_level=True)
+        self._listener.start()
+        self._pid = os.getpid()
+
+    def stop(self) -> None:
+        """Flush queued records and stop the writer thread"""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+            logging.getLogger().removeHandler(self.handler)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self.handler.queue.qsize() if self.handler else 0,
+            "dropped": self.handler.dropped if self.handler else 0,
+            "suppressed": self.sampler.suppressed if self.sampler else 0,
+        }
+
+
+# Global logging pipeline instance
+logging_pipeline = LoggingPipeline()
@@ -6,6 +6,8 @@ from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field, validator
 from enum import Enum
 
+from app.config.settings import settings
+
 
 class MoodType(str, Enum):
     """Earth's mood states"""
@@ -48,12 +50,45 @@ class CurrentMood(BaseModel):
     next_update: datetime = Field(..., description="Next scheduled update")
 
 
+class CurrentMoodPatch(BaseModel):
+    """Changed fields of the current mood relative to the previous version"""
+    version: int = Field(..., description="Version of the current mood")
+    base_version: int = Field(..., description="Version the changes apply to")
+    changes: Dict[str, Any] = Field(..., description="Fields whose values changed")
+
+
+class MoodScoreRequest(BaseModel):
+    """Batch of environmental snapshots to score"""
+    snapshots: List[Dict[str, Optional[float]]] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.mood_score_batch_max,
+        description="Snapshots keyed by metric name; missing metrics use the rule defaults"
+    )
+
+
+class MoodScore(BaseModel):
+    """Mood score of one snapshot"""
+    mood: MoodType = Field(..., description="Mood state")
+    score: float = Field(..., ge=0, le=100, description="Mood score (0-100)")
+    factors: List[str] = Field(..., description="Factors lowering the score")
+
+
+class MoodScoreBatch(BaseModel):
+    """Scores of a snapshot batch, in request order"""
+    scores: List[MoodScore] = Field(..., description="One score per snapshot")
+    rules_version: str = Field(..., description="Version of the scoring rules applied")
+
+
 class PulseHistory(BaseModel):
     """Historical pulse data"""
     data: List[Point] = Field(..., description="Time series data points")
     period: str = Field(..., description="Time period (7d, 30d, 1y)")
     aggregation: str = Field(..., description="Data aggregation method")
     total_points: int = Field(..., description="Total number of data points")
+    start: Optional[datetime] = Field(None, description="Timestamp of the first sample in the requested range")
+    end: Optional[datetime] = Field(None, description="Timestamp of the last sample in the requested range")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if the range has more points")
 
 
 class EnvironmentalMetric(BaseModel):
@@ -73,6 +108,13 @@ class ChatMessage(BaseModel):
     """Chat message for AI interaction"""
     message: str = Field(..., min_length=1, max_length=1000, description="User message")
     context: Optional[Dict[str, Any]] = Field(None, description="Additional context")
+    session_id: Optional[str] = Field(
+        None,
+        min_length=8,
+        max_length=64,
+        pattern=r"^[A-Za-z0-9_-]+$",
+        description="Conversation session to continue (a new one is started when omitted)"
+    )
     timestamp: datetime = Field(default_factory=datetime.utcnow, description="Message timestamp")
 
 
@@ -82,6 +124,7 @@ class ChatResponse(BaseModel):
     confidence: float = Field(..., ge=0, le=1, description="Response confidence")
     sources: List[str] = Field(..., description="Data sources used")
     suggestions: List[str] = Field(..., description="Follow-up suggestions")
+    session_id: Optional[str] = Field(None, description="Conversation session to send with the next message")
     timestamp: datetime = Field(default_factory=datetime.utcnow, description="Response timestamp")
 
 
@@ -94,6 +137,25 @@ class Alert(BaseModel):
     location: Optional[str] = Field(None, description="Geographic location")
     timestamp: datetime = Field(..., description="Alert timestamp")
     resolved: bool = Field(default=False, description="Alert resolution status")
+    resolved_at: Optional[datetime] = Field(None, description="Alert resolution timestamp")
+    rule_id: Optional[str] = Field(None, description="ID of the rule that raised the alert")
+    metric: Optional[str] = Field(None, description="Metric the alert refers to")
+    value: Optional[float] = Field(None, description="Latest observed value for the alert condition")
+    threshold: Optional[float] = Field(None, description="Threshold of the alert rule")
+
+
+class AlertPage(BaseModel):
+    """Cursor-paginated page of alerts"""
+    alerts: List[Alert] = Field(..., description="Alerts, newest first")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if any")
+    active_count: int = Field(..., description="Number of currently active alerts")
+
+
+class MoodTimeline(BaseModel):
+    """Recent materialized moods, oldest first"""
+    entries: List[CurrentMood] = Field(..., description="Mood snapshots, oldest first")
+    changes_only: bool = Field(..., description="Whether only mood transitions are included")
+    capacity: int = Field(..., description="Maximum number of snapshots retained")
 
 
 class HealthCheck(BaseModel):
@@ -103,6 +165,8 @@ class HealthCheck(BaseModel):
     version: str = Field(..., description="API version")
     uptime: float = Field(..., description="Service uptime in seconds")
     services: Dict[str, str] = Field(..., description="Dependent services status")
+    checked_at: Optional[datetime] = Field(None, description="When the dependency probes last ran")
+    checks: Optional[Dict[str, Dict[str, Any]]] = Field(None, description="Per-probe latency and detail")
 
 
 # API Response Models
@@ -113,6 +177,27 @@ class CurrentMoodResponse(BaseModel):
     message: str = Field(..., description="Response message")
 
 
+class MoodTimelineResponse(BaseModel):
+    """API response for the mood timeline"""
+    success: bool = Field(..., description="Request success status")
+    data: MoodTimeline = Field(..., description="Mood timeline")
+    message: str = Field(..., description="Response message")
+
+
+class CurrentMoodPatchResponse(BaseModel):
+    """API response for a current mood delta"""
+    success: bool = Field(..., description="Request success status")
+    data: CurrentMoodPatch = Field(..., description="Current mood changes")
+    message: str = Field(..., description="Response message")
+
+
+class MoodScoreResponse(BaseModel):
+    """API response for batch mood scoring"""
+    success: bool = Field(..., description="Request success status")
+    data: MoodScoreBatch = Field(..., description="Mood scores")
+    message: str = Field(..., description="Response message")
+
+
 class PulseHistoryResponse(BaseModel):
     """API response for pulse history"""
     success: bool = Field(..., description="Request success status")
@@ -127,6 +212,20 @@ class ChatResponseWrapper(BaseModel):
     message: str = Field(..., description="Response message")
 
 
+class AlertListResponse(BaseModel):
+    """API response for alerts"""
+    success: bool = Field(..., description="Request success status")
+    data: AlertPage = Field(..., description="Alert page")
+    message: str = Field(..., description="Response message")
+
+
+class AlertResponse(BaseModel):
+    """API response for a single alert"""
+    success: bool = Field(..., description="Request success status")
+    data: Alert = Field(..., description="Alert data")
+    message: str = Field(..., description="Response message")
+
+
 class ErrorResponse(BaseModel):
     """Error response model"""
     success: bool = Field(default=False, description="Request success status")
@@ -0,0 +1,374 @@
+"""
+Compact columnar time-series container used internally by the services
+"""
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from app.models.schemas import DataSource, Point
+
+_EPOCH = datetime(1970, 1, 1)
+_MISSING = float("nan")
+_INT_MISSING = -2 ** 63
+
+# Side column kinds: float32 numbers, exact int64 integers (flags, counts),
+# interned strings, or arbitrary objects. The last one is the escape hatch for
+# nested metadata and for columns whose values do not fit one type; it costs
+# a pointer per row.
+FLOAT, INT, STRING, OBJECT = "f", "i", "s", "o"
+
+
+class StringTable:
+    """Interns short strings into one-byte codes (0 is reserved for None)"""
+
+    __slots__ = ("_values", "_codes")
+
+    def __init__(self, values: Iterable[str] = ()):
+        self._values: List[Optional[str]] = [None]
+        self._codes: Dict[str, int] = {}
+        for value in values:
+            self.code(value)
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return 0
+        code = self._codes.get(value)
+        if code is None:
+            if len(self._values) > 255:
+                raise ValueError("String table is full (255 distinct values)")
+            code = self._codes[value] = len(self._values)
+            self._values.append(value)
+        return code
+
+    def value(self, code: int) -> Optional[str]:
+        return self._values[code]
+
+
+# Sources are the DataSource values, so one process-wide table covers every
+# series. Units and string side columns get tables per series (see TimeSeries)
+SOURCES = StringTable(source.value for source in DataSource)
+
+
+def _to_epoch(timestamp: Union[datetime, int, float]) -> int:
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+        return int((timestamp - _EPOCH).total_seconds())
+    return int(timestamp)
+
+
+def _f32(value: float) -> Optional[float]:
+    """Render a stored float32 back as the shortest decimal it came from"""
+    if math.isnan(value):
+        return None
+    return float(f"{value:.7g}")
+
+
+class TimeSeries:
+    """Columnar series of points: 8-byte timestamps, float32 values and
+    confidence, one-byte source/unit codes and typed side columns in place of
+    per-point metadata dicts.
+
+    Timestamps are epoch seconds (UTC) and kept in ascending order. Convert to
+    pydantic `Point` objects only at the API boundary with `to_points()`.
+
+    Units and each STRING column have their own string table, so codes never
+    run out across series. A STRING column whose table fills up (more than 255
+    distinct values in one series) turns into an OBJECT column, as does any
+    column given a value of another type.
+    """
+
+    __slots__ = ("timestamps", "values", "confidence", "sources", "units", "columns", "unit_table", "string_tables")
+
+    def __init__(self, columns: Optional[Dict[str, str]] = None):
+        self.timestamps = array("q")
+        self.values = array("f")
+        self.confidence = array("f")
+        self.sources = array("B")
+        self.units = array("B")
+        self.columns: Dict[str, Tuple[str, Union[array, list]]] = {}
+        self.unit_table = StringTable()
+        self.string_tables: Dict[str, StringTable] = {}
+        for name, kind in (columns or {}).items():
+            self.add_column(name, kind)
+
+    def add_column(self, name: str, kind: str) -> None:
+        """Add a side column, backfilling existing rows as missing"""
+        if name in self.columns:
+            return
+        size = len(self.timestamps)
+        if kind == FLOAT:
+            column: Union[array, list] = array("f", [_MISSING]) * size
+        elif kind == INT:
+            column = array("q", [_INT_MISSING]) * size
+        elif kind == STRING:
+            column = array("B", bytes(size))
+            self.string_tables[name] = StringTable()
+        elif kind == OBJECT:
+            column = [None] * size
+        else:
+            raise ValueError(f"Unknown column kind: {kind}")
+        self.columns[name] = (kind, column)
+
+    def _objects(self, name: str) -> list:
+        """Values of a side column as plain Python objects (None where missing)"""
+        kind, column = self.columns[name]
+        if kind == FLOAT:
+            return [_f32(item) for item in column]
+        if kind == INT:
+            return [None if item == _INT_MISSING else item for item in column]
+        if kind == STRING:
+            return list(map(self.string_tables[name].value, column))
+        return list(column)
+
+    def _widen(self, name: str) -> list:
+        """Turn a typed column into an OBJECT column holding the decoded values"""
+        column = self._objects(name)
+        self.string_tables.pop(name, None)
+        self.columns[name] = (OBJECT, column)
+        return column
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column buffers"""
+        total = sum(column.itemsize * len(column) for column in (self.timestamps, self.values, self.confidence, self.sources, self.units))
+        for kind, column in self.columns.values():
+            total += column.itemsize * len(column) if isinstance(column, array) else 8 * len(column)
+        return total
+
+    def append(
+        self,
+        timestamp: Union[datetime, int],
+        value: float,
+        unit: str,
+        source: Union[DataSource, str],
+        confidence: Optional[float] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Append one point; it must not be older than the last one"""
+        ts = _to_epoch(timestamp)
+        if self.timestamps and ts < self.timestamps[-1]:
+            raise ValueError("Points must be appended in chronological order (use merge)")
+
+        # New metadata keys become columns, backfilled for the existing rows
+        metadata = metadata or {}
+        for name, item in metadata.items():
+            if name not in self.columns:
+                if isinstance(item, bool):
+                    self.add_column(name, OBJECT)
+                elif isinstance(item, int):
+                    self.add_column(name, INT)
+                elif isinstance(item, float):
+                    self.add_column(name, FLOAT)
+                elif isinstance(item, str):
+                    self.add_column(name, STRING)
+                else:
+                    self.add_column(name, OBJECT)
+
+        self.timestamps.append(ts)
+        self.values.append(value)
+        self.confidence.append(_MISSING if confidence is None else confidence)
+        self.sources.append(SOURCES.code(getattr(source, "value", source)))
+        self.units.append(self.unit_table.code(unit))
+        for name, (kind, column) in self.columns.items():
+            item = metadata.get(name)
+            try:
+                if kind == FLOAT:
+                    column.append(_MISSING if item is None else item)
+                elif kind == INT:
+                    column.append(_INT_MISSING if item is None else item)
+                elif kind == STRING:
+                    if item is not None and not isinstance(item, str):
+                        raise TypeError(f"Column {name} holds strings")
+                    column.append(self.string_tables[name].code(item))
+                else:
+                    column.append(item)
+            except (TypeError, ValueError, OverflowError):
+                # Wrong type, out of int64 range or a full string table
+                self._widen(name).append(item)
+
+    @classmethod
+    def from_samples(cls, samples: Iterable[Dict[str, Any]], columns: Optional[Dict[str, str]] = None) -> "TimeSeries":
+        """Build a series from sample dicts in the `Point` shape"""
+        series = cls(columns)
+        for sample in samples:
+            series.append(
+                sample["timestamp"],
+                sample["value"],
+                sample["unit"],
+                sample["source"],
+                sample.get("confidence"),
+                sample.get("metadata")
+            )
+        return series
+
+    def _take(self, start: int, stop: int) -> "TimeSeries":
+        part = TimeSeries()
+        part.timestamps = self.timestamps[start:stop]
+        part.values = self.values[start:stop]
+        part.confidence = self.confidence[start:stop]
+        part.sources = self.sources[start:stop]
+        part.units = self.units[start:stop]
+        part.columns = {name: (kind, column[start:stop]) for name, (kind, column) in self.columns.items()}
+        # Tables only ever grow, so slices can share them; codes stay valid for both
+        part.unit_table = self.unit_table
+        part.string_tables = dict(self.string_tables)
+        return part
+
+    def __getitem__(self, index: Union[int, slice]) -> Union["TimeSeries", Dict[str, Any]]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("TimeSeries slices must be contiguous")
+            return self._take(start, stop)
+        if index < 0:
+            index += len(self)
+        return self.sample(index)
+
+    def between(self, first: Union[datetime, int], last: Union[datetime, int]) -> "TimeSeries":
+        """Points with first <= timestamp <= last"""
+        return self._take(
+            bisect_left(self.timestamps, _to_epoch(first)),
+            bisect_right(self.timestamps, _to_epoch(last))
+        )
+
+    def extend(self, other: "TimeSeries") -> None:
+        """Append a series that starts at or after this one ends"""
+        if self.timestamps and other.timestamps and other.timestamps[0] < self.timestamps[-1]:
+            raise ValueError("Series overlap; use merge")
+        for name, (kind, _) in other.columns.items():
+            self.add_column(name, kind)
+            if self.columns[name][0] not in (kind, OBJECT):
+                self._widen(name)
+        units = _recode(other.units, other.unit_table, self.unit_table)
+        self.timestamps.extend(other.timestamps)
+        self.values.extend(other.values)
+        self.confidence.extend(other.confidence)
+        self.sources.extend(other.sources)
+        self.units.extend(units)
+        for name, (kind, column) in list(self.columns.items()):
+            if name not in other.columns:
+                column.extend(_missing(kind, len(other)))
+                continue
+            other_kind, other_column = other.columns[name]
+            if kind == STRING:
+                try:
+                    column.extend(_recode(other_column, other.string_tables[name], self.string_tables[name]))
+                    continue
+                except ValueError:
+                    column = self._widen(name)
+            elif kind == other_kind:
+                column.extend(other_column)
+                continue
+            column.extend(other._objects(name))
+
+    def merge(self, other: "TimeSeries") -> "TimeSeries":
+        """New series with the points of both in order; `other` wins on equal timestamps"""
+        merged = TimeSeries({name: kind for name, (kind, _) in list(self.columns.items()) + list(other.columns.items())})
+        i = j = 0
+        left, right = self.timestamps, other.timestamps
+        # Copy whole runs so string codes are translated once per run, not per row
+        while i < len(left) or j < len(right):
+            if j >= len(right) or (i < len(left) and left[i] < right[j]):
+                stop = bisect_left(left, right[j], i) if j < len(right) else len(left)
+                merged.extend(self._take(i, stop))
+                i = stop
+            else:
+                stop = bisect_left(right, left[i], j) if i < len(left) else len(right)
+                if stop == j:
+                    # Equal timestamps: the row from `other` replaces this one's
+                    i += 1
+                    stop += 1
+                merged.extend(other._take(j, stop))
+                j = stop
+        return merged
+
+    def sample(self, index: int) -> Dict[str, Any]:
+        """Point-shaped dict for one row"""
+        metadata = {}
+        for name, (kind, column) in self.columns.items():
+            if kind == FLOAT:
+                item = _f32(column[index])
+            elif kind == INT:
+                item = column[index]
+                if item == _INT_MISSING:
+                    item = None
+            elif kind == STRING:
+                item = self.string_tables[name].value(column[index])
+            else:
+                item = column[index]
+            if item is not None:
+                metadata[name] = item
+        return {
+            "timestamp": _EPOCH + timedelta(seconds=self.timestamps[index]),
+            "value": _f32(self.values[index]),
+            "unit": self.unit_table.value(self.units[index]),
+            "source": DataSource(SOURCES.value(self.sources[index])),
+            "confidence": _f32(self.confidence[index]),
+            "metadata": metadata or None
+        }
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Source codes are per process, so ship that table along with the
+        # columns (compute pool workers return series across processes)
+        return {
+            "timestamps": self.timestamps,
+            "values": self.values,
+            "confidence": self.confidence,
+            "sources": self.sources,
+            "units": self.units,
+            "columns": self.columns,
+            "source_table": list(SOURCES._values),
+            "unit_table": self.unit_table._values[1:],
+            "string_tables": {name: table._values[1:] for name, table in self.string_tables.items()},
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        source_map = _translation(state["source_table"], SOURCES)
+        self.timestamps = state["timestamps"]
+        self.values = state["values"]
+        self.confidence = state["confidence"]
+        self.sources = array("B", state["sources"].tobytes().translate(source_map))
+        self.units = state["units"]
+        self.columns = state["columns"]
+        # Rebuilding a table from its values in order reproduces its codes
+        self.unit_table = StringTable(state["unit_table"])
+        self.string_tables = {name: StringTable(values) for name, values in state["string_tables"].items()}
+
+    def iter_samples(self) -> Iterator[Dict[str, Any]]:
+        for index in range(len(self)):
+            yield self.sample(index)
+
+    def to_points(self) -> List[Point]:
+        """Materialise pydantic points (API boundary only)"""
+        return [Point(**sample) for sample in self.iter_samples()]
+
+
+def _translation(values: List[Optional[str]], table: StringTable) -> bytes:
+    """Byte translation table from another table's codes to this one's"""
+    mapping = bytearray(range(256))
+    for code, value in enumerate(values):
+        mapping[code] = table.code(value)
+    return bytes(mapping)
+
+
+def _recode(codes: array, source: StringTable, target: StringTable) -> array:
+    """Codes from `source` as codes of `target`; raises ValueError if `target` fills up"""
+    if source is target:
+        return codes
+    return array("B", codes.tobytes().translate(_translation(source._values, target)))
+
+
+def _missing(kind: str, count: int) -> Union[array, list]:
+    if kind == FLOAT:
+        return array("f", [_MISSING]) * count
+    if kind == INT:
+        return array("q", [_INT_MISSING]) * count
+    if kind == STRING:
+        return array("B", bytes(count))
+    return [None] * count
@@ -4,12 +4,29 @@ AI/ML service for environmental predictions and insights
 import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
-import httpx
 from app.config.settings import settings
-from app.models.schemas import CurrentMood, MoodType, ChatResponse, ChatMessage
+from app.core.instrumentation import traced
+from app.models.schemas import CurrentMood, MoodType, MoodScore, MoodScoreBatch, ChatResponse, ChatMessage
+from app.services.chat_context import chat_context, tokenize
+from app.services.chat_sessions import ROLE_USER, ChatSession
+from app.services.scoring_rules import scoring_rules
 
 logger = logging.getLogger(__name__)
 
+# Follow-up suggestions per retrieved topic
+CHAT_SUGGESTIONS: Dict[str, List[str]] = {
+    "temperature": ["How can I reduce my carbon footprint?", "What are the latest climate trends?"],
+    "co2_levels": ["What are the main sources of CO2?", "How do CO2 levels affect the climate?"],
+    "forest_cover": ["Which regions are most affected?", "What can be done to protect forests?"],
+    "ocean_health": ["What threatens ocean health?", "How can we protect marine ecosystems?"],
+    "sea_level_rise": ["How fast is sea level rising?", "How do warming oceans raise sea levels?"],
+    "air_quality_index": ["What does the air quality index mean?", "How does air pollution affect health?"],
+    "biodiversity_index": ["Why are wildlife populations declining?", "How does climate change affect species?"],
+    "renewable_energy_share": ["How much electricity comes from renewables?", "How cheap is solar power now?"],
+    "actions": ["How can I reduce my carbon footprint?", "What's the current CO2 level?"],
+    "general": ["Tell me about global temperature trends", "What's the current CO2 level?", "How is forest cover changing?"],
+}
+
 
 class AIService:
     """AI service for environmental analysis and predictions"""
@@ -19,86 +36,28 @@ class AIService:
         self.watsonx_api_key = settings.watsonx_api_key
         self.watsonx_project_id = settings.watsonx_project_id
         
+    @traced("ai_service.analyze_environmental_data")
     async def analyze_environmental_data(self, data: Dict[str, Any]) -> CurrentMood:
         """Analyze environmental data to determine Earth's mood"""
         try:
-            # Mock AI analysis for now
-            # In production, this would integrate with WatsonX or OpenAI
-            temperature = data.get('temperature', 15.0)
-            co2_levels = data.get('co2_levels', 420)
-            forest_cover = data.get('forest_cover', 31.2)
-            ocean_health = data.get('ocean_health', 72.0)
-            
-            # Simple scoring algorithm
-            score = 100.0
-            
-            # Temperature impact (ideal range: 13-16°C)
-            if temperature < 13 or temperature > 16:
-                score -= 15
-            elif temperature < 14 or temperature > 15:
-                score -= 8
-                
-            # CO2 levels impact (target: < 350 ppm)
-            if co2_levels > 400:
-                score -= 20
-            elif co2_levels > 350:
-                score -= 12
-                
-            # Forest cover impact
-            if forest_cover < 30:
-                score -= 15
-            elif forest_cover < 32:
-                score -= 8
-                
-            # Ocean health impact
-            if ocean_health < 70:
-                score -= 12
-            elif ocean_health < 75:
-                score -= 4
-                
-            # Cycle through mood states sequentially based on time
-            import time
-            current_time = int(time.time())
-            mood_cycle = (current_time // 30) % 3  # Change mood every 30 seconds
-            
-            if mood_cycle == 0:
-                mood = MoodType.HEALING
-                trend = "improving"
-                statement = "Earth is showing signs of recovery with improving environmental indicators."
-                score = 75.0  # Set score for healing
-            elif mood_cycle == 1:
-                mood = MoodType.STRESSED
-                trend = "stable"
-                statement = "Earth is under moderate stress but maintaining stability in key areas."
-                score = 55.0  # Set score for stressed
-            else:
-                mood = MoodType.CRITICAL
-                trend = "declining"
-                statement = "Earth is in critical condition requiring immediate attention and action."
-                score = 35.0  # Set score for critical
-                
-            factors = []
-            if temperature < 13 or temperature > 16:
-                factors.append("Temperature fluctuations")
-            if co2_levels > 350:
-                factors.append("Elevated CO2 levels")
-            if forest_cover < 32:
-                factors.append("Declining forest cover")
-            if ocean_health < 75:
-                factors.append("Ocean health concerns")
+            # Thresholds, penalties and moods come from the compiled scoring rules
+            rules = scoring_rules.current
+            score, factors = rules.score(data)
+            mood, trend, statement = rules.mood(score)
                 
             return CurrentMood(
                 mood=mood,
-                score=max(0, score),
+                score=score,
                 predictive_statement=statement,
-                confidence=0.85,
+                confidence=rules.confidence,
                 factors=factors,
                 trend=trend,
-                next_update=datetime.utcnow() + timedelta(minutes=5)
+                # The next ingest tick recomputes the mood
+                next_update=datetime.utcnow() + timedelta(seconds=settings.data_update_interval)
             )
             
         except Exception as e:
-            logger.error(f"Error in AI analysis: {e}")
+            logger.error("Error in AI analysis: %s", e)
             # Fallback to default response
             return CurrentMood(
                 mood=MoodType.STRESSED,
@@ -107,50 +66,64 @@ class AIService:
                 confidence=0.5,
                 factors=["Data processing"],
                 trend="stable",
-                next_update=datetime.utcnow() + timedelta(minutes=5)
+                next_update=datetime.utcnow() + timedelta(seconds=settings.data_update_interval)
             )
     
-    async def generate_chat_response(self, message: ChatMessage) -> ChatResponse:
-        """Generate AI-powered chat response"""
+    @traced("ai_service.score_snapshots")
+    async def score_snapshots(self, snapshots: List[Dict[str, Any]]) -> MoodScoreBatch:
+        """Score a batch of snapshots with the same rules as the live mood"""
+        rules = scoring_rules.current
+        columns = {
+            metric.name: [snapshot.get(metric.name) for snapshot in snapshots]
+            for metric in rules.metrics
+        }
+        scores, factors = rules.score_columns(columns, len(snapshots))
+        return MoodScoreBatch(
+            scores=[
+                MoodScore(mood=rules.mood(score)[0], score=score, factors=labels)
+                for score, labels in zip(scores, factors)
+            ],
+            rules_version=rules.version
+        )
+    
+    @traced("ai_service.generate_chat_response")
+    async def generate_chat_response(self, message: ChatMessage, session: Optional[ChatSession] = None) -> ChatResponse:
+        """Generate AI-powered chat response grounded in retrieved passages"""
         try:
-            # Mock AI chat response
-            # In production, this would use OpenAI or WatsonX
-            user_message = message.message.lower()
+            # Context values (e.g. {"topic": "co2"}) refine the retrieval query
+            query = " ".join([message.message, *(
+                str(value) for value in (message.context or {}).values()
+                if isinstance(value, (str, int, float)) and not isinstance(value, bool)
+            )])
+            # Short follow-ups ("and last week?") borrow terms from the conversation
+            if session is not None and len(tokenize(query)) < 3:
+                previous = [text for role, text in session.turns() if role == ROLE_USER]
+                query = " ".join([query, *previous[-1:], session.summary_text()])
+            hits = chat_context.search(query)
+            if not hits:
+                return ChatResponse(
+                    response="I'm here to help you understand Earth's environmental status. You can ask me about temperature, CO2 levels, forest cover, ocean health, or any other environmental topics.",
+                    confidence=0.5,
+                    sources=["GaiaPulse Environmental Database"],
+                    suggestions=CHAT_SUGGESTIONS["general"]
+                )
             
-            if "temperature" in user_message or "global warming" in user_message:
-                response = "Global temperatures are currently 1.2°C above pre-industrial levels. This is concerning as we're approaching the 1.5°C threshold set by the Paris Agreement. Immediate action is needed to reduce emissions."
-                sources = ["NASA GISTEMP", "NOAA Climate Data"]
-                suggestions = ["How can I reduce my carbon footprint?", "What are the latest climate trends?"]
-                
-            elif "co2" in user_message or "carbon" in user_message:
-                response = "CO2 levels are currently at 420 ppm, which is 50% higher than pre-industrial levels. This is the highest concentration in at least 800,000 years and is driving climate change."
-                sources = ["Mauna Loa Observatory", "NOAA Global Monitoring Laboratory"]
-                suggestions = ["What are the main sources of CO2?", "How do CO2 levels affect the climate?"]
-                
-            elif "forest" in user_message or "deforestation" in user_message:
-                response = "Global forest cover is currently at 31.2%, down from 31.8% in 1990. We're losing approximately 10 million hectares of forest annually, primarily in tropical regions."
-                sources = ["FAO Global Forest Resources Assessment", "Global Forest Watch"]
-                suggestions = ["Which regions are most affected?", "What can be done to protect forests?"]
-                
-            elif "ocean" in user_message or "marine" in user_message:
-                response = "Ocean health is at 72%, showing some recovery in certain areas but still facing challenges from pollution, overfishing, and acidification. Marine protected areas are helping."
-                sources = ["Ocean Health Index", "UNEP Marine Assessment"]
-                suggestions = ["What threatens ocean health?", "How can we protect marine ecosystems?"]
-                
-            else:
-                response = "I'm here to help you understand Earth's environmental status. You can ask me about temperature, CO2 levels, forest cover, ocean health, or any other environmental topics."
-                sources = ["GaiaPulse Environmental Database"]
-                suggestions = ["Tell me about global temperature trends", "What's the current CO2 level?", "How is forest cover changing?"]
+            # Answer on the best hit's topic, current readings first
+            topic = hits[0][0].topic
+            passages = [passage for passage, _ in hits if passage.topic == topic]
+            passages.sort(key=lambda passage: passage.kind == "fact")
+            sources = list(dict.fromkeys(passage.source for passage in passages))
+            grounded = any(passage.kind != "fact" for passage in passages)
             
             return ChatResponse(
-                response=response,
-                confidence=0.9,
+                response=" ".join(passage.text for passage in passages),
+                confidence=0.9 if grounded else 0.8,
                 sources=sources,
-                suggestions=suggestions
+                suggestions=CHAT_SUGGESTIONS.get(topic, CHAT_SUGGESTIONS["general"])
             )
             
         except Exception as e:
-            logger.error(f"Error generating chat response: {e}")
+            logger.error("Error generating chat response: %s", e)
             return ChatResponse(
                 response="I'm experiencing technical difficulties. Please try again in a moment.",
                 confidence=0.3,
@@ -158,6 +131,7 @@ class AIService:
                 suggestions=["Try asking about temperature", "Ask about CO2 levels"]
             )
     
+    @traced("ai_service.predict_future_trends")
     async def predict_future_trends(self, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Predict future environmental trends using AI models"""
         try:
@@ -173,7 +147,7 @@ class AIService:
                 "key_factors": ["emissions", "policy_changes", "technological_advances"]
             }
         except Exception as e:
-            logger.error(f"Error in trend prediction: {e}")
+            logger.error("Error in trend prediction: %s", e)
             return {
                 "error": "Prediction service temporarily unavailable",
                 "confidence": 0.0
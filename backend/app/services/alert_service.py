@@ -0,0 +1,456 @@
+"""
+Alert engine evaluating threshold, rate-of-change and duration rules on ingest
+"""
+import bisect
+import heapq
+import json
+import logging
+import math
+import operator
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from app.config.settings import settings
+from app.models.schemas import Alert
+
+logger = logging.getLogger(__name__)
+
+# Default rules mirror the thresholds used by the environmental metrics and mood scoring
+DEFAULT_ALERT_RULES: List[Dict[str, Any]] = [
+    {"id": "co2-elevated", "metric": "co2_levels", "kind": "threshold", "op": ">", "value": 350, "severity": "warning"},
+    {"id": "co2-critical", "metric": "co2_levels", "kind": "threshold", "op": ">", "value": 450, "severity": "critical"},
+    {"id": "co2-rising-fast", "metric": "co2_levels", "kind": "rate_of_change", "op": ">", "value": 5.0, "severity": "warning"},
+    {"id": "temperature-high", "metric": "temperature", "kind": "duration", "op": ">", "value": 16, "for_seconds": 600, "severity": "warning"},
+    {"id": "temperature-low", "metric": "temperature", "kind": "duration", "op": "<", "value": 13, "for_seconds": 600, "severity": "warning"},
+    {"id": "forest-cover-low", "metric": "forest_cover", "kind": "threshold", "op": "<", "value": 30, "severity": "warning"},
+    {"id": "ocean-health-low", "metric": "ocean_health", "kind": "threshold", "op": "<", "value": 70, "severity": "warning"},
+    {"id": "air-quality-unhealthy", "metric": "air_quality_index", "kind": "threshold", "op": ">", "value": 100, "severity": "warning"},
+]
+
+RULE_KINDS = ("threshold", "rate_of_change", "duration")
+SEVERITIES = ("info", "warning", "critical")
+
+_OPS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+_ABOVE_OPS = (">", ">=")
+
+GLOBAL_SERIES = "global"
+
+
+def _epoch(timestamp: Union[datetime, float, int, None]) -> float:
+    """Convert a datetime (naive values are UTC) or epoch seconds to epoch seconds"""
+    if timestamp is None:
+        return time.time()
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return timestamp.timestamp()
+    return float(timestamp)
+
+
+class AlertRule:
+    """A single alert rule validated and compiled from its dict definition"""
+
+    __slots__ = ("id", "metric", "kind", "op", "threshold", "for_seconds", "severity", "message", "series", "_compare")
+
+    def __init__(
+        self,
+        id: str,
+        metric: str,
+        kind: str = "threshold",
+        op: str = ">",
+        value: float = 0.0,
+        for_seconds: float = 0,
+        severity: str = "warning",
+        message: Optional[str] = None,
+        series: Optional[str] = None
+    ):
+        if kind not in RULE_KINDS:
+            raise ValueError(f"Rule {id}: unknown kind '{kind}'")
+        if op not in _OPS:
+            raise ValueError(f"Rule {id}: unknown operator '{op}'")
+        if severity not in SEVERITIES:
+            raise ValueError(f"Rule {id}: unknown severity '{severity}'")
+        if kind == "duration" and for_seconds <= 0:
+            raise ValueError(f"Rule {id}: duration rules need a positive for_seconds")
+
+        self.id = id
+        self.metric = metric
+        self.kind = kind
+        self.op = op
+        self.threshold = float(value)
+        self.for_seconds = float(for_seconds)
+        self.severity = severity
+        self.message = message
+        self.series = series
+        self._compare = _OPS[op]
+
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any]) -> "AlertRule":
+        """Build a rule from its JSON/dict definition"""
+        try:
+            return cls(**spec)
+        except TypeError as e:
+            raise ValueError(f"Invalid alert rule {spec.get('id', spec)}: {e}") from e
+
+    @property
+    def signal(self) -> str:
+        """Which per-series signal the rule watches ('value' or 'rate')"""
+        return "rate" if self.kind == "rate_of_change" else "value"
+
+    @property
+    def direction(self) -> str:
+        """Whether the rule fires above or below its threshold"""
+        return "above" if self.op in _ABOVE_OPS else "below"
+
+    def holds(self, observed: float) -> bool:
+        """Check whether the rule condition holds for an observed signal value"""
+        return self._compare(observed, self.threshold)
+
+    def describe(self, series: str, observed: float) -> str:
+        """Human readable alert message"""
+        if self.message:
+            return self.message.format(metric=self.metric, series=series, value=observed, threshold=self.threshold)
+        relation = "above" if self.direction == "above" else "below"
+        if self.kind == "rate_of_change":
+            text = f"{self.metric} changing at {observed:.2f} per hour, {relation} {self.threshold:g}"
+        else:
+            text = f"{self.metric} at {observed:.2f}, {relation} {self.threshold:g}"
+        if self.kind == "duration":
+            text += f" for over {self.for_seconds / 60:g} minutes"
+        if series != GLOBAL_SERIES:
+            text += f" ({series})"
+        return text
+
+
+class _RuleGroup:
+    """Rules sharing a metric, signal and direction, sorted by threshold"""
+
+    __slots__ = ("thresholds", "rules", "direction")
+
+    def __init__(self, direction: str):
+        self.direction = direction
+        self.thresholds: List[float] = []
+        self.rules: List[AlertRule] = []
+
+    def add(self, rule: AlertRule) -> None:
+        index = bisect.bisect_right(self.thresholds, rule.threshold)
+        self.thresholds.insert(index, rule.threshold)
+        self.rules.insert(index, rule)
+
+    def crossed(self, previous: Optional[float], current: float) -> List[AlertRule]:
+        """Rules whose condition may differ between the previous and current signal.
+
+        Only rules with a threshold between the two values can change state, so
+        this is a pair of bisects plus the rules actually touched. A missing
+        previous value behaves as -inf/+inf, i.e. "no rule was holding".
+        """
+        if previous is None:
+            previous = -math.inf if self.direction == "above" else math.inf
+        low, high = (previous, current) if previous <= current else (current, previous)
+        start = bisect.bisect_left(self.thresholds, low)
+        end = bisect.bisect_right(self.thresholds, high)
+        return self.rules[start:end]
+
+
+class _SeriesState:
+    """Per-series evaluation state"""
+
+    __slots__ = ("value", "timestamp", "rate", "rate_ref_value", "rate_ref_timestamp", "pending", "due")
+
+    def __init__(self):
+        self.value: Optional[float] = None
+        self.timestamp: Optional[float] = None
+        self.rate: Optional[float] = None
+        self.rate_ref_value: Optional[float] = None
+        self.rate_ref_timestamp: Optional[float] = None
+        # Duration rules whose condition holds but have not fired yet: rule id -> since
+        self.pending: Dict[str, float] = {}
+        # Min-heap of (due timestamp, rule id, since) for pending duration rules
+        self.due: List[Tuple[float, str, float]] = []
+
+
+class AlertStore:
+    """Indexed in-memory store of active and recently resolved alerts"""
+
+    def __init__(self, max_resolved: int = 1000):
+        self.max_resolved = max_resolved
+        self._alerts: Dict[str, Alert] = {}
+        self._active: Dict[Tuple[str, str], str] = {}
+        # (epoch, alert id) kept sorted for cursor pagination
+        self._index: List[Tuple[float, str]] = []
+        self._resolved: deque = deque()
+
+    @property
+    def active_count(self) -> int:
+        return len(self._active)
+
+    def get(self, alert_id: str) -> Optional[Alert]:
+        return self._alerts.get(alert_id)
+
+    def active_for(self, rule_id: str, series: str) -> Optional[Alert]:
+        alert_id = self._active.get((rule_id, series))
+        return self._alerts.get(alert_id) if alert_id else None
+
+    def active_keys(self) -> List[Tuple[str, str]]:
+        return list(self._active)
+
+    def add(self, alert: Alert, rule_id: str, series: str) -> None:
+        self._alerts[alert.id] = alert
+        self._active[(rule_id, series)] = alert.id
+        bisect.insort(self._index, (_epoch(alert.timestamp), alert.id))
+
+    def resolve(self, rule_id: str, series: str, timestamp: float) -> Optional[Alert]:
+        alert_id = self._active.pop((rule_id, series), None)
+        if alert_id is None:
+            return None
+        alert = self._alerts[alert_id]
+        alert.resolved = True
+        alert.resolved_at = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+        self._resolved.append(alert_id)
+        while len(self._resolved) > self.max_resolved:
+            self._forget(self._resolved.popleft())
+        return alert
+
+    def _forget(self, alert_id: str) -> None:
+        alert = self._alerts.pop(alert_id)
+        key = (_epoch(alert.timestamp), alert_id)
+        index = bisect.bisect_left(self._index, key)
+        if index < len(self._index) and self._index[index] == key:
+            del self._index[index]
+
+    def page(
+        self,
+        limit: int,
+        before: Optional[Tuple[float, str]] = None,
+        status: str = "all",
+        severity: Optional[str] = None
+    ) -> Tuple[List[Alert], Optional[Tuple[float, str]]]:
+        """Return up to `limit` alerts newest first, strictly older than `before`"""
+        position = bisect.bisect_left(self._index, before) if before else len(self._index)
+        items: List[Alert] = []
+        while position > 0:
+            position -= 1
+            alert = self._alerts[self._index[position][1]]
+            if status == "active" and alert.resolved:
+                continue
+            if status == "resolved" and not alert.resolved:
+                continue
+            if severity and alert.severity != severity:
+                continue
+            if len(items) == limit:
+                # There is at least one more match, so hand out a cursor
+                last = items[-1]
+                return items, (_epoch(last.timestamp), last.id)
+            items.append(alert)
+        return items, None
+
+
+class AlertEngine:
+    """Incremental alert evaluator over a compiled rule plan"""
+
+    def __init__(self, rate_min_interval: float = 300, max_resolved: int = 1000):
+        self.rate_min_interval = rate_min_interval
+        self.store = AlertStore(max_resolved=max_resolved)
+        self._rules: Dict[str, AlertRule] = {}
+        # (metric, series or None) -> (signal, direction) -> sorted rule group
+        self._plan: Dict[Tuple[str, Optional[str]], Dict[Tuple[str, str], _RuleGroup]] = {}
+        self._metrics: set = set()
+        self._series: Dict[Tuple[str, str], _SeriesState] = {}
+        # Makes alert ids unique when a rule re-fires within the same second
+        self._fired = 0
+
+    @property
+    def rule_count(self) -> int:
+        return len(self._rules)
+
+    def load_rules(self, specs: List[Union[Dict[str, Any], AlertRule]]) -> None:
+        """Compile rules into the evaluation plan, replacing any existing rules"""
+        rules: Dict[str, AlertRule] = {}
+        for spec in specs:
+            rule = spec if isinstance(spec, AlertRule) else AlertRule.from_dict(spec)
+            if rule.id in rules:
+                raise ValueError(f"Duplicate alert rule id '{rule.id}'")
+            rules[rule.id] = rule
+
+        plan: Dict[Tuple[str, Optional[str]], Dict[Tuple[str, str], _RuleGroup]] = {}
+        for rule in rules.values():
+            groups = plan.setdefault((rule.metric, rule.series), {})
+            group = groups.get((rule.signal, rule.direction))
+            if group is None:
+                group = groups[(rule.signal, rule.direction)] = _RuleGroup(rule.direction)
+            group.add(rule)
+
+        self._rules = rules
+        self._plan = plan
+        self._metrics = {rule.metric for rule in rules.values()}
+        self._reevaluate_all()
+        logger.info("Loaded %d alert rules across %d metrics", len(rules), len(self._metrics))
+
+    def ingest(
+        self,
+        metric: str,
+        value: float,
+        timestamp: Union[datetime, float, None] = None,
+        series: str = GLOBAL_SERIES
+    ) -> List[Alert]:
+        """Evaluate one new sample, returning alerts that fired or resolved"""
+        if metric not in self._metrics or not math.isfinite(value):
+            return []
+        ts = _epoch(timestamp)
+        key = (metric, series)
+        state = self._series.get(key)
+        if state is None:
+            state = self._series[key] = _SeriesState()
+        elif state.timestamp is not None and ts < state.timestamp:
+            # Out-of-order sample; alerts only move forward in time
+            return []
+
+        changed: List[Alert] = []
+        groups = self._groups_for(metric, series)
+
+        previous_value = state.value
+        state.value, state.timestamp = value, ts
+        for (signal, _), group in groups:
+            if signal == "value":
+                self._apply_crossings(state, group.crossed(previous_value, value), previous_value, value, series, ts, changed)
+
+        if state.rate_ref_timestamp is None:
+            state.rate_ref_value, state.rate_ref_timestamp = value, ts
+        elif ts - state.rate_ref_timestamp >= self.rate_min_interval:
+            previous_rate = state.rate
+            rate = (value - state.rate_ref_value) / ((ts - state.rate_ref_timestamp) / 3600)
+            state.rate = rate
+            state.rate_ref_value, state.rate_ref_timestamp = value, ts
+            for (signal, _), group in groups:
+                if signal == "rate":
+                    self._apply_crossings(state, group.crossed(previous_rate, rate), previous_rate, rate, series, ts, changed)
+
+        while state.due and state.due[0][0] <= ts:
+            _, rule_id, since = heapq.heappop(state.due)
+            if state.pending.get(rule_id) == since:
+                del state.pending[rule_id]
+                alert = self._fire(self._rules[rule_id], series, ts, value)
+                if alert is not None:
+                    changed.append(alert)
+        return changed
+
+    def ingest_snapshot(self, data: Dict[str, Any], series: str = GLOBAL_SERIES) -> List[Alert]:
+        """Evaluate every numeric metric of an environmental data snapshot"""
+        timestamp = data.get("timestamp")
+        changed: List[Alert] = []
+        for metric in self._metrics:
+            value = data.get(metric)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                changed.extend(self.ingest(metric, float(value), timestamp, series))
+        return changed
+
+    def list_alerts(
+        self,
+        limit: int = 50,
+        before: Optional[Tuple[float, str]] = None,
+        status: str = "all",
+        severity: Optional[str] = None
+    ) -> Tuple[List[Alert], Optional[Tuple[float, str]]]:
+        """Page through retained alerts, newest first"""
+        return self.store.page(limit, before=before, status=status, severity=severity)
+
+    def _groups_for(self, metric: str, series: str) -> List[Tuple[Tuple[str, str], _RuleGroup]]:
+        groups = list(self._plan.get((metric, None), {}).items())
+        groups.extend(self._plan.get((metric, series), {}).items())
+        return groups
+
+    def _apply_crossings(
+        self,
+        state: _SeriesState,
+        candidates: List[AlertRule],
+        previous: Optional[float],
+        current: float,
+        series: str,
+        ts: float,
+        changed: List[Alert]
+    ) -> None:
+        for rule in candidates:
+            was = previous is not None and rule.holds(previous)
+            now = rule.holds(current)
+            if was == now:
+                continue
+            if now:
+                if rule.for_seconds > 0:
+                    state.pending[rule.id] = ts
+                    heapq.heappush(state.due, (ts + rule.for_seconds, rule.id, ts))
+                    continue
+                alert = self._fire(rule, series, ts, current)
+            else:
+                state.pending.pop(rule.id, None)
+                alert = self.store.resolve(rule.id, series, ts)
+            if alert is not None:
+                changed.append(alert)
+
+    def _fire(self, rule: AlertRule, series: str, ts: float, observed: float) -> Optional[Alert]:
+        existing = self.store.active_for(rule.id, series)
+        if existing is not None:
+            # Deduplicate: keep the original alert and refresh its reading
+            existing.value = observed
+            return None
+        self._fired += 1
+        alert = Alert(
+            id=f"{rule.id}:{series}:{int(ts)}:{self._fired}",
+            type=rule.kind,
+            severity=rule.severity,
+            message=rule.describe(series, observed),
+            location=None if series == GLOBAL_SERIES else series,
+            timestamp=datetime.fromtimestamp(ts, tz=timezone.utc),
+            rule_id=rule.id,
+            metric=rule.metric,
+            value=observed,
+            threshold=rule.threshold
+        )
+        self.store.add(alert, rule.id, series)
+        return alert
+
+    def _reevaluate_all(self) -> None:
+        """Re-check known series against a freshly loaded plan"""
+        for rule_id, series in self.store.active_keys():
+            if rule_id not in self._rules:
+                self.store.resolve(rule_id, series, time.time())
+
+        for (metric, series), state in self._series.items():
+            state.pending.clear()
+            state.due.clear()
+            if state.value is None or metric not in self._metrics:
+                continue
+            changed: List[Alert] = []
+            for (signal, _), group in self._groups_for(metric, series):
+                current = state.value if signal == "value" else state.rate
+                if current is None:
+                    continue
+                self._apply_crossings(state, group.crossed(None, current), None, current, series, state.timestamp, changed)
+                for rule in group.rules:
+                    if not rule.holds(current):
+                        self.store.resolve(rule.id, series, state.timestamp)
+
+
+def load_alert_rules(path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Load rule definitions from a JSON file, falling back to the defaults"""
+    path = path or settings.alert_rules_file
+    if not path:
+        return DEFAULT_ALERT_RULES
+    try:
+        with open(path) as f:
+            rules = json.load(f)
+        if not isinstance(rules, list):
+            raise ValueError("alert rules file must contain a JSON list")
+        return rules
+    except Exception as e:
+        logger.error("Error loading alert rules from %s: %s", path, e)
+        return DEFAULT_ALERT_RULES
+
+
+# Global alert engine instance
+alert_engine = AlertEngine(
+    rate_min_interval=settings.alert_rate_min_interval,
+    max_resolved=settings.alert_history_size
+)
+alert_engine.load_rules(load_alert_rules())
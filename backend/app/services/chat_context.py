@@ -0,0 +1,476 @@
+"""
+Retrieval for chat: in-memory BM25 index over climate facts and live metrics
+"""
+import heapq
+import itertools
+import json
+import logging
+import math
+import operator
+import re
+import time
+from bisect import bisect_left
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.config.settings import settings
+from app.core.executor import compute_executor
+from app.models.timeseries import FLOAT, TimeSeries
+from app.services.data_service import HISTORY_STEP, DataService, build_pulse_series
+
+logger = logging.getLogger(__name__)
+
+# Local fact sheets; CHAT_CORPUS_FILE can add more passages in the same shape
+DEFAULT_CLIMATE_FACTS: List[Dict[str, Any]] = [
+    {"id": "temperature-baseline", "topic": "temperature", "source": "NASA GISTEMP",
+     "text": "Earth's global average surface temperature has risen about 1.2 °C above the pre-industrial (1850-1900) baseline, with most of the warming since 1975."},
+    {"id": "temperature-paris", "topic": "temperature", "source": "UNFCCC Paris Agreement",
+     "text": "The Paris Agreement aims to hold global warming well below 2 °C above pre-industrial levels and to pursue efforts to limit it to the 1.5 °C threshold."},
+    {"id": "temperature-records", "topic": "temperature", "source": "NOAA NCEI",
+     "text": "The ten warmest years in the instrumental temperature record have all occurred since 2014, and 2024 was the warmest year on record, surpassing 2023."},
+    {"id": "temperature-pathway", "topic": "temperature", "source": "IPCC AR6 WGIII",
+     "text": "Limiting global warming to 1.5 °C requires greenhouse gas emissions to fall by about 43% from 2019 levels by 2030 and net zero CO2 emissions around 2050."},
+    {"id": "temperature-heatwaves", "topic": "temperature", "source": "IPCC AR6 WGI",
+     "text": "Heatwaves and hot extremes have become more frequent and more intense over most land regions since the 1950s, and human-caused climate change is the main driver."},
+    {"id": "co2-preindustrial", "topic": "co2_levels", "source": "NOAA Global Monitoring Laboratory",
+     "text": "Atmospheric CO2 (carbon dioxide) was about 280 ppm before the industrial revolution; it passed 420 ppm in 2023, roughly 50% higher."},
+    {"id": "co2-millions-of-years", "topic": "co2_levels", "source": "IPCC AR6 WGI",
+     "text": "Today's CO2 concentrations are higher than at any time in at least 2 million years, and the carbon dioxide increase is driving climate change."},
+    {"id": "co2-keeling-curve", "topic": "co2_levels", "source": "Mauna Loa Observatory",
+     "text": "The Keeling Curve of CO2 measured at Mauna Loa since 1958 has a seasonal cycle: carbon dioxide peaks around May and falls until about October as northern vegetation grows."},
+    {"id": "co2-sources", "topic": "co2_levels", "source": "Global Carbon Project",
+     "text": "Burning fossil fuels and cement production account for roughly 90% of human CO2 emissions; land-use change, mainly deforestation, makes up the rest. These are the main sources of carbon emissions."},
+    {"id": "co2-sinks", "topic": "co2_levels", "source": "Global Carbon Project",
+     "text": "Oceans and land ecosystems absorb roughly half of the carbon dioxide humans emit each year; the rest accumulates in the atmosphere and raises CO2 levels."},
+    {"id": "co2-methane", "topic": "co2_levels", "source": "UNEP",
+     "text": "Methane is the second largest contributor to global warming after CO2 and is about 80 times more potent than carbon dioxide over 20 years."},
+    {"id": "forest-extent", "topic": "forest_cover", "source": "FAO Global Forest Resources Assessment",
+     "text": "Forests cover about 31% of the world's land area, roughly 4.06 billion hectares of forest cover."},
+    {"id": "forest-loss-rate", "topic": "forest_cover", "source": "FAO Global Forest Resources Assessment",
+     "text": "Deforestation removed around 10 million hectares of forest per year between 2015 and 2020, down from 16 million hectares per year in the 1990s."},
+    {"id": "forest-drivers", "topic": "forest_cover", "source": "FAO",
+     "text": "Agricultural expansion drives almost 90% of global deforestation, mostly cropland and cattle grazing in tropical forest regions."},
+    {"id": "forest-regions", "topic": "forest_cover", "source": "Global Forest Watch",
+     "text": "Tropical primary forest loss is concentrated in Brazil, the Democratic Republic of the Congo and Bolivia, the regions most affected by deforestation."},
+    {"id": "forest-carbon-sink", "topic": "forest_cover", "source": "Global Forest Watch",
+     "text": "Forests are a net carbon sink, absorbing about 7.6 billion tonnes of CO2 per year; protecting forests and restoring degraded land keeps that carbon out of the atmosphere."},
+    {"id": "ocean-heat", "topic": "ocean_health", "source": "IPCC AR6 WGI",
+     "text": "The ocean has absorbed more than 90% of the excess heat trapped by greenhouse gases since the 1970s, warming marine ecosystems at every depth."},
+    {"id": "ocean-acidification", "topic": "ocean_health", "source": "NOAA Ocean Acidification Program",
+     "text": "Ocean acidification: surface ocean pH has fallen from about 8.2 to 8.1 since pre-industrial times, roughly a 30% increase in acidity that threatens shell-building marine life."},
+    {"id": "ocean-heatwaves", "topic": "ocean_health", "source": "IPCC SROCC",
+     "text": "Marine heatwaves have roughly doubled in frequency since the 1980s and threaten ocean health, coral reefs and fisheries."},
+    {"id": "ocean-protected-areas", "topic": "ocean_health", "source": "Protected Planet",
+     "text": "About 8% of the ocean lies in marine protected areas; the Kunming-Montreal biodiversity framework targets protecting 30% of the ocean by 2030."},
+    {"id": "ocean-coral-reefs", "topic": "ocean_health", "source": "NOAA",
+     "text": "Coral reefs cover less than 1% of the ocean floor but support about a quarter of all marine species."},
+    {"id": "ocean-overfishing", "topic": "ocean_health", "source": "FAO State of World Fisheries",
+     "text": "Overfishing threatens ocean health: about 35% of assessed marine fish stocks are fished at biologically unsustainable levels."},
+    {"id": "sea-level-rise", "topic": "sea_level_rise", "source": "NOAA Climate.gov",
+     "text": "Global mean sea level has risen about 21-24 cm since 1880, and the rate of sea level rise has more than doubled to about 3.6 mm per year."},
+    {"id": "air-quality-health", "topic": "air_quality_index", "source": "WHO",
+     "text": "Air pollution causes around 7 million premature deaths a year, and 99% of people breathe air that exceeds WHO air quality guideline limits."},
+    {"id": "air-quality-scale", "topic": "air_quality_index", "source": "US EPA AirNow",
+     "text": "The air quality index (AQI) runs from 0 to 500: 0-50 is good, 51-100 moderate, 101-150 unhealthy for sensitive groups and above 150 unhealthy."},
+    {"id": "biodiversity-populations", "topic": "biodiversity_index", "source": "WWF Living Planet Report",
+     "text": "Monitored wildlife populations have declined by an average of 73% since 1970, a key measure of biodiversity loss."},
+    {"id": "biodiversity-extinction", "topic": "biodiversity_index", "source": "IPBES Global Assessment",
+     "text": "Around 1 million animal and plant species are threatened with extinction, many within decades, driven by land use, exploitation and climate change."},
+    {"id": "renewables-share", "topic": "renewable_energy_share", "source": "Ember Global Electricity Review",
+     "text": "Renewable energy supplied about 30% of global electricity generation in 2023, led by hydropower, wind and solar power."},
+    {"id": "renewables-cost", "topic": "renewable_energy_share", "source": "IRENA",
+     "text": "The cost of solar PV electricity fell by about 90% between 2010 and 2023, making renewables the cheapest new power in most countries."},
+    {"id": "actions-footprint", "topic": "actions", "source": "Environmental Research Letters",
+     "text": "The largest personal carbon footprint reductions come from living car-free, avoiding long-haul flights, switching to renewable electricity and eating a plant-rich diet."},
+    {"id": "actions-buildings", "topic": "actions", "source": "IEA",
+     "text": "Buildings use around 30% of global final energy; heat pumps, insulation and efficient appliances are among the most effective ways to reduce their emissions."},
+]
+
+# Live metric passages: labels and sentence templates per snapshot field
+LIVE_TEMPLATES: Dict[str, str] = {
+    "temperature": "Current global temperature: the latest surface temperature reading is {value:.1f} °C ({when}).",
+    "co2_levels": "Current CO2 level: the atmospheric carbon dioxide concentration is {value:.1f} ppm right now ({when}).",
+    "forest_cover": "Current forest cover: forests cover {value:.1f}% of land area in the latest reading ({when}).",
+    "ocean_health": "Current ocean health: the ocean health index for marine ecosystems stands at {value:.1f} out of 100 ({when}).",
+    "air_quality_index": "Current air quality: the air quality index (AQI) is {value:.0f} ({when}).",
+    "sea_level_rise": "Current sea level rise: sea level is rising {value:.2f} mm per year ({when}).",
+    "biodiversity_index": "Current biodiversity: the biodiversity index for species and wildlife is {value:.1f} out of 100 ({when}).",
+    "renewable_energy_share": "Current renewable energy: renewables supply {value:.1f}% of energy ({when}).",
+}
+
+METRIC_LABELS: Dict[str, str] = {
+    "temperature": "Temperature",
+    "temperature_anomaly": "Temperature anomaly",
+    "co2_levels": "CO2 level",
+    "forest_cover": "Forest cover",
+    "ocean_health": "Ocean health",
+    "air_quality_index": "Air quality index",
+    "sea_level_rise": "Sea level rise",
+    "biodiversity_index": "Biodiversity index",
+    "renewable_energy_share": "Renewable energy share",
+}
+
+METRIC_UNITS: Dict[str, str] = {
+    "temperature": "°C",
+    "temperature_anomaly": "°C",
+    "co2_levels": "ppm",
+}
+
+LIVE_SOURCE = "GaiaPulse live data"
+HISTORY_SOURCE = "GaiaPulse history"
+HISTORY_WINDOWS = (7, 30)
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+_STOPWORDS = frozenset(
+    "a about above after again all also am an and any are as at be been being below between both but by can could "
+    "did do does doing down during each few for from further had has have having he her here hers how i if in into "
+    "is it its itself just me more most my no nor not now of off on once only or other our out over own same she "
+    "should so some such than that the their them then there these they this those through to too under until up "
+    "very was we were what when where which while who whom why will with would you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word and number tokens without stopwords, plurals folded"""
+    tokens = []
+    for token in _TOKEN.findall(text.lower().replace("₂", "2")):
+        if token in _STOPWORDS:
+            continue
+        if len(token) > 4 and token.endswith("ies"):
+            token = token[:-3] + "y"
+        elif len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class Passage:
+    """A retrievable piece of text with its provenance"""
+
+    __slots__ = ("id", "text", "source", "topic", "kind")
+
+    def __init__(self, id: str, text: str, source: str, topic: str = "general", kind: str = "fact"):
+        self.id = id
+        self.text = text
+        self.source = source
+        self.topic = topic
+        # fact (static corpus), live (current snapshot) or history (window summary)
+        self.kind = kind
+
+
+class BM25Index:
+    """Inverted index with Okapi BM25 scoring and per-passage updates.
+
+    Term weights (idf times the saturated, length-normalised term frequency)
+    are cached per term, sorted by weight, and dropped when the term's
+    postings change. Collection statistics are allowed to drift by
+    `refresh_drift` before every cached weight is recomputed, so replacing a
+    handful of live passages does not invalidate the whole index.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, refresh_drift: float = 0.05, max_candidates: int = 1024):
+        self.k1 = k1
+        self.b = b
+        self.refresh_drift = refresh_drift
+        self.max_candidates = max_candidates
+        self._passages: Dict[int, Passage] = {}
+        self._doc_ids: Dict[str, int] = {}
+        self._next_doc = 0
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._doc_terms: Dict[int, Tuple[str, ...]] = {}
+        self._lengths: Dict[int, int] = {}
+        self._total_length = 0
+        self._weights: Dict[str, Tuple[List[int], List[float], Dict[int, float]]] = {}
+        self._stats = (0, 0.0)
+
+    def __len__(self) -> int:
+        return len(self._passages)
+
+    def __contains__(self, passage_id: str) -> bool:
+        return passage_id in self._doc_ids
+
+    def get(self, passage_id: str) -> Optional[Passage]:
+        doc = self._doc_ids.get(passage_id)
+        return None if doc is None else self._passages[doc]
+
+    def upsert(self, passage: Passage) -> bool:
+        """Add or replace a passage by id; returns False when its text is unchanged"""
+        current = self.get(passage.id)
+        if current is not None:
+            if current.text == passage.text:
+                self._passages[self._doc_ids[passage.id]] = passage
+                return False
+            self.remove(passage.id)
+
+        doc = self._next_doc
+        self._next_doc += 1
+        tokens = tokenize(passage.text)
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for term, tf in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+            postings[doc] = tf
+            self._weights.pop(term, None)
+        self._passages[doc] = passage
+        self._doc_ids[passage.id] = doc
+        self._doc_terms[doc] = tuple(counts)
+        self._lengths[doc] = len(tokens)
+        self._total_length += len(tokens)
+        return True
+
+    def remove(self, passage_id: str) -> bool:
+        doc = self._doc_ids.pop(passage_id, None)
+        if doc is None:
+            return False
+        for term in self._doc_terms.pop(doc):
+            postings = self._postings[term]
+            del postings[doc]
+            if not postings:
+                del self._postings[term]
+            self._weights.pop(term, None)
+        del self._passages[doc]
+        self._total_length -= self._lengths.pop(doc)
+        return True
+
+    def _check_stats(self) -> None:
+        count, avg_length = self._stats
+        current_count = len(self._passages)
+        current_avg = self._total_length / current_count if current_count else 0.0
+        if (
+            not count
+            or abs(current_count - count) > self.refresh_drift * count
+            or abs(current_avg - avg_length) > self.refresh_drift * avg_length
+        ):
+            self._weights.clear()
+            self._stats = (current_count, current_avg)
+
+    def _term_weights(self, term: str) -> Optional[Tuple[List[int], List[float], Dict[int, float]]]:
+        weights = self._weights.get(term)
+        if weights is None:
+            postings = self._postings.get(term)
+            if not postings:
+                return None
+            count, avg_length = self._stats
+            df = len(postings)
+            idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+            k1, b = self.k1, self.b
+            norm = k1 * (1 - b) if avg_length else k1
+            slope = k1 * b / avg_length if avg_length else 0.0
+            lengths = self._lengths
+            by_doc = {doc: idf * tf * (k1 + 1) / (tf + norm + slope * lengths[doc]) for doc, tf in postings.items()}
+            docs = sorted(by_doc, key=by_doc.__getitem__, reverse=True)
+            weights = self._weights[term] = (docs, [by_doc[doc] for doc in docs], by_doc)
+        return weights
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[Passage, float]]:
+        """Top-k passages for a free-text query, best first"""
+        if not self._passages or k <= 0:
+            return []
+        self._check_stats()
+        lists = [weights for weights in map(self._term_weights, dict.fromkeys(tokenize(query))) if weights]
+        if not lists:
+            return []
+        if len(lists) == 1:
+            # Postings are kept sorted by weight, so one term needs no scoring pass
+            docs, weights, _ = lists[0]
+            top = list(zip(docs[:k], weights[:k]))
+        else:
+            top = self._max_score_top(lists, k)
+        return [(self._passages[doc], score) for doc, score in top]
+
+    def _max_score_top(self, lists: List[Tuple[List[int], List[float], Dict[int, float]]], k: int) -> List[Tuple[int, float]]:
+        """Top-k without scoring every matching passage (MaxScore).
+
+        The k-th best score seen so far is a bound every result must reach.
+        Terms whose maximum weights together stay below it cannot lift a
+        passage into the top k, so their postings are only looked up, never
+        enumerated. The other postings are read in weight order, in growing
+        blocks, until the remaining weights cannot reach the bound either.
+
+        Queries made only of very common terms can match most of the corpus;
+        after `max_candidates` scored passages the best found so far are
+        returned (anytime ranking). Below that budget results are exact.
+        """
+        lookups = [by_doc for _, _, by_doc in lists]
+        ordered = sorted(lists, key=lambda entry: entry[1][0])
+        maxima = [weights[0] for _, weights, _ in ordered]
+        total = sum(maxima)
+
+        scored = set()
+        for docs, _, _ in lists:
+            scored.update(docs[:k])
+        best = _top_scores(list(scored), lookups, k)
+        positions = [0] * len(ordered)
+        block = 256
+        while len(scored) < self.max_candidates:
+            bound = best[-1][1] if len(best) >= k else 0.0
+            step = min(block, max((self.max_candidates - len(scored)) // len(ordered), k))
+            batch = []
+            ceiling = 0.0
+            for index, ((docs, weights, _), maximum) in enumerate(zip(ordered, maxima)):
+                ceiling += maximum
+                if ceiling < bound:
+                    continue
+                start = positions[index]
+                stop = min(start + step, len(docs))
+                cut = bound - (total - maximum)
+                if cut > 0:
+                    # Weights are descending: stop before the first one below the cut
+                    stop = bisect_left(weights, -cut, start, stop, key=operator.neg)
+                batch.extend(docs[start:stop])
+                positions[index] = stop
+            if not batch:
+                break
+            fresh = set(batch).difference(scored)
+            scored.update(fresh)
+            best = heapq.nlargest(k, itertools.chain(best, _top_scores(list(fresh), lookups, k)), key=operator.itemgetter(1))
+            block = min(block * 2, 4096)
+        return best
+
+
+def _top_scores(docs: List[int], lookups: List[Dict[int, float]], k: int) -> List[Tuple[int, float]]:
+    """Score passages against every term's weights and keep the best k"""
+    scores = list(map(lookups[0].get, docs, itertools.repeat(0.0)))
+    for lookup in lookups[1:]:
+        scores = list(map(operator.add, scores, map(lookup.get, docs, itertools.repeat(0.0))))
+    return heapq.nlargest(k, zip(docs, scores), key=operator.itemgetter(1))
+
+
+def load_climate_facts(path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Default fact sheets plus passages from a JSON file, if configured"""
+    path = path or settings.chat_corpus_file
+    if not path:
+        return DEFAULT_CLIMATE_FACTS
+    try:
+        with open(path) as f:
+            facts = json.load(f)
+        if not isinstance(facts, list):
+            raise ValueError("chat corpus file must contain a JSON list")
+        return DEFAULT_CLIMATE_FACTS + facts
+    except Exception as e:
+        logger.error("Error loading chat corpus from %s: %s", path, e)
+        return DEFAULT_CLIMATE_FACTS
+
+
+def _format_time(timestamp: Any) -> str:
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    if isinstance(timestamp, datetime):
+        return f"as of {timestamp:%Y-%m-%d %H:%M} UTC"
+    return "latest reading"
+
+
+def _summarize(label: str, unit: str, values: Sequence[float], days: int) -> Optional[str]:
+    """One-sentence summary of a metric over a history window"""
+    values = [value for value in values if value == value]
+    if len(values) < 4:
+        return None
+    quarter = len(values) // 4
+    change = sum(values[-quarter:]) / quarter - sum(values[:quarter]) / quarter
+    spread = max(values) - min(values)
+    if abs(change) < 0.05 * spread:
+        trend = "holding stable"
+    else:
+        trend = f"{'rising' if change > 0 else 'falling'} by about {abs(change):.1f} {unit}"
+    return (
+        f"{label} trend over the past {days} days: average {sum(values) / len(values):.1f} {unit}, "
+        f"ranging from {min(values):.1f} to {max(values):.1f} {unit}, {trend}."
+    )
+
+
+class ChatContext:
+    """Keeps the chat index in step with the latest snapshot and history windows"""
+
+    def __init__(self, facts: List[Dict[str, Any]], max_age: float = 300):
+        self.index = BM25Index()
+        self.max_age = max_age
+        self.refreshed_at = 0.0
+        self._history_ends: Dict[int, Any] = {}
+        for fact in facts:
+            self.index.upsert(Passage(
+                id=f"fact:{fact['id']}",
+                text=fact["text"],
+                source=fact.get("source", "GaiaPulse"),
+                topic=fact.get("topic", "general")
+            ))
+
+    def update_snapshot(self, data: Dict[str, Any]) -> int:
+        """Index the snapshot's metrics as live passages; returns passages changed"""
+        when = _format_time(data.get("timestamp"))
+        changed = 0
+        for metric, template in LIVE_TEMPLATES.items():
+            value = data.get(metric)
+            if not isinstance(value, (int, float)):
+                continue
+            changed += self.index.upsert(Passage(
+                id=f"live:{metric}",
+                text=template.format(value=value, when=when),
+                source=LIVE_SOURCE,
+                topic=metric,
+                kind="live"
+            ))
+        return changed
+
+    def update_history(self, days: int, metric: str, series: TimeSeries) -> int:
+        """Index trend summaries of a history window (value and numeric side columns)"""
+        columns = [(metric, series.values)] + [
+            (name, column) for name, (kind, column) in series.columns.items() if kind == FLOAT
+        ]
+        changed = 0
+        for name, values in columns:
+            label = METRIC_LABELS.get(name, name.replace("_", " ").capitalize())
+            text = _summarize(label, METRIC_UNITS.get(name, ""), values, days)
+            if text is not None:
+                changed += self.index.upsert(Passage(
+                    id=f"history:{days}:{name}",
+                    text=text,
+                    source=HISTORY_SOURCE,
+                    topic=name,
+                    kind="history"
+                ))
+        return changed
+
+    async def refresh(self, data_service: DataService, data: Optional[Dict[str, Any]] = None) -> None:
+        """Re-index live passages, and history summaries whose window moved"""
+        started = time.perf_counter()
+        if data is None:
+            data = await data_service.get_current_environmental_data()
+        changed = self.update_snapshot(data)
+        for days in HISTORY_WINDOWS:
+            first, last, _ = data_service.resolve_history_window(days, None, None, None, None)
+            if self._history_ends.get(days) == last:
+                continue
+            series = await compute_executor.run(
+                build_pulse_series,
+                first,
+                last,
+                HISTORY_STEP,
+                None,
+                data_service.history_backend,
+                data_service.history_metric,
+                cost=days * 24
+            )
+            changed += self.update_history(days, data_service.history_metric, series)
+            self._history_ends[days] = last
+        self.refreshed_at = time.time()
+        logger.debug(
+            "Chat index refreshed: %d passages changed in %.1f ms",
+            changed,
+            (time.perf_counter() - started) * 1000,
+            extra={"changed": changed, "passages": len(self.index)}
+        )
+
+    async def ensure_fresh(self, data_service: DataService) -> None:
+        """Refresh when the ingest loop has not done so recently (e.g. serving workers)"""
+        if time.time() - self.refreshed_at > self.max_age:
+            await self.refresh(data_service)
+
+    def search(self, query: str, k: Optional[int] = None) -> List[Tuple[Passage, float]]:
+        return self.index.search(query, k or settings.chat_top_k)
+
+
+# Global chat context instance
+chat_context = ChatContext(load_climate_facts(), max_age=settings.data_update_interval)
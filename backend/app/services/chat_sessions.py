@@ -0,0 +1,311 @@
+"""
+Chat conversation sessions with bounded memory
+"""
+import json
+import logging
+import secrets
+import struct
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+ROLE_USER = "user"
+ROLE_ASSISTANT = "assistant"
+_ROLE_CODES = {ROLE_USER: 0, ROLE_ASSISTANT: 1}
+_ROLES = (ROLE_USER, ROLE_ASSISTANT)
+
+# Turn record: role code and byte length, then the UTF-8 text
+_HEADER = struct.Struct("<BH")
+_MAX_TURN_BYTES = 0xFFFF
+
+# Bookkeeping per session besides its blobs (slots object, id string,
+# OrderedDict node and the bytes headers), measured with tracemalloc
+SESSION_OVERHEAD = 296
+
+
+def estimate_tokens(text_bytes: int) -> int:
+    """Rough token count from UTF-8 length (about four bytes per token)"""
+    return (text_bytes + 3) // 4
+
+
+def _encode_turn(role: str, text: str) -> bytes:
+    data = text.encode()[:_MAX_TURN_BYTES]
+    return _HEADER.pack(_ROLE_CODES[role], len(data)) + data
+
+
+def _iter_turns(blob: bytes):
+    offset = 0
+    while offset < len(blob):
+        code, length = _HEADER.unpack_from(blob, offset)
+        offset += _HEADER.size
+        yield code, blob[offset:offset + length]
+        offset += length
+
+
+class ChatSession:
+    """One conversation: turns packed into a single bytes ring plus a rolling summary"""
+
+    __slots__ = ("id", "blob", "summary", "turn_count", "last_access")
+
+    def __init__(self, session_id: str, blob: bytes = b"", summary: bytes = b"", turn_count: int = 0, last_access: Optional[float] = None):
+        self.id = session_id
+        self.blob = blob
+        self.summary = summary
+        self.turn_count = turn_count
+        self.last_access = last_access if last_access is not None else time.time()
+
+    @property
+    def nbytes(self) -> int:
+        return SESSION_OVERHEAD + len(self.blob) + len(self.summary)
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(len(self.blob) - self.turn_count * _HEADER.size + len(self.summary))
+
+    def turns(self) -> List[Tuple[str, str]]:
+        """(role, text) pairs, oldest first"""
+        return [(_ROLES[code], data.decode(errors="ignore")) for code, data in _iter_turns(self.blob)]
+
+    def summary_text(self) -> str:
+        return self.summary.decode(errors="ignore")
+
+    def append(self, role: str, text: str, max_turns: int, token_budget: int, summary_bytes: int) -> None:
+        """Add a turn, then drop the oldest turns until the turn and token limits hold.
+
+        Dropped user turns are folded into the summary (their opening words),
+        so later turns keep the gist of the conversation within the budget.
+        """
+        self.blob += _encode_turn(role, text)
+        self.turn_count += 1
+        if self.turn_count <= max_turns and self.tokens <= token_budget:
+            return
+
+        offset = 0
+        text_bytes = len(self.blob) - self.turn_count * _HEADER.size
+        folded = []
+        for code, data in _iter_turns(self.blob):
+            if self.turn_count == 1 or (
+                self.turn_count <= max_turns
+                and estimate_tokens(text_bytes + len(self.summary)) <= token_budget
+            ):
+                break
+            offset += _HEADER.size + len(data)
+            text_bytes -= len(data)
+            self.turn_count -= 1
+            if code == _ROLE_CODES[ROLE_USER]:
+                folded.append(data[:80].decode(errors="ignore").strip())
+        self.blob = self.blob[offset:]
+        if folded:
+            summary = "; ".join(filter(None, [self.summary_text(), *folded])).encode()
+            # Keep the most recent entries when the summary itself outgrows its share
+            if len(summary) > summary_bytes:
+                summary = summary[-summary_bytes:]
+                summary = summary.partition(b"; ")[2] or summary.decode(errors="ignore").encode()
+            self.summary = summary
+
+    def to_json(self) -> str:
+        return json.dumps({"turns": self.turns(), "summary": self.summary_text()})
+
+    @classmethod
+    def from_json(cls, session_id: str, payload: str) -> "ChatSession":
+        data = json.loads(payload)
+        session = cls(session_id, summary=data.get("summary", "").encode())
+        session.blob = b"".join(_encode_turn(role, text) for role, text in data.get("turns", []))
+        session.turn_count = len(data.get("turns", []))
+        return session
+
+
+class RedisSessionStore:
+    """Optional shared tier: every session is written through to Redis, so
+    any worker can continue a conversation that another one started"""
+
+    def __init__(self, url: str, ttl: float, prefix: str = "gaiapulse:chat:"):
+        import redis.asyncio as aioredis
+
+        self.ttl = ttl
+        self.prefix = prefix
+        self._client = aioredis.from_url(url)
+
+    async def save(self, session: ChatSession) -> None:
+        await self._client.set(self.prefix + session.id, session.to_json(), ex=max(1, int(self.ttl)))
+
+    async def load(self, session_id: str) -> Optional[ChatSession]:
+        payload = await self._client.get(self.prefix + session_id)
+        if payload is None:
+            return None
+        return ChatSession.from_json(session_id, payload.decode())
+
+    async def delete(self, session_id: str) -> None:
+        await self._client.delete(self.prefix + session_id)
+
+
+class ChatSessionStore:
+    """Sessions in LRU order under a global byte cap, expired after `ttl` idle seconds.
+
+    LRU order is also last-access order, so expiry only ever looks at the
+    oldest end. When the cap is exceeded the least recently used sessions
+    are evicted.
+
+    Without a shared tier sessions live in this process only, so a
+    multi-worker deployment needs sticky routing (serve.py enforces this).
+    With one, Redis holds the authoritative copy: `record` writes every
+    exchange through and `get` reads it back, so a follow-up may land on any
+    worker. Memory is then a cache, used when Redis is unavailable.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float = 1800,
+        max_turns: int = 16,
+        token_budget: int = 1024,
+        summary_tokens: int = 128,
+        shared: Optional[RedisSessionStore] = None
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.summary_bytes = summary_tokens * 4
+        self.shared = shared
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self.nbytes = 0
+        self.evicted = 0
+        self.expired = 0
+        self.written = 0
+        self.loaded = 0
+        self.shared_errors = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    @staticmethod
+    def new_id() -> str:
+        return secrets.token_urlsafe(16)
+
+    def _expire(self, now: float) -> None:
+        deadline = now - self.ttl
+        sessions = self._sessions
+        while sessions:
+            session = next(iter(sessions.values()))
+            if session.last_access >= deadline:
+                break
+            sessions.popitem(last=False)
+            self.nbytes -= session.nbytes
+            self.expired += 1
+
+    async def get(self, session_id: str) -> Optional[ChatSession]:
+        """Live session by id (from the shared tier when configured, else memory), or None"""
+        now = time.time()
+        self._expire(now)
+        if self.shared is not None:
+            # Another worker may have added turns since this one last saw it
+            try:
+                session = await self.shared.load(session_id)
+            except Exception as e:
+                self.shared_errors += 1
+                logger.error("Error loading chat session from Redis: %s", e)
+                session = None
+            if session is not None:
+                self.loaded += 1
+                self._discard(session_id)
+                await self._insert(session)
+                return session
+        session = self._sessions.get(session_id)
+        if session is not None:
+            self._sessions.move_to_end(session_id)
+            session.last_access = now
+        return session
+
+    async def record(self, session_id: str, session: Optional[ChatSession], user_text: str, assistant_text: str) -> ChatSession:
+        """Append one exchange to the session returned by `get` (None starts a new one)"""
+        if session is None:
+            session = ChatSession(session_id)
+        session.last_access = time.time()
+        if self._sessions.get(session_id) is session:
+            self._sessions.move_to_end(session_id)
+        else:
+            # New, or expired or evicted from memory while the answer was generated
+            self._discard(session_id)
+            await self._insert(session)
+        before = session.nbytes
+        session.append(ROLE_USER, user_text, self.max_turns, self.token_budget, self.summary_bytes)
+        session.append(ROLE_ASSISTANT, assistant_text, self.max_turns, self.token_budget, self.summary_bytes)
+        self.nbytes += session.nbytes - before
+        await self._enforce_cap(keep=session_id)
+        if self.shared is not None:
+            try:
+                await self.shared.save(session)
+                self.written += 1
+            except Exception as e:
+                self.shared_errors += 1
+                logger.error("Error writing chat session to Redis: %s", e)
+        return session
+
+    async def delete(self, session_id: str) -> bool:
+        session = self._discard(session_id)
+        if self.shared is not None:
+            try:
+                await self.shared.delete(session_id)
+            except Exception as e:
+                logger.error("Error deleting chat session from Redis: %s", e)
+        return session is not None
+
+    def _discard(self, session_id: str) -> Optional[ChatSession]:
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self.nbytes -= session.nbytes
+        return session
+
+    async def _insert(self, session: ChatSession) -> None:
+        self._sessions[session.id] = session
+        self.nbytes += session.nbytes
+        await self._enforce_cap(keep=session.id)
+
+    async def _enforce_cap(self, keep: str) -> None:
+        # Evicted sessions are simply dropped; with a shared tier Redis still has them
+        sessions = self._sessions
+        while self.nbytes > self.max_bytes and len(sessions) > 1:
+            session_id, session = sessions.popitem(last=False)
+            if session_id == keep:
+                sessions[session_id] = session
+                continue
+            self.nbytes -= session.nbytes
+            self.evicted += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "evicted": self.evicted,
+            "expired": self.expired,
+            "written": self.written,
+            "loaded": self.loaded,
+            "shared_errors": self.shared_errors,
+            "shared": self.shared is not None
+        }
+
+
+def _create_shared() -> Optional[RedisSessionStore]:
+    if not settings.chat_session_spill:
+        return None
+    if not settings.redis_configured:
+        logger.warning("CHAT_SESSION_SPILL is set but REDIS_URL is not configured; sessions stay in this worker")
+        return None
+    return RedisSessionStore(settings.redis_url, settings.chat_session_ttl)
+
+
+# Global chat session store instance
+chat_sessions = ChatSessionStore(
+    max_bytes=settings.chat_session_max_bytes,
+    ttl=settings.chat_session_ttl,
+    max_turns=settings.chat_session_max_turns,
+    token_budget=settings.chat_session_token_budget,
+    summary_tokens=settings.chat_session_summary_tokens,
+    shared=_create_shared()
+)
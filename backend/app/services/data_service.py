@@ -1,37 +1,206 @@
 """
 Data service for environmental data collection and processing
 """
+import asyncio
+import json
 import logging
 import random
 import math
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
-import httpx
+import threading
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 from app.config.settings import settings
+from app.core.executor import compute_executor, ExecutorBusyError, JobCancelledError
+from app.core.instrumentation import traced
+from app.core.pagination import encode_cursor, decode_cursor
 from app.models.schemas import Point, PulseHistory, EnvironmentalMetric, DataSource
+from app.models.timeseries import TimeSeries, FLOAT, STRING
+from app.services.alert_service import alert_engine
+from app.services.history_store import get_history_store
+from app.services.quality_service import quality_monitor
+from app.services.resilience import get_upstream_guard
+from app.core.shared_snapshot import get_snapshot_reader
 
 logger = logging.getLogger(__name__)
 
+# Pulse history is sampled hourly on aligned timestamps so that any window,
+# page or delta of the series is reproducible
+HISTORY_STEP = timedelta(hours=1)
+# Stored history is addressed at its native (second) resolution
+STORE_STEP = timedelta(seconds=1)
+MAX_HISTORY_SPAN = timedelta(days=365)
+_EPOCH = datetime(1970, 1, 1)
+# Typed side columns for the metadata every history sample carries
+HISTORY_COLUMNS = {"co2_levels": FLOAT, "data_quality": STRING}
+
+# Last shared snapshot this worker fed to its alert engine
+_alerted_snapshot_seq = 0
+
+
+def _to_naive_utc(timestamp: datetime) -> datetime:
+    """Normalise aware datetimes to the naive UTC used throughout the service"""
+    if timestamp.tzinfo is not None:
+        return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def _epoch_seconds(timestamp: datetime) -> float:
+    return (_to_naive_utc(timestamp) - _EPOCH).total_seconds()
+
+
+def _floor_to_step(timestamp: datetime, step: timedelta) -> datetime:
+    seconds = _epoch_seconds(timestamp)
+    return _EPOCH + timedelta(seconds=seconds - seconds % step.total_seconds())
+
+
+def _ceil_to_step(timestamp: datetime, step: timedelta) -> datetime:
+    floored = _floor_to_step(timestamp, step)
+    return floored if floored == timestamp else floored + step
+
+
+def _synthetic_sample(timestamp: datetime) -> Dict[str, Any]:
+    """Generate the historical sample for a timestamp as a plain dict.
+    
+    Seeding from the timestamp makes the series deterministic, so repeated,
+    paged and incremental queries agree with each other.
+    """
+    rng = random.Random(int(_epoch_seconds(timestamp)))
+    days_since_base = (_epoch_seconds(timestamp) - 1700000000) / 86400
+    
+    # Generate realistic historical data with trends and cycles
+    base_temp = 15.0
+    # Add daily and weekly cycles to temperature
+    hour_of_day = timestamp.hour + timestamp.minute / 60
+    day_of_week = timestamp.weekday()
+    daily_cycle = 2 * math.sin((hour_of_day / 24) * 2 * math.pi)
+    weekly_cycle = 1 * math.sin((day_of_week / 7) * 2 * math.pi)
+    temp_variation = rng.uniform(-1.5, 1.5)
+    warming_trend = days_since_base * 0.0001  # Gradual warming trend
+    temperature = base_temp + daily_cycle + weekly_cycle + temp_variation + warming_trend
+    
+    base_co2 = 420
+    # CO2 with daily patterns (lower during day due to photosynthesis)
+    co2_daily_pattern = -2 * math.sin((hour_of_day / 24) * 2 * math.pi)  # Lower during day
+    co2_variation = rng.uniform(-2, 2)
+    co2_trend = days_since_base * 0.01  # Gradual increase trend
+    co2_levels = base_co2 + co2_daily_pattern + co2_variation + co2_trend
+    
+    return {
+        "timestamp": timestamp,
+        "value": round(temperature, 1),
+        "unit": "°C",
+        "source": DataSource.SATELLITE,
+        "confidence": 0.85 + rng.uniform(-0.1, 0.1),
+        "metadata": {
+            "co2_levels": round(co2_levels, 1),
+            "data_quality": "high"
+        }
+    }
+
+
+def iter_history_samples(
+    first: datetime,
+    last: datetime,
+    step: timedelta,
+    max_points: Optional[int],
+    backend: str,
+    metric: str
+) -> Iterator[Dict[str, Any]]:
+    """Yield history samples from the configured backend in chronological order"""
+    if backend == "store":
+        yield from get_history_store().iter_samples(metric, first, last, max_points=max_points)
+        return
+    
+    timestamp = first
+    produced = 0
+    while timestamp <= last and (max_points is None or produced < max_points):
+        yield _synthetic_sample(timestamp)
+        timestamp += step
+        produced += 1
+
+
+def build_pulse_series(
+    first: datetime,
+    last: datetime,
+    step: timedelta,
+    max_points: Optional[int],
+    backend: str,
+    metric: str,
+    cancel: Optional[threading.Event] = None
+) -> TimeSeries:
+    """Materialise a history window as a compact series (runs inline or in the compute pool)"""
+    series = TimeSeries(HISTORY_COLUMNS)
+    append = series.append
+    for index, sample in enumerate(iter_history_samples(first, last, step, max_points, backend, metric)):
+        append(
+            sample["timestamp"],
+            sample["value"],
+            sample["unit"],
+            sample["source"],
+            sample.get("confidence"),
+            sample.get("metadata")
+        )
+        if cancel is not None and index % 256 == 255 and cancel.is_set():
+            raise JobCancelledError("History generation cancelled")
+    return series
+
 
 class DataService:
     """Service for collecting and processing environmental data"""
     
-    def __init__(self):
+    def __init__(self, use_snapshot: bool = True):
         self.nasa_api_key = settings.nasa_api_key
         self.weather_api_key = settings.weather_api_key
         self.air_quality_api_key = settings.air_quality_api_key
         self.enable_mock_data = settings.enable_mock_data
+        self.history_backend = settings.history_backend
+        self.history_metric = settings.history_metric
+        self.snapshot = get_snapshot_reader() if use_snapshot else None
         
+    @traced("data_service.get_current_environmental_data")
     async def get_current_environmental_data(self) -> Dict[str, Any]:
         """Get current environmental data from various sources"""
+        if self.snapshot is not None:
+            data = self._get_snapshot_environmental_data()
+            if data is not None:
+                return data
+        
         try:
             if self.enable_mock_data:
-                return await self._get_mock_environmental_data()
+                data = await self._get_mock_environmental_data()
             else:
-                return await self._get_real_environmental_data()
+                data = await self._get_real_environmental_data()
+        except Exception as e:
+            logger.error("Error fetching environmental data: %s", e)
+            data = await self._get_mock_environmental_data()
+        
+        # Every new snapshot is an ingest for the alert engine
+        try:
+            alert_engine.ingest_snapshot(data)
         except Exception as e:
-            logger.error(f"Error fetching environmental data: {e}")
-            return await self._get_mock_environmental_data()
+            logger.error("Error evaluating alerts: %s", e)
+        
+        return data
+    
+    def _get_snapshot_environmental_data(self) -> Optional[Dict[str, Any]]:
+        """Read the leader's latest published snapshot instead of fetching"""
+        global _alerted_snapshot_seq
+        seq = self.snapshot.seq
+        blob = self.snapshot.get("current_data")
+        if blob is None:
+            return None
+        data = json.loads(bytes(blob))
+        if isinstance(data.get("timestamp"), str):
+            data["timestamp"] = datetime.fromisoformat(data["timestamp"])
+        
+        # Keep this worker's alert engine in step, once per published snapshot
+        if seq != _alerted_snapshot_seq:
+            _alerted_snapshot_seq = seq
+            try:
+                alert_engine.ingest_snapshot(data)
+            except Exception as e:
+                logger.error("Error evaluating alerts: %s", e)
+        return data
     
     async def _get_mock_environmental_data(self) -> Dict[str, Any]:
         """Generate mock environmental data with realistic variations"""
@@ -84,117 +253,220 @@ class DataService:
         """Fetch real environmental data from external APIs"""
         data = {}
         
-        # NASA Climate Data
-        if self.nasa_api_key:
-            try:
-                nasa_data = await self._fetch_nasa_climate_data()
-                data.update(nasa_data)
-            except Exception as e:
-                logger.error(f"Error fetching NASA data: {e}")
-        
-        # Weather Data
-        if self.weather_api_key:
-            try:
-                weather_data = await self._fetch_weather_data()
-                data.update(weather_data)
-            except Exception as e:
-                logger.error(f"Error fetching weather data: {e}")
+        # Each configured source is fetched concurrently behind its own
+        # circuit breaker, adaptive timeout and last-good-value fallback
+        sources = [
+            ("nasa", self.nasa_api_key, self._fetch_nasa_climate_data),
+            ("weather", self.weather_api_key, self._fetch_weather_data),
+            ("air_quality", self.air_quality_api_key, self._fetch_air_quality_data),
+        ]
+        enabled = [(name, fetch) for name, api_key, fetch in sources if api_key]
+        results = await asyncio.gather(
+            *(get_upstream_guard(name).call(fetch) for name, fetch in enabled),
+            return_exceptions=True
+        )
         
-        # Air Quality Data
-        if self.air_quality_api_key:
-            try:
-                air_quality_data = await self._fetch_air_quality_data()
-                data.update(air_quality_data)
-            except Exception as e:
-                logger.error(f"Error fetching air quality data: {e}")
+        for (name, _), result in zip(enabled, results):
+            if isinstance(result, BaseException):
+                logger.error("Error fetching %s data: %s", name, result, extra={"upstream": name})
+            else:
+                data.update(result)
         
         return data
     
     async def _fetch_nasa_climate_data(self) -> Dict[str, Any]:
         """Fetch climate data from NASA APIs"""
+        import httpx  # Deferred: only needed once real upstreams are enabled
+        
         async with httpx.AsyncClient() as client:
             # Example NASA API call (would need actual endpoint)
             response = await client.get(
-                "https://api.nasa.gov/planetary/earth/assets",
+                f"{settings.nasa_api_url}/planetary/earth/assets",
                 params={"api_key": self.nasa_api_key}
             )
+            response.raise_for_status()
             # Process response and return relevant data
             return {"nasa_data": "placeholder"}
     
     async def _fetch_weather_data(self) -> Dict[str, Any]:
-        """Fetch weather data from weather APIs"""
-        # Implementation would depend on specific weather API
-        return {"weather_data": "placeholder"}
+        """Fetch weather data from an OpenWeatherMap-compatible API"""
+        import httpx
+        
+        lat, lon = settings.upstream_location.split(",")
+        async with httpx.AsyncClient() as client:
+            response = await client.get(
+                f"{settings.weather_api_url}/data/2.5/weather",
+                params={"lat": lat, "lon": lon, "units": "metric", "appid": self.weather_api_key}
+            )
+            response.raise_for_status()
+            return {"weather_data": response.json().get("main", {})}
     
     async def _fetch_air_quality_data(self) -> Dict[str, Any]:
-        """Fetch air quality data from air quality APIs"""
-        # Implementation would depend on specific air quality API
-        return {"air_quality_data": "placeholder"}
+        """Fetch air quality data from an OpenWeatherMap-compatible API"""
+        import httpx
+        
+        lat, lon = settings.upstream_location.split(",")
+        async with httpx.AsyncClient() as client:
+            response = await client.get(
+                f"{settings.air_quality_api_url}/data/2.5/air_pollution",
+                params={"lat": lat, "lon": lon, "appid": self.air_quality_api_key}
+            )
+            response.raise_for_status()
+            readings = response.json().get("list") or [{}]
+            return {"air_quality_data": readings[0].get("components", {})}
     
-    async def get_pulse_history(self, days: int = 7) -> PulseHistory:
-        """Get historical pulse data for the specified number of days"""
+    @property
+    def history_step(self) -> timedelta:
+        """Timestamp resolution of the active history backend"""
+        return STORE_STEP if self.history_backend == "store" else HISTORY_STEP
+    
+    def resolve_history_window(
+        self,
+        days: int = 7,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        since: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        step: Optional[timedelta] = None,
+        max_span: timedelta = MAX_HISTORY_SPAN
+    ) -> Tuple[datetime, datetime, str]:
+        """Resolve query parameters into an inclusive [first, last] range of sample timestamps.
+        
+        A cursor carries the remainder of the original window and overrides the
+        other parameters. Raises ValueError for invalid combinations.
+        """
+        step = step or self.history_step
+        if cursor:
+            position = decode_cursor(cursor)
+            try:
+                after = float(position["a"])
+                until = float(position["e"])
+                if not (math.isfinite(after) and math.isfinite(until)):
+                    raise ValueError("Invalid cursor")
+                first = _EPOCH + timedelta(seconds=after) + step
+                last = _EPOCH + timedelta(seconds=until)
+                period = str(position["p"])
+            except (KeyError, TypeError, ValueError, OverflowError):
+                raise ValueError("Invalid cursor")
+            # Signed cursors are only issued for valid windows; check anyway
+            if first > last or last - first > max_span:
+                raise ValueError("Invalid cursor")
+            return first, last, period
+        
+        last = _floor_to_step(_to_naive_utc(end) if end else datetime.utcnow(), step)
+        if start is not None:
+            first = _ceil_to_step(_to_naive_utc(start), step)
+            if first > last:
+                raise ValueError("start must be before end")
+            if last - first > max_span:
+                raise ValueError(f"Time range must not exceed {max_span.days} days")
+            period = f"{max(1, round((last - first) / timedelta(days=1)))}d"
+        else:
+            first = last - timedelta(days=days) + step
+            period = f"{days}d"
+        
+        if since is not None:
+            # Delta polling: only samples strictly newer than what the client has
+            first = max(first, _floor_to_step(_to_naive_utc(since), step) + step)
+        
+        return first, last, period
+    
+    def iter_pulse_samples(
+        self,
+        first: datetime,
+        last: datetime,
+        step: timedelta = HISTORY_STEP,
+        max_points: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield pulse samples as plain dicts in chronological order without materialising the range"""
+        return iter_history_samples(first, last, step, max_points, self.history_backend, self.history_metric)
+    
+    def iter_pulse_points(
+        self,
+        first: datetime,
+        last: datetime,
+        step: timedelta = HISTORY_STEP,
+        max_points: Optional[int] = None
+    ) -> Iterator[Point]:
+        """Yield pulse points in chronological order without materialising the range"""
+        for sample in self.iter_pulse_samples(first, last, step, max_points):
+            yield Point(**sample)
+    
+    @traced("data_service.get_pulse_history")
+    async def get_pulse_history(
+        self,
+        days: int = 7,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        since: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None
+    ) -> PulseHistory:
+        """Get historical pulse data for a time window, optionally paged or as a delta"""
+        if cursor and limit is None:
+            raise ValueError("cursor requires limit")
+        first, last, period = self.resolve_history_window(days, start, end, since, cursor)
         try:
-            logger.info(f"Generating pulse history for {days} days")
-            data_points = []
-            base_time = datetime.utcnow()
+            logger.debug("Generating pulse history for %s", period)
             
-            for i in range(days * 24):  # Hourly data points
-                timestamp = base_time - timedelta(hours=i)
-                
-                # Generate realistic historical data with trends and cycles
-                base_temp = 15.0
-                # Add daily and weekly cycles to temperature
-                hour_of_day = timestamp.hour
-                day_of_week = timestamp.weekday()
-                daily_cycle = 2 * math.sin((hour_of_day / 24) * 2 * math.pi)
-                weekly_cycle = 1 * math.sin((day_of_week / 7) * 2 * math.pi)
-                temp_variation = random.uniform(-1.5, 1.5)
-                warming_trend = (i * 0.002)  # Gradual warming trend
-                temperature = base_temp + daily_cycle + weekly_cycle + temp_variation + warming_trend
-                
-                base_co2 = 420
-                # CO2 with daily patterns (lower during day due to photosynthesis)
-                co2_daily_pattern = -2 * math.sin((hour_of_day / 24) * 2 * math.pi)  # Lower during day
-                co2_variation = random.uniform(-2, 2)
-                co2_trend = (i * 0.015)  # Gradual increase trend
-                co2_levels = base_co2 + co2_daily_pattern + co2_variation + co2_trend
-                
-                # Create data point
-                point = Point(
-                    timestamp=timestamp,
-                    value=round(temperature, 1),
-                    unit="°C",
-                    source=DataSource.SATELLITE,
-                    confidence=0.85 + random.uniform(-0.1, 0.1),
-                    metadata={
-                        "co2_levels": round(co2_levels, 1),
-                        "data_quality": "high"
-                    }
-                )
-                data_points.append(point)
+            # Fetch one extra point to learn whether another page exists
+            max_points = None if limit is None else limit + 1
+            expected_points = (last - first) // HISTORY_STEP + 1
+            if max_points is not None:
+                expected_points = min(expected_points, max_points)
+            # Small windows are built inline, large ones off the event loop
+            series = await compute_executor.run(
+                build_pulse_series,
+                first,
+                last,
+                HISTORY_STEP,
+                max_points,
+                self.history_backend,
+                self.history_metric,
+                cost=expected_points,
+                is_disconnected=is_disconnected,
+                cancellable=True
+            )
+            
+            next_cursor = None
+            if limit is not None and len(series) > limit:
+                series = series[:limit]
+                next_cursor = encode_cursor({
+                    "a": series.timestamps[-1],
+                    "e": _epoch_seconds(last),
+                    "p": period
+                })
             
-            # Reverse to get chronological order
-            data_points.reverse()
+            # Pydantic points are only created for the response itself
+            data_points = series.to_points()
             
             result = PulseHistory(
                 data=data_points,
-                period=f"{days}d",
-                aggregation="hourly",
-                total_points=len(data_points)
+                period=period,
+                aggregation="hourly" if self.history_backend == "synthetic" else "stored",
+                total_points=len(data_points),
+                start=first,
+                end=last,
+                next_cursor=next_cursor
             )
             
-            logger.info(f"Generated {len(data_points)} data points for pulse history")
+            logger.info(
+                "Generated %d data points for pulse history",
+                len(data_points),
+                extra={"period": period, "points": len(data_points)}
+            )
             return result
             
+        except (ExecutorBusyError, JobCancelledError):
+            raise
         except Exception as e:
-            logger.error(f"Error generating pulse history: {e}")
-            return PulseHistory(
-                data=[],
-                period=f"{days}d",
-                aggregation="hourly",
-                total_points=0
-            )
+            # Never an empty history that looks like success; and not a
+            # ValueError either, which callers report as a bad request
+            logger.error("Error generating pulse history: %s", e)
+            raise RuntimeError(f"Error generating pulse history: {e}") from e
     
+    @traced("data_service.get_environmental_metrics")
     async def get_environmental_metrics(self) -> List[EnvironmentalMetric]:
         """Get current environmental metrics"""
         try:
@@ -250,32 +522,14 @@ class DataService:
             return metrics
             
         except Exception as e:
-            logger.error(f"Error getting environmental metrics: {e}")
+            logger.error("Error getting environmental metrics: %s", e)
             return []
     
     async def validate_data_quality(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Validate and assess data quality"""
-        quality_score = 0.9
-        issues = []
-        
-        # Check for missing data
-        required_fields = ["temperature", "co2_levels", "forest_cover", "ocean_health"]
-        for field in required_fields:
-            if field not in data:
-                quality_score -= 0.1
-                issues.append(f"Missing {field} data")
-        
-        # Check for reasonable value ranges
-        if data.get("temperature", 0) < -50 or data.get("temperature", 0) > 60:
-            quality_score -= 0.2
-            issues.append("Temperature out of reasonable range")
-        
-        if data.get("co2_levels", 0) < 200 or data.get("co2_levels", 0) > 1000:
-            quality_score -= 0.2
-            issues.append("CO2 levels out of reasonable range")
-        
+        report = quality_monitor.validate_snapshot(data)
         return {
-            "quality_score": max(0, quality_score),
-            "issues": issues,
+            "quality_score": report["quality_score"],
+            "issues": report["issues"],
             "timestamp": datetime.utcnow()
         }
@@ -0,0 +1,94 @@
+"""
+Streaming export of pulse history as NDJSON or CSV
+"""
+import asyncio
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+CSV_COLUMNS = ["timestamp", "value", "unit", "source", "confidence", "co2_levels", "data_quality"]
+
+
+def flatten_sample(sample: Dict[str, Any]) -> Dict[str, Any]:
+    """Transform a pulse sample into a flat export row"""
+    metadata = sample.get("metadata") or {}
+    timestamp = sample["timestamp"]
+    source = sample["source"]
+    confidence = sample.get("confidence")
+    return {
+        "timestamp": timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp,
+        "value": sample["value"],
+        "unit": sample["unit"],
+        "source": getattr(source, "value", source),
+        "confidence": round(confidence, 4) if confidence is not None else None,
+        "co2_levels": metadata.get("co2_levels"),
+        "data_quality": metadata.get("data_quality"),
+    }
+
+
+def encode_ndjson(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Encode rows as newline-delimited JSON"""
+    for row in rows:
+        yield json.dumps(row, separators=(",", ":"), ensure_ascii=False) + "\n"
+
+
+def encode_csv(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Encode rows as CSV with a header line, reusing a single buffer"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS, extrasaction="ignore", lineterminator="\n")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def chunked(lines: Iterable[str], chunk_size: int) -> Iterator[bytes]:
+    """Group encoded lines into chunks of roughly `chunk_size` bytes"""
+    parts: List[str] = []
+    size = 0
+    for line in lines:
+        parts.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield "".join(parts).encode()
+            parts = []
+            size = 0
+    if parts:
+        yield "".join(parts).encode()
+
+
+async def stream_export(
+    samples: Iterable[Dict[str, Any]],
+    fmt: str,
+    chunk_size: int = 64 * 1024,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None
+) -> AsyncIterator[bytes]:
+    """Run the generate -> transform -> encode -> chunk pipeline lazily.
+
+    Only one chunk is held at a time, so memory stays constant regardless of
+    the range length. Control returns to the event loop between chunks, and
+    the stream stops as soon as the client goes away.
+    """
+    encode = encode_csv if fmt == "csv" else encode_ndjson
+    rows = (flatten_sample(sample) for sample in samples)
+    sent = 0
+    for chunk in chunked(encode(rows), chunk_size):
+        if is_disconnected is not None and await is_disconnected():
+            logger.info("Export client disconnected after %d bytes", sent, extra={"bytes_sent": sent})
+            return
+        yield chunk
+        sent += len(chunk)
+        await asyncio.sleep(0)
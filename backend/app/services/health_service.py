@@ -0,0 +1,213 @@
+"""
+Health monitoring: dependency probes run in the background and cached
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from app.config.settings import settings
+from app.services.resilience import upstream_guards
+
+logger = logging.getLogger(__name__)
+
+# A probe returns (status, detail); status is healthy, degraded, unhealthy or disabled
+ProbeFn = Callable[[], Awaitable[Tuple[str, Optional[str]]]]
+
+HEALTHY_STATES = ("healthy", "disabled")
+
+
+class ProbeResult:
+    """Cached outcome of a single probe run"""
+
+    __slots__ = ("status", "detail", "latency_ms", "checked_at", "critical")
+
+    def __init__(self, status: str, detail: Optional[str], latency_ms: float, checked_at: float, critical: bool):
+        self.status = status
+        self.detail = detail
+        self.latency_ms = latency_ms
+        self.checked_at = checked_at
+        self.critical = critical
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "detail": self.detail,
+            "latency_ms": round(self.latency_ms, 3),
+            "checked_at": self.checked_at,
+            "critical": self.critical
+        }
+
+
+class HealthMonitor:
+    """Runs registered probes concurrently on a schedule and caches the results"""
+
+    def __init__(self, interval: float = 15.0, probe_timeout: float = 2.0, deep_min_interval: float = 10.0):
+        self.interval = interval
+        self.probe_timeout = probe_timeout
+        self.deep_min_interval = deep_min_interval
+        self._probes: Dict[str, Tuple[ProbeFn, bool]] = {}
+        self._results: Dict[str, ProbeResult] = {}
+        self._last_run = 0.0
+        self._last_deep_run = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def register(self, name: str, probe: ProbeFn, critical: bool = True) -> None:
+        """Register a probe; critical probes gate readiness"""
+        self._probes[name] = (probe, critical)
+
+    @property
+    def has_results(self) -> bool:
+        return bool(self._results)
+
+    @property
+    def last_run(self) -> float:
+        return self._last_run
+
+    def results(self) -> Dict[str, ProbeResult]:
+        """Cached probe results (no I/O)"""
+        return self._results
+
+    async def run_probes(self) -> Dict[str, ProbeResult]:
+        """Run every probe concurrently and refresh the cache"""
+        async with self._lock:
+            names = list(self._probes)
+            outcomes = await asyncio.gather(*(self._run_probe(name) for name in names))
+            self._results = dict(zip(names, outcomes))
+            self._last_run = time.time()
+            return self._results
+
+    async def _run_probe(self, name: str) -> ProbeResult:
+        probe, critical = self._probes[name]
+        started = time.perf_counter()
+        try:
+            status, detail = await asyncio.wait_for(probe(), timeout=self.probe_timeout)
+        except asyncio.TimeoutError:
+            status, detail = "unhealthy", f"probe timed out after {self.probe_timeout}s"
+        except Exception as e:
+            status, detail = "unhealthy", str(e) or type(e).__name__
+        latency_ms = (time.perf_counter() - started) * 1000
+        return ProbeResult(status, detail, latency_ms, time.time(), critical)
+
+    def deep_check_retry_after(self) -> float:
+        """Seconds until a deep check is allowed again (0 if allowed now)"""
+        return max(0.0, self._last_deep_run + self.deep_min_interval - time.monotonic())
+
+    async def deep_check(self) -> Dict[str, ProbeResult]:
+        """Run probes on demand; callers must respect deep_check_retry_after"""
+        self._last_deep_run = time.monotonic()
+        return await self.run_probes()
+
+    def overall_status(self) -> str:
+        """healthy, degraded (non-critical failures) or unhealthy (critical failures)"""
+        status = "healthy"
+        for result in self._results.values():
+            if result.status in HEALTHY_STATES:
+                continue
+            if result.critical and result.status == "unhealthy":
+                return "unhealthy"
+            status = "degraded"
+        return status
+
+    def is_ready(self) -> bool:
+        """Ready once probes have run and no critical dependency is unhealthy"""
+        return self.has_results and all(
+            result.status != "unhealthy" for result in self._results.values() if result.critical
+        )
+
+    async def start(self) -> None:
+        """Start the background probe loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_probes()
+            except Exception as e:
+                logger.error("Error running health probes: %s", e)
+            await asyncio.sleep(self.interval)
+
+
+async def probe_database() -> Tuple[str, Optional[str]]:
+    """TCP reachability of the configured database (file check for SQLite)"""
+    if not settings.database_url:
+        return "disabled", "DATABASE_URL not configured"
+    url = urlparse(settings.database_url)
+    if url.scheme.startswith("sqlite"):
+        # sqlite:///relative.db and sqlite:////absolute.db
+        path = url.path[1:] if url.path.startswith("/") else url.path
+        return ("healthy", None) if os.path.exists(path) else ("unhealthy", f"{path} not found")
+    default_ports = {"postgresql": 5432, "postgres": 5432, "mysql": 3306}
+    port = url.port or default_ports.get(url.scheme.split("+")[0], 5432)
+    _, writer = await asyncio.open_connection(url.hostname or "localhost", port)
+    writer.close()
+    await writer.wait_closed()
+    return "healthy", None
+
+
+async def probe_redis() -> Tuple[str, Optional[str]]:
+    """PING the configured Redis instance"""
+    if not settings.redis_configured:
+        return "disabled", "REDIS_URL not configured"
+    import redis.asyncio as aioredis
+
+    client = aioredis.from_url(settings.redis_url, socket_connect_timeout=settings.health_probe_timeout)
+    try:
+        await client.ping()
+    finally:
+        await client.aclose()
+    return "healthy", None
+
+
+async def probe_upstreams() -> Tuple[str, Optional[str]]:
+    """Aggregate circuit breaker state of the upstream climate APIs"""
+    if settings.enable_mock_data:
+        return "disabled", "mock data enabled"
+    states: List[str] = [f"{name}={guard.breaker.state}" for name, guard in upstream_guards.items()]
+    health = [guard.health for guard in upstream_guards.values()]
+    detail = ", ".join(states) or None
+    if "unhealthy" in health:
+        return "unhealthy", detail
+    if "degraded" in health:
+        return "degraded", detail
+    return "healthy", detail
+
+
+async def probe_ai_service() -> Tuple[str, Optional[str]]:
+    """Run the mood analysis on a fixed sample to verify the AI service"""
+    from app.services.ai_service import AIService
+
+    mood = await AIService().analyze_environmental_data({
+        "temperature": 15.0,
+        "co2_levels": 420.0,
+        "forest_cover": 31.2,
+        "ocean_health": 72.0
+    })
+    if mood.confidence < 0.6:
+        return "degraded", "analysis fell back to defaults"
+    return "healthy", None
+
+
+# Global health monitor instance
+health_monitor = HealthMonitor(
+    interval=settings.health_check_interval,
+    probe_timeout=settings.health_probe_timeout,
+    deep_min_interval=settings.health_deep_min_interval
+)
+health_monitor.register("database", probe_database)
+health_monitor.register("redis", probe_redis, critical=False)
+health_monitor.register("ai_service", probe_ai_service)
+health_monitor.register("external_apis", probe_upstreams, critical=False)
@@ -0,0 +1,157 @@
+"""
+SQLite-backed store for historical environmental samples
+"""
+import json
+import logging
+import re
+import sqlite3
+import threading
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from app.config.settings import settings
+from app.models.schemas import DataSource
+
+logger = logging.getLogger(__name__)
+
+# (metric, epoch seconds, value, unit, source, confidence, metadata JSON)
+SampleRow = Tuple[str, int, float, str, str, Optional[float], Optional[str]]
+
+_EPOCH = datetime(1970, 1, 1)
+_NONZERO = re.compile(rb"[^\x00]")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    metric TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    value REAL NOT NULL,
+    unit TEXT NOT NULL,
+    source TEXT NOT NULL,
+    confidence REAL,
+    metadata TEXT,
+    quality INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (metric, ts)
+) WITHOUT ROWID
+"""
+
+_UPSERT = """
+INSERT INTO samples (metric, ts, value, unit, source, confidence, metadata)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (metric, ts) DO UPDATE SET
+    value = excluded.value,
+    unit = excluded.unit,
+    source = excluded.source,
+    confidence = excluded.confidence,
+    metadata = excluded.metadata,
+    quality = 0
+"""
+
+# Quality flags are sparse, so they are written onto the few flagged rows
+# after the batch upsert instead of widening every row tuple
+_SET_QUALITY = "UPDATE samples SET quality = ? WHERE metric = ? AND ts = ?"
+
+
+def _to_epoch(timestamp: datetime) -> int:
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return int((timestamp - _EPOCH).total_seconds())
+
+
+class HistoryStore:
+    """Time-series sample store keyed by (metric, timestamp) with upsert semantics"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(samples)")}
+            if "quality" not in columns:
+                # Stores created before quality flags existed
+                conn.execute("ALTER TABLE samples ADD COLUMN quality INTEGER NOT NULL DEFAULT 0")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def upsert_many(self, rows: Sequence[SampleRow], quality: Optional[array] = None) -> int:
+        """Insert or update a batch of rows in a single transaction.
+
+        `quality` holds one flag bitmask per row (see quality_service); rows
+        without flags are stored with quality 0.
+        """
+        conn = self._connect()
+        with conn:
+            conn.executemany(_UPSERT, rows)
+            if quality is not None:
+                conn.executemany(_SET_QUALITY, (
+                    (match.group()[0], rows[match.start()][0], rows[match.start()][1])
+                    for match in _NONZERO.finditer(quality.tobytes())
+                ))
+        return len(rows)
+
+    def bulk_mode(self, enabled: bool) -> None:
+        """Trade durability for write speed while a backfill is running"""
+        conn = self._connect()
+        conn.execute(f"PRAGMA synchronous={'OFF' if enabled else 'NORMAL'}")
+
+    def count(self, metric: Optional[str] = None) -> int:
+        conn = self._connect()
+        if metric is None:
+            return conn.execute("SELECT COUNT(*) FROM samples").fetchone()[0]
+        return conn.execute("SELECT COUNT(*) FROM samples WHERE metric = ?", (metric,)).fetchone()[0]
+
+    def metrics(self) -> Dict[str, int]:
+        """Stored metrics with their sample counts"""
+        conn = self._connect()
+        return dict(conn.execute("SELECT metric, COUNT(*) FROM samples GROUP BY metric"))
+
+    def iter_samples(
+        self,
+        metric: str,
+        first: datetime,
+        last: datetime,
+        max_points: Optional[int] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield stored samples in [first, last] in chronological order, fetched in batches"""
+        conn = self._connect()
+        query = "SELECT ts, value, unit, source, confidence, metadata, quality FROM samples WHERE metric = ? AND ts BETWEEN ? AND ? ORDER BY ts"
+        params: Tuple[Any, ...] = (metric, _to_epoch(first), _to_epoch(last))
+        if max_points is not None:
+            query += " LIMIT ?"
+            params += (max_points,)
+        cursor = conn.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for ts, value, unit, source, confidence, metadata, quality in rows:
+                metadata = json.loads(metadata) if metadata else None
+                if quality:
+                    metadata = {**(metadata or {}), "quality_flags": quality}
+                yield {
+                    "timestamp": _EPOCH + timedelta(seconds=ts),
+                    "value": value,
+                    "unit": unit,
+                    "source": DataSource(source),
+                    "confidence": confidence,
+                    "metadata": metadata
+                }
+
+
+_history_store: Optional[HistoryStore] = None
+
+
+def get_history_store() -> HistoryStore:
+    """Get the shared history store, opening it on first use"""
+    global _history_store
+    if _history_store is None:
+        _history_store = HistoryStore(settings.history_db_path)
+    return _history_store
@@ -0,0 +1,115 @@
+"""
+Ingestion pipeline: fetch one environmental snapshot per tick and derive
+everything that is served from it
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from app.config.settings import settings
+from app.core.shared_snapshot import SnapshotPublisher
+from app.models.schemas import PulseHistoryResponse
+from app.services.ai_service import AIService
+from app.services.chat_context import chat_context
+from app.services.data_service import DataService
+from app.services.mood_timeline import MoodTimeline, mood_timeline
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value: Any) -> Any:
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class IngestionPipeline:
+    """Runs the ingest -> analyse -> precompute cycle once per update interval"""
+
+    def __init__(
+        self,
+        data_service: Optional[DataService] = None,
+        ai_service: Optional[AIService] = None,
+        publisher: Optional[SnapshotPublisher] = None,
+        history_tiers: Optional[List[int]] = None,
+        timeline: Optional[MoodTimeline] = None
+    ):
+        self.data_service = data_service or DataService(use_snapshot=False)
+        self.ai_service = ai_service or AIService()
+        self.publisher = publisher
+        self.history_tiers = history_tiers if history_tiers is not None else settings.snapshot_history_tiers
+        self.timeline = timeline or mood_timeline
+        self.last_tick: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def tick(self) -> Dict[str, bytes]:
+        """Ingest one snapshot and build the pre-encoded response bodies served from it"""
+        data = await self.data_service.get_current_environmental_data()
+        data = {**data, "quality": await self.data_service.validate_data_quality(data)}
+        mood = await self.ai_service.analyze_environmental_data(data)
+        self.timeline.record(mood)
+        try:
+            await chat_context.refresh(self.data_service, data)
+        except Exception as e:
+            logger.error("Error refreshing chat context: %s", e)
+
+        blobs: Dict[str, bytes] = {
+            "current_data": json.dumps(data, default=_json_default).encode(),
+            "current_mood": self.timeline.latest_body,
+            **self.timeline.delta_blobs()
+        }
+        if self.publisher is not None:
+            blobs["mood_timeline"] = json.dumps(
+                [entry.model_dump(mode="json") for entry in self.timeline.entries()]
+            ).encode()
+        for days in self.history_tiers:
+            try:
+                history = await self.data_service.get_pulse_history(days=days)
+            except Exception as e:
+                # Leave the tier out; readers fall back to computing it themselves
+                logger.error("Error precomputing %d-day pulse history: %s", days, e)
+                continue
+            blobs[f"history:{days}"] = PulseHistoryResponse(
+                success=True,
+                data=history,
+                message=f"Pulse history data retrieved successfully for {history.period}"
+            ).model_dump_json().encode()
+
+        if self.publisher is not None:
+            seq = self.publisher.publish(blobs)
+            size = sum(len(blob) for blob in blobs.values())
+            logger.info("Published snapshot %d (%d bytes)", seq, size, extra={"seq": seq, "bytes": size})
+        self.last_tick = time.time()
+        return blobs
+
+    async def run_forever(self, interval: Optional[float] = None) -> None:
+        """Tick on a fixed schedule until cancelled"""
+        interval = interval or settings.data_update_interval
+        while True:
+            started = time.monotonic()
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.error("Error in ingestion tick: %s", e)
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    async def start(self, interval: Optional[float] = None) -> None:
+        """Run the ingestion loop as a background task of this process"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_forever(interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global in-process pipeline for standalone serving; snapshots are not
+# published and history tiers are left to the request path
+ingestion_pipeline = IngestionPipeline(history_tiers=[])
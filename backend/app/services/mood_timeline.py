@@ -0,0 +1,125 @@
+"""
+Materialized mood timeline: one CurrentMood per ingest tick in a ring buffer
+"""
+import json
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+
+from app.config.settings import settings
+from app.models.schemas import CurrentMood, CurrentMoodPatch, CurrentMoodPatchResponse, CurrentMoodResponse
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _epoch_ms(timestamp: datetime) -> int:
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return int((timestamp - _EPOCH).total_seconds() * 1000)
+
+
+class MoodTimeline:
+    """Bounded history of computed moods; requests only ever read from it"""
+
+    def __init__(self, capacity: int = 2880):
+        self.capacity = capacity
+        self._entries: Deque[CurrentMood] = deque(maxlen=capacity)
+        self._latest_body: Optional[bytes] = None
+        self._latest_patch: Optional[bytes] = None
+        self.meta: Optional[Dict[str, Any]] = None
+        self.transitions = 0
+        self.synced_seq = 0
+
+    @property
+    def latest(self) -> Optional[CurrentMood]:
+        return self._entries[-1] if self._entries else None
+
+    @property
+    def latest_body(self) -> Optional[bytes]:
+        """Pre-encoded CurrentMoodResponse for the latest mood"""
+        return self._latest_body
+
+    @property
+    def latest_patch(self) -> Optional[bytes]:
+        """Pre-encoded CurrentMoodPatchResponse from the previous mood to the latest"""
+        return self._latest_patch
+
+    def delta_blobs(self) -> Dict[str, bytes]:
+        """Version metadata and patch for publishing alongside the latest body"""
+        blobs = {"current_mood_meta": json.dumps(self.meta).encode()}
+        if self._latest_patch is not None:
+            blobs["current_mood_patch"] = self._latest_patch
+        return blobs
+
+    def record(self, mood: CurrentMood) -> bool:
+        """Append a newly computed mood; returns True when the mood state changed"""
+        previous = self.latest
+        self._entries.append(mood)
+        self._latest_body = CurrentMoodResponse(
+            success=True,
+            data=mood,
+            message="Current mood data retrieved successfully"
+        ).model_dump_json().encode()
+
+        # Versions are the mood timestamp in epoch ms, so serving workers that
+        # mirror the leader's snapshot report the same version
+        base_version = self.meta["version"] if self.meta is not None else None
+        version = _epoch_ms(mood.timestamp)
+        if base_version is not None and version <= base_version:
+            version = base_version + 1
+        self.meta = {
+            "version": version,
+            "base_version": base_version,
+            "next_update": _epoch_ms(mood.next_update) / 1000
+        }
+        self._latest_patch = None
+        if previous is not None:
+            before = previous.model_dump(mode="json")
+            changes = {name: value for name, value in mood.model_dump(mode="json").items() if before.get(name) != value}
+            self._latest_patch = CurrentMoodPatchResponse(
+                success=True,
+                data=CurrentMoodPatch(version=version, base_version=base_version, changes=changes),
+                message=f"Current mood changes since version {base_version}"
+            ).model_dump_json().encode()
+        changed = previous is None or previous.mood != mood.mood
+        if changed:
+            self.transitions += 1
+            logger.info(
+                "Mood changed to %s (score %.1f)",
+                mood.mood.value,
+                mood.score,
+                extra={"mood": mood.mood.value, "score": mood.score}
+            )
+        return changed
+
+    def replace(self, entries: List[CurrentMood], seq: int) -> None:
+        """Mirror a timeline published by the ingestion leader (serving workers)"""
+        self._entries = deque(entries, maxlen=self.capacity)
+        self.synced_seq = seq
+
+    def entries(
+        self,
+        limit: Optional[int] = None,
+        since: Optional[datetime] = None,
+        changes_only: bool = False
+    ) -> List[CurrentMood]:
+        """Timeline entries oldest first, optionally only transitions and newer than `since`"""
+        if since is not None and since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        selected = []
+        previous = None
+        for entry in self._entries:
+            if not changes_only or previous is None or entry.mood != previous.mood:
+                if since is None or entry.timestamp > since:
+                    selected.append(entry)
+            previous = entry
+        if limit is not None:
+            selected = selected[-limit:]
+        return selected
+
+
+# Global mood timeline instance
+mood_timeline = MoodTimeline(capacity=settings.mood_timeline_size)
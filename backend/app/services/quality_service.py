@@ -0,0 +1,358 @@
+"""
+Data-quality validation over batches of samples
+"""
+import itertools
+import logging
+import math
+import operator
+import time
+from array import array
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Quality flags, stored per sample as a bitmask
+FLAG_SCHEMA = 1           # missing or non-numeric value
+FLAG_RANGE = 2            # outside the metric's physical range
+FLAG_NON_MONOTONIC = 4    # timestamp older than the previous sample
+FLAG_DUPLICATE = 8        # same timestamp as the previous sample
+FLAG_SPIKE = 16           # rolling z-score above threshold
+FLAG_GAP = 32             # unusually long interval since the previous sample
+
+FLAG_NAMES = {
+    FLAG_SCHEMA: "schema",
+    FLAG_RANGE: "range",
+    FLAG_NON_MONOTONIC: "non_monotonic",
+    FLAG_DUPLICATE: "duplicate",
+    FLAG_SPIKE: "spike",
+    FLAG_GAP: "gap",
+}
+
+
+def flag_names(flags: int) -> List[str]:
+    """Names of the flags set in a bitmask"""
+    return [name for bit, name in FLAG_NAMES.items() if flags & bit]
+
+
+class MetricSpec:
+    """Declarative validation rules for one metric"""
+
+    __slots__ = ("min_value", "max_value", "expected_interval")
+
+    def __init__(self, min_value: float = -math.inf, max_value: float = math.inf, expected_interval: Optional[float] = None):
+        self.min_value = min_value
+        self.max_value = max_value
+        # Seconds between samples; learned from the data when not given
+        self.expected_interval = expected_interval
+
+
+# Physical ranges for the metrics GaiaPulse ingests
+METRIC_SPECS: Dict[str, MetricSpec] = {
+    "temperature": MetricSpec(-90.0, 60.0),
+    "temperature_anomaly": MetricSpec(-5.0, 5.0),
+    "co2_levels": MetricSpec(250.0, 1000.0),
+    "forest_cover": MetricSpec(0.0, 100.0),
+    "ocean_health": MetricSpec(0.0, 100.0),
+    "air_quality_index": MetricSpec(0.0, 500.0),
+    "sea_level_rise": MetricSpec(-50.0, 50.0),
+    "biodiversity_index": MetricSpec(0.0, 100.0),
+    "renewable_energy_share": MetricSpec(0.0, 100.0),
+}
+DEFAULT_SPEC = MetricSpec()
+
+# Deltas used to learn a series' sampling interval
+_INTERVAL_SAMPLE = 1024
+
+# Snapshot fields every environmental payload must carry
+REQUIRED_FIELDS = ("temperature", "co2_levels", "forest_cover", "ocean_health")
+
+
+class _SeriesState:
+    """Carry-over between batches of one (metric, source) series"""
+
+    __slots__ = ("last_ts", "window", "interval")
+
+    def __init__(self, window: int):
+        self.last_ts: Optional[int] = None
+        self.window: Deque[float] = deque(maxlen=window)
+        self.interval: Optional[float] = None
+
+
+class QualityMonitor:
+    """Validates sample batches column by column and keeps per-source metrics.
+
+    Each check is a pass over a whole column (values or timestamps). The
+    rolling z-score and gap baselines carry over between batches, so chunked
+    backfills and live ingest see the same series as one stream.
+    """
+
+    def __init__(self, window: int = 48, z_threshold: float = 4.0, gap_factor: float = 2.5, specs: Optional[Dict[str, MetricSpec]] = None):
+        self.window = window
+        self.z_threshold = z_threshold
+        self.gap_factor = gap_factor
+        self.specs = specs if specs is not None else METRIC_SPECS
+        self._states: Dict[Tuple[str, str], _SeriesState] = {}
+        self._counts: Dict[str, Counter] = {}
+        self._last_seen: Dict[str, float] = {}
+
+    def validate_batch(self, metric: str, source: str, timestamps: Sequence[int], values: Sequence[Any]) -> array:
+        """Quality flags for a batch of one series, in arrival order"""
+        spec = self.specs.get(metric, DEFAULT_SPEC)
+        state = self._states.get((metric, source))
+        if state is None:
+            state = self._states[(metric, source)] = _SeriesState(self.window)
+        flags = array("B", bytes(len(values)))
+
+        numeric = self._check_values(spec, values, flags)
+        self._check_timestamps(spec, state, timestamps, flags)
+        self._check_spikes(state, numeric, flags)
+
+        self._record(source, flags)
+        return flags
+
+    @staticmethod
+    def _check_values(spec: MetricSpec, values: Sequence[Any], flags: array) -> List[float]:
+        """Schema and range checks; returns the values with bad entries replaced by NaN"""
+        try:
+            # Whole-column fast path: all numbers, all finite, all in range
+            if math.isfinite(math.fsum(values)) and spec.min_value <= min(values) and max(values) <= spec.max_value:
+                return values if isinstance(values, list) else list(values)
+        except TypeError:
+            pass
+        numeric = []
+        low, high = spec.min_value, spec.max_value
+        for index, value in enumerate(values):
+            if not isinstance(value, (int, float)) or isinstance(value, bool) or not math.isfinite(value):
+                flags[index] |= FLAG_SCHEMA
+                numeric.append(math.nan)
+            elif not low <= value <= high:
+                flags[index] |= FLAG_RANGE
+                numeric.append(math.nan)
+            else:
+                numeric.append(value)
+        return numeric
+
+    def _check_timestamps(self, spec: MetricSpec, state: _SeriesState, timestamps: Sequence[int], flags: array) -> None:
+        """Monotonic, duplicate and gap checks against the previous sample"""
+        if not timestamps:
+            return
+        series = list(timestamps) if state.last_ts is None else [state.last_ts, *timestamps]
+        offset = len(series) - len(timestamps)
+        deltas = list(map(operator.sub, series[1:], series[:-1]))
+        if not deltas:
+            state.last_ts = series[-1]
+            return
+
+        # Baseline interval: configured, else the median spacing seen so far
+        interval = spec.expected_interval
+        if interval is None:
+            positive = sorted(delta for delta in deltas[:_INTERVAL_SAMPLE] if delta > 0)
+            # Small batches (live ticks) keep the baseline learned earlier
+            if len(positive) >= 8 or (state.interval is None and positive):
+                state.interval = positive[len(positive) // 2]
+            interval = state.interval
+
+        limit = self.gap_factor * interval if interval else math.inf
+        if min(deltas) > 0 and max(deltas) <= limit:
+            state.last_ts = series[-1]
+            return
+
+        latest = series[0] if offset else None
+        for index, ts in enumerate(timestamps):
+            if latest is not None:
+                delta = ts - latest
+                if delta < 0:
+                    flags[index] |= FLAG_NON_MONOTONIC
+                    continue
+                if delta == 0:
+                    flags[index] |= FLAG_DUPLICATE
+                    continue
+                if delta > limit:
+                    flags[index] |= FLAG_GAP
+            latest = ts
+        state.last_ts = latest
+
+    def _check_spikes(self, state: _SeriesState, numeric: List[float], flags: array) -> None:
+        """Rolling z-score of each value against the preceding window"""
+        window = state.window
+        capacity = window.maxlen
+        carry = len(window)
+        # Out-of-order samples do not belong in the rolling baseline
+        series = list(window) + [
+            math.nan if flag & (FLAG_NON_MONOTONIC | FLAG_DUPLICATE) else value
+            for value, flag in zip(numeric, flags)
+        ] if flags.count(0) != len(flags) else list(window) + numeric
+
+        # Invalid values were replaced by NaN, which poisons the sum
+        if math.isnan(sum(series)):
+            # Rare path: skip invalid values so they never enter the window
+            self._check_spikes_slow(state, series[carry:], flags)
+            return
+
+        # Rolling sums from prefix sums, evaluated a column at a time:
+        # |x - mean| > z * std  <=>  (n*x - S)^2 > z^2 * (n*SQ - S^2)
+        prefix = [0.0, *itertools.accumulate(series)]
+        prefix_sq = [0.0, *itertools.accumulate(map(operator.mul, series, series))]
+        threshold_sq = self.z_threshold * self.z_threshold
+        min_count = max(3, capacity // 4)
+        first = max(carry, min_count)
+        # Warm-up rows see a growing window; the rest a full one
+        full = max(first, capacity)
+        for position in range(first, min(full, len(series))):
+            self._spike_at(series, prefix, prefix_sq, 0, position, threshold_sq, flags, carry)
+        if full < len(series):
+            stop = len(series)
+            sums = list(map(operator.sub, prefix[full:stop], prefix[full - capacity:stop - capacity]))
+            sums_sq = map(operator.sub, prefix_sq[full:stop], prefix_sq[full - capacity:stop - capacity])
+            deviation = list(map(operator.sub, map(operator.mul, series[full:stop], itertools.repeat(capacity)), sums))
+            spread = map(operator.sub, map(operator.mul, sums_sq, itertools.repeat(capacity)), map(operator.mul, sums, sums))
+            exceeded = map(
+                operator.gt,
+                map(operator.mul, deviation, deviation),
+                map(operator.mul, spread, itertools.repeat(threshold_sq))
+            )
+            for offset in itertools.compress(itertools.count(), exceeded):
+                position = full + offset
+                self._spike_at(series, prefix, prefix_sq, position - capacity, position, threshold_sq, flags, carry)
+        window.extend(series[-capacity:])
+
+    @staticmethod
+    def _spike_at(series: List[float], prefix: List[float], prefix_sq: List[float], start: int, position: int, threshold_sq: float, flags: array, carry: int) -> None:
+        count = position - start
+        mean = (prefix[position] - prefix[start]) / count
+        variance = (prefix_sq[position] - prefix_sq[start]) / count - mean * mean
+        deviation = series[position] - mean
+        if variance > 1e-12 and deviation * deviation > threshold_sq * variance:
+            flags[position - carry] |= FLAG_SPIKE
+
+    def _check_spikes_slow(self, state: _SeriesState, values: List[float], flags: array) -> None:
+        window = state.window
+        capacity = window.maxlen
+        threshold_sq = self.z_threshold * self.z_threshold
+        min_count = max(3, capacity // 4)
+        for index, value in enumerate(values):
+            if value != value:
+                continue
+            count = len(window)
+            if count >= min_count:
+                mean = sum(window) / count
+                variance = sum(item * item for item in window) / count - mean * mean
+                deviation = value - mean
+                if variance > 1e-12 and deviation * deviation > threshold_sq * variance:
+                    flags[index] |= FLAG_SPIKE
+            window.append(value)
+
+    def validate_rows(self, rows: List[tuple]) -> array:
+        """Quality flags for (metric, ts, value, unit, source, ...) rows, aligned with them"""
+        if not rows:
+            return array("B")
+        metrics = list(map(operator.itemgetter(0), rows))
+        sources = list(map(operator.itemgetter(4), rows))
+        if metrics.count(metrics[0]) == len(rows) and sources.count(sources[0]) == len(rows):
+            # Backfills are one series per file: validate the columns directly
+            return self.validate_batch(
+                metrics[0],
+                sources[0],
+                list(map(operator.itemgetter(1), rows)),
+                list(map(operator.itemgetter(2), rows))
+            )
+
+        groups: Dict[Tuple[str, str], List[int]] = {}
+        for index, key in enumerate(zip(metrics, sources)):
+            groups.setdefault(key, []).append(index)
+        quality = array("B", bytes(len(rows)))
+        for (metric, source), indexes in groups.items():
+            flags = self.validate_batch(
+                metric,
+                source,
+                [rows[index][1] for index in indexes],
+                [rows[index][2] for index in indexes]
+            )
+            for index, flag in zip(indexes, flags):
+                quality[index] = flag
+        return quality
+
+    def series_state(self, metric: str, source: str) -> Optional[_SeriesState]:
+        """Carry-over state of one series (picklable, for merge_chunk)"""
+        return self._states.get((metric, source))
+
+    def merge_chunk(self, rows: List[tuple], flags: array, state: Optional[_SeriesState]) -> array:
+        """Fold in a single-series chunk validated by a fresh monitor elsewhere.
+
+        Only the first window of rows depends on earlier chunks, so those are
+        re-validated here against the carried state; the rest keep their flags
+        and the series continues from the chunk's own end state.
+        """
+        if not rows:
+            return flags
+        head = min(len(rows), self.window)
+        flags[:head] = self.validate_rows(rows[:head])
+        if len(rows) > head:
+            self._record(rows[0][4], flags[head:])
+            if state is not None:
+                self._states[(rows[0][0], rows[0][4])] = state
+        return flags
+
+    def validate_snapshot(self, data: Dict[str, Any], timestamp: Optional[float] = None) -> Dict[str, Any]:
+        """Validate one environmental snapshot; returns score, issues and per-field flags"""
+        ts = int(timestamp if timestamp is not None else time.time())
+        sources = data.get("sources") or ["unknown"]
+        source = str(sources[0])
+        # Required fields are always checked (missing ones are schema errors),
+        # optional ones only when the snapshot carries them
+        metrics = list(REQUIRED_FIELDS) + [
+            metric for metric in self.specs
+            if metric not in REQUIRED_FIELDS and data.get(metric) is not None
+        ]
+        fields: Dict[str, List[str]] = {}
+        issues = []
+        for metric in metrics:
+            flags = self.validate_batch(metric, source, [ts], [data.get(metric)])[0]
+            if flags:
+                fields[metric] = flag_names(flags)
+                issues.append(f"{metric}: {', '.join(fields[metric])}")
+        checked = len(metrics)
+        return {
+            "quality_score": round(1.0 - len(fields) / checked, 3) if checked else 1.0,
+            "issues": issues,
+            "flags": fields
+        }
+
+    def _record(self, source: str, flags: array) -> None:
+        counts = self._counts.get(source)
+        if counts is None:
+            counts = self._counts[source] = Counter()
+        counts["samples"] += len(flags)
+        flagged = flags.tobytes().replace(b"\0", b"")
+        if flagged:
+            counts["flagged"] += len(flagged)
+            for flag, hits in Counter(flagged).items():
+                for bit, name in FLAG_NAMES.items():
+                    if flag & bit:
+                        counts[name] += hits
+        self._last_seen[source] = time.time()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-source sample counts, flag counts and flagged ratio"""
+        result = {}
+        for source, counts in self._counts.items():
+            samples = counts["samples"]
+            result[source] = {
+                "samples": samples,
+                "flagged": counts["flagged"],
+                "flagged_ratio": round(counts["flagged"] / samples, 4) if samples else 0.0,
+                "flags": {name: counts[name] for name in FLAG_NAMES.values() if counts[name]},
+                "last_seen": self._last_seen.get(source)
+            }
+        return result
+
+
+# Global quality monitor instance
+quality_monitor = QualityMonitor(
+    window=settings.quality_window,
+    z_threshold=settings.quality_z_threshold,
+    gap_factor=settings.quality_gap_factor
+)
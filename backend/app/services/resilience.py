@@ -0,0 +1,256 @@
+"""
+Resilience layer for upstream climate APIs: circuit breakers, adaptive
+timeouts, budgeted retries and last-good-value fallback
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamUnavailableError(Exception):
+    """Raised when an upstream failed and no usable last-good value exists"""
+
+
+class CircuitOpenError(UpstreamUnavailableError):
+    """Raised when a call is rejected because the circuit is open"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with half-open probing"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        max_reset_timeout: float = 300.0,
+        half_open_max_calls: int = 1
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._trips = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def open_for(self) -> float:
+        """Seconds the breaker stays open after the latest trip (doubles per re-trip)"""
+        return min(self.reset_timeout * 2 ** max(self._trips - 1, 0), self.max_reset_timeout)
+
+    def allow(self) -> bool:
+        """Check whether a call may go through, moving open -> half-open when due"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.open_for:
+                return False
+            self.state = self.HALF_OPEN
+            self._probes = 0
+        if self.state == self.HALF_OPEN:
+            if self._probes >= self.half_open_max_calls:
+                return False
+            self._probes += 1
+        return True
+
+    def release(self) -> None:
+        """Give back a half-open probe slot whose call ended without an outcome (cancelled)"""
+        if self.state == self.HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._trips = 0
+        self._probes = 0
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._trip()
+
+    def _trip(self) -> None:
+        self.state = self.OPEN
+        self._trips += 1
+        self._opened_at = time.monotonic()
+        self._probes = 0
+
+
+class AdaptiveTimeout:
+    """Timeout derived from a high percentile of recently observed latencies"""
+
+    def __init__(
+        self,
+        initial: float = 10.0,
+        minimum: float = 0.5,
+        maximum: float = 15.0,
+        percentile: float = 0.99,
+        multiplier: float = 1.5,
+        window: int = 100,
+        min_samples: int = 10
+    ):
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+        self._latencies: deque = deque(maxlen=window)
+
+    def observe(self, latency: float) -> None:
+        self._latencies.append(latency)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def current(self) -> float:
+        """Timeout to use for the next call"""
+        if len(self._latencies) < self.min_samples:
+            return self.initial
+        target = self.quantile(self.percentile) * self.multiplier
+        return max(self.minimum, min(target, self.maximum))
+
+
+class RetryBudget:
+    """Caps retries to a fraction of recent calls so retries cannot amplify an outage"""
+
+    def __init__(self, ratio: float = 0.2, min_tokens: float = 2.0, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = min_tokens
+
+    def deposit(self) -> None:
+        self._tokens = min(self._tokens + self.ratio, self.max_tokens)
+
+    def withdraw(self) -> bool:
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+
+class UpstreamGuard:
+    """Wraps calls to a single upstream source with all resilience policies"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.breaker_failure_threshold,
+            reset_timeout=settings.breaker_reset_timeout
+        )
+        self.timeout = AdaptiveTimeout(
+            initial=settings.upstream_timeout,
+            minimum=settings.upstream_timeout_min,
+            maximum=settings.upstream_timeout_max
+        )
+        self.budget = RetryBudget(ratio=settings.retry_budget_ratio)
+        self.max_retries = settings.upstream_max_retries
+        self.backoff_base = settings.upstream_backoff_base
+        self.last_good_max_age = settings.last_good_max_age
+        self._last_good: Optional[Tuple[Dict[str, Any], float]] = None
+        self.serving_stale = False
+        self.last_error: Optional[str] = None
+
+    async def call(self, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Run `fetch` under the breaker, timeout and retry budget"""
+        if not self.breaker.allow():
+            return self._fallback(CircuitOpenError(f"Circuit open for {self.name}"))
+
+        self.budget.deposit()
+        try:
+            return await self._attempts(fetch)
+        except asyncio.CancelledError:
+            # A cancelled probe must not hold its half-open slot forever
+            self.breaker.release()
+            raise
+
+    async def _attempts(self, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            timeout = self.timeout.current()
+            started = time.monotonic()
+            try:
+                result = await asyncio.wait_for(fetch(), timeout=timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    e = asyncio.TimeoutError(f"{self.name} timed out after {timeout:.2f}s")
+                    self.timeout.observe(timeout)
+                self.breaker.record_failure()
+                self.last_error = str(e) or type(e).__name__
+                if attempt < self.max_retries and self.breaker.allow() and self.budget.withdraw():
+                    await asyncio.sleep(self._backoff(attempt))
+                    attempt += 1
+                    continue
+                return self._fallback(e)
+
+            self.timeout.observe(time.monotonic() - started)
+            self.breaker.record_success()
+            self._last_good = (result, time.time())
+            self.serving_stale = False
+            return result
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, self.backoff_base * 2 ** attempt)
+
+    def _fallback(self, error: Exception) -> Dict[str, Any]:
+        if self._last_good is not None:
+            value, fetched_at = self._last_good
+            age = time.time() - fetched_at
+            if age <= self.last_good_max_age:
+                logger.warning("Serving last good %s data (%.0fs old): %s", self.name, age, error, extra={"upstream": self.name})
+                self.serving_stale = True
+                return dict(value)
+        raise UpstreamUnavailableError(f"{self.name} unavailable: {error}") from error
+
+    @property
+    def health(self) -> str:
+        """Summarise the guard as healthy, degraded or unhealthy"""
+        if self.breaker.state == CircuitBreaker.OPEN and not self.serving_stale:
+            return "unhealthy"
+        if self.breaker.state != CircuitBreaker.CLOSED or self.serving_stale:
+            return "degraded"
+        return "healthy"
+
+    def status(self) -> Dict[str, Any]:
+        """Detailed guard state for monitoring"""
+        last_success_age = time.time() - self._last_good[1] if self._last_good else None
+        return {
+            "state": self.breaker.state,
+            "health": self.health,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "timeout": round(self.timeout.current(), 3),
+            "latency_p50": self.timeout.quantile(0.5),
+            "latency_p99": self.timeout.quantile(0.99),
+            "serving_stale": self.serving_stale,
+            "last_success_age": last_success_age,
+            "last_error": self.last_error
+        }
+
+
+# Global registry of upstream guards, one per source
+upstream_guards: Dict[str, UpstreamGuard] = {}
+
+
+def get_upstream_guard(name: str) -> UpstreamGuard:
+    """Get (or lazily create) the guard for an upstream source"""
+    guard = upstream_guards.get(name)
+    if guard is None:
+        guard = upstream_guards[name] = UpstreamGuard(name)
+    return guard
@@ -0,0 +1,292 @@
+"""
+Mood scoring rules compiled into breakpoint tables, hot-reloaded from a file
+"""
+import hashlib
+import json
+import logging
+import math
+import operator
+import os
+import time
+from bisect import bisect_right
+from datetime import datetime
+from functools import partial
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from app.config.settings import settings
+from app.models.schemas import MoodType
+
+logger = logging.getLogger(__name__)
+
+# Each band applies while the value is strictly below or above its bound;
+# when bands overlap the largest penalty wins. `factor` marks bands that
+# list the metric's factor label among the mood factors.
+DEFAULT_SCORING_RULES: Dict[str, Any] = {
+    "base_score": 100,
+    "confidence": 0.85,
+    "metrics": {
+        "temperature": {
+            "default": 15.0,
+            "factor": "Temperature fluctuations",
+            "bands": [
+                {"below": 13, "penalty": 15, "factor": True},
+                {"above": 16, "penalty": 15, "factor": True},
+                {"below": 14, "penalty": 8},
+                {"above": 15, "penalty": 8}
+            ]
+        },
+        "co2_levels": {
+            "default": 420,
+            "factor": "Elevated CO2 levels",
+            "bands": [
+                {"above": 400, "penalty": 20, "factor": True},
+                {"above": 350, "penalty": 12, "factor": True}
+            ]
+        },
+        "forest_cover": {
+            "default": 31.2,
+            "factor": "Declining forest cover",
+            "bands": [
+                {"below": 30, "penalty": 15, "factor": True},
+                {"below": 32, "penalty": 8, "factor": True}
+            ]
+        },
+        "ocean_health": {
+            "default": 72.0,
+            "factor": "Ocean health concerns",
+            "bands": [
+                {"below": 70, "penalty": 12, "factor": True},
+                {"below": 75, "penalty": 4, "factor": True}
+            ]
+        }
+    },
+    # Highest min_score first; the last mood catches everything below
+    "moods": [
+        {
+            "min_score": 70,
+            "mood": "healing",
+            "trend": "improving",
+            "statement": "Earth is showing signs of recovery with improving environmental indicators."
+        },
+        {
+            "min_score": 50,
+            "mood": "stressed",
+            "trend": "stable",
+            "statement": "Earth is under moderate stress but maintaining stability in key areas."
+        },
+        {
+            "mood": "critical",
+            "trend": "declining",
+            "statement": "Earth is in critical condition requiring immediate attention and action."
+        }
+    ]
+}
+
+
+class MetricTable:
+    """Bands of one metric flattened into sorted breakpoints.
+
+    `bisect_right(bounds, value)` selects the region; each region carries the
+    penalty and factor flag of the bands that hold everywhere inside it.
+    """
+
+    __slots__ = ("name", "default", "factor", "bounds", "penalties", "flags")
+
+    def __init__(self, name: str, default: float, factor: Optional[str], bands: List[Dict[str, Any]]):
+        # "above x" starts just after x, so one bisect_right covers both kinds
+        edges = set()
+        for band in bands:
+            if ("below" in band) == ("above" in band):
+                raise ValueError(f"Metric {name}: each band needs exactly one of 'below' or 'above'")
+            if "below" in band:
+                edges.add(float(band["below"]))
+            else:
+                edges.add(math.nextafter(float(band["above"]), math.inf))
+        self.name = name
+        self.default = float(default)
+        self.factor = factor
+        self.bounds = tuple(sorted(edges))
+
+        penalties = []
+        flags = []
+        lows = (-math.inf,) + self.bounds
+        highs = self.bounds + (math.inf,)
+        for low, high in zip(lows, highs):
+            matched = [
+                band for band in bands
+                if ("below" in band and high <= band["below"])
+                or ("above" in band and low > band["above"])
+            ]
+            penalties.append(max((float(band["penalty"]) for band in matched), default=0.0))
+            flags.append(any(band.get("factor") for band in matched))
+        self.penalties = tuple(penalties)
+        self.flags = tuple(flags)
+
+
+class ScoringRules:
+    """Immutable compiled rule set; swapped as a whole on reload"""
+
+    __slots__ = ("base_score", "confidence", "metrics", "mood_bounds", "moods", "version", "source", "loaded_at", "_bounded")
+
+    def __init__(self, definition: Mapping[str, Any], source: str = "defaults"):
+        metrics = definition.get("metrics")
+        if not isinstance(metrics, dict) or not metrics:
+            raise ValueError("scoring rules need a non-empty 'metrics' object")
+        self.metrics = tuple(
+            MetricTable(name, spec.get("default", 0.0), spec.get("factor"), spec.get("bands", []))
+            for name, spec in metrics.items()
+        )
+        self.base_score = float(definition.get("base_score", 100))
+        self.confidence = float(definition.get("confidence", 0.85))
+        # Scores need clamping only if some combination of bands leaves 0-100
+        lowest = self.base_score - sum(max(metric.penalties) for metric in self.metrics)
+        highest = self.base_score - sum(min(metric.penalties) for metric in self.metrics)
+        self._bounded = 0.0 <= lowest and highest <= 100.0
+
+        moods = sorted(
+            definition.get("moods", []),
+            key=lambda mood: mood.get("min_score", -math.inf)
+        )
+        if not moods or "min_score" in moods[0]:
+            raise ValueError("scoring rules need a fallback mood without 'min_score'")
+        self.mood_bounds = tuple(float(mood["min_score"]) for mood in moods[1:])
+        self.moods = tuple(
+            (MoodType(mood["mood"]), mood.get("trend", "stable"), mood.get("statement", ""))
+            for mood in moods
+        )
+
+        canonical = json.dumps(definition, sort_keys=True, default=str).encode()
+        self.version = hashlib.sha1(canonical).hexdigest()[:12]
+        self.source = source
+        self.loaded_at = datetime.utcnow()
+
+    def score(self, data: Mapping[str, Any]) -> Tuple[float, List[str]]:
+        """Score one snapshot; returns the score clamped to 0-100 and its factor labels"""
+        score = self.base_score
+        factors = []
+        for metric in self.metrics:
+            value = data.get(metric.name)
+            region = bisect_right(metric.bounds, metric.default if value is None else value)
+            score -= metric.penalties[region]
+            if metric.flags[region]:
+                factors.append(metric.factor)
+        return min(100.0, max(0.0, score)), factors
+
+    def score_columns(self, columns: Mapping[str, Sequence[Optional[float]]], size: int) -> Tuple[List[float], List[Tuple[str, ...]]]:
+        """Score `size` snapshots given as one value column per metric.
+
+        Same tables as `score`, applied a column at a time: one bisect per
+        value, no per-row dict lookups. Factors are gathered as a bitmask per
+        row and resolved to shared label tuples at the end.
+        """
+        scores = [self.base_score] * size
+        masks = [0] * size
+        for bit, metric in enumerate(self.metrics):
+            values = columns.get(metric.name)
+            if values is None:
+                values = [metric.default] * size
+            elif None in values:
+                values = [metric.default if value is None else value for value in values]
+            regions = list(map(partial(bisect_right, metric.bounds), values))
+            scores = list(map(operator.sub, scores, map(metric.penalties.__getitem__, regions)))
+            if any(metric.flags):
+                bits = tuple(1 << bit if flag else 0 for flag in metric.flags)
+                masks = list(map(operator.or_, masks, map(bits.__getitem__, regions)))
+
+        labels: Dict[int, Tuple[str, ...]] = {}
+        for mask in set(masks):
+            labels[mask] = tuple(metric.factor for bit, metric in enumerate(self.metrics) if mask >> bit & 1)
+        if not self._bounded:
+            scores = [min(100.0, max(0.0, score)) for score in scores]
+        return scores, list(map(labels.__getitem__, masks))
+
+    def mood(self, score: float) -> Tuple[MoodType, str, str]:
+        """(mood, trend, statement) for a score"""
+        return self.moods[bisect_right(self.mood_bounds, score)]
+
+
+class ScoringRuleSet:
+    """Holds the active rules and swaps in recompiled ones when the file changes.
+
+    Readers take `current` once per scoring call, so a reload never mixes two
+    rule versions within one result. Each process checks the file's mtime at
+    most every `check_interval` seconds, which reloads every worker without a
+    restart. A file that fails to load or compile keeps the previous rules.
+    """
+
+    def __init__(self, path: Optional[str] = None, check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._rules = ScoringRules(DEFAULT_SCORING_RULES)
+        self._signature: Optional[Tuple[int, int]] = None
+        self._next_check = 0.0
+        self.reloads = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        if path:
+            self.reload()
+
+    @property
+    def current(self) -> ScoringRules:
+        if self.path:
+            now = time.monotonic()
+            if now >= self._next_check:
+                self._next_check = now + self.check_interval
+                self._check()
+        return self._rules
+
+    def _check(self) -> None:
+        try:
+            stat = os.stat(self.path)
+        except OSError as e:
+            self._failed(e)
+            return
+        if (stat.st_mtime_ns, stat.st_size) != self._signature:
+            self.reload()
+
+    def reload(self) -> bool:
+        """Load and compile the rules file; the active rules change only on success"""
+        if not self.path:
+            return False
+        try:
+            stat = os.stat(self.path)
+            with open(self.path) as f:
+                rules = ScoringRules(json.load(f), source=self.path)
+        except Exception as e:
+            self._failed(e)
+            return False
+        self._signature = (stat.st_mtime_ns, stat.st_size)
+        if rules.version != self._rules.version:
+            self._rules = rules
+            self.reloads += 1
+            logger.info(
+                "Loaded scoring rules %s from %s",
+                rules.version,
+                self.path,
+                extra={"rules_version": rules.version}
+            )
+        self.last_error = None
+        return True
+
+    def _failed(self, error: Exception) -> None:
+        # Report a broken file once, not on every check
+        message = str(error)
+        if message != self.last_error:
+            self.errors += 1
+            self.last_error = message
+            logger.error("Error loading scoring rules from %s: %s", self.path, error)
+
+    def stats(self) -> Dict[str, Any]:
+        rules = self._rules
+        return {
+            "version": rules.version,
+            "source": rules.source,
+            "loaded_at": rules.loaded_at.isoformat(),
+            "reloads": self.reloads,
+            "errors": self.errors,
+            "last_error": self.last_error
+        }
+
+
+# Global scoring rule set instance
+scoring_rules = ScoringRuleSet(settings.scoring_rules_file, settings.scoring_rules_check_interval)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Cold start budget check for the GaiaPulse backend
+
+Imports main in fresh interpreters under `-X importtime`, runs the application
+startup, and exits non-zero when the median cold start exceeds the budget or
+when a deferred dependency is imported eagerly. Suitable as a CI gate.
+
+Examples:
+    python check_startup.py
+    python check_startup.py --budget-ms 800 --runs 5 --top 20
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from app.config.settings import settings
+
+# Modules that must only load on first use, never while booting
+DEFERRED_MODULES = ["httpx", "redis", "uvicorn", "numpy", "pandas", "torch", "openai", "ibm_watsonx_ai"]
+
+# Runs in the child interpreter: import, start up, report timings as JSON
+_PROBE = """
+import asyncio, json, sys, time
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+async def boot():
+    async with main.app.router.lifespan_context(main.app):
+        pass
+asyncio.run(boot())
+t2 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "ready_ms": (t2 - t0) * 1000, "modules": sorted(sys.modules)}))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Parse `-X importtime` lines into (module, self_us, cumulative_us)"""
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        records.append((name, int(self_us), int(cumulative_us)))
+    return records
+
+
+def cold_start(env: Dict[str, str]) -> Tuple[Dict[str, object], List[Tuple[str, int, int]]]:
+    """Run one cold start in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1]), parse_importtime(result.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Fail when backend cold start exceeds its time budget")
+    parser.add_argument("--budget-ms", type=float, default=settings.startup_budget_ms, help="Maximum median cold start")
+    parser.add_argument("--runs", type=int, default=3, help="Cold starts to measure")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to report")
+    args = parser.parse_args(argv)
+
+    # Measure the app as deployed, without the in-process profiler or
+    # background probes hitting real services
+    env = dict(os.environ, STARTUP_PROFILE="false", LOG_LEVEL="WARNING")
+    timings = []
+    slowest: List[Tuple[str, int, int]] = []
+    eager: List[str] = []
+    for _ in range(args.runs):
+        timing, records = cold_start(env)
+        timings.append(timing)
+        slowest = records
+        eager = [name for name in DEFERRED_MODULES if name in timing["modules"]]
+
+    import_ms = statistics.median(timing["import_ms"] for timing in timings)
+    ready_ms = statistics.median(timing["ready_ms"] for timing in timings)
+
+    print(f"⏱️  Cold start over {args.runs} runs: imports {import_ms:.0f} ms, ready {ready_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    print("Slowest imports (cumulative):")
+    print("  self [us] | cumulative | module")
+    for name, self_us, cumulative_us in sorted(slowest, key=lambda record: record[2], reverse=True)[:args.top]:
+        print(f"  {self_us:>9} | {cumulative_us:>10} | {name}")
+
+    failed = False
+    if eager:
+        print(f"❌ Deferred modules imported during startup: {', '.join(eager)}")
+        failed = True
+    if ready_ms > args.budget_ms:
+        print(f"❌ Cold start of {ready_ms:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if not failed:
+        print("✅ Cold start within budget")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
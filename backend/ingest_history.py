@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Bulk ingestion of historical climate datasets into the GaiaPulse history store
+
+Examples:
+    python ingest_history.py co2_mm_mlo.csv --preset mauna_loa
+    python ingest_history.py GLB.Ts+dSST.csv --preset gistemp
+    python ingest_history.py readings.parquet --metric temperature --unit "°C" \\
+        --timestamp-column time --value-column temp
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.config.settings import settings
+from app.models.schemas import DataSource
+from app.services.history_store import HistoryStore, SampleRow
+from app.services.quality_service import QualityMonitor, quality_monitor
+
+# Dataset presets: column layout plus the metric the series is stored under
+PRESETS: Dict[str, Dict[str, Any]] = {
+    # NOAA GML Mauna Loa CO2 (monthly co2_mm_mlo.csv or daily co2_daily_mlo.csv)
+    "mauna_loa": {"layout": "mauna_loa", "metric": "co2_levels", "unit": "ppm", "source": "sensor"},
+    # NASA GISTEMP global means (GLB.Ts+dSST.csv), one row per year with monthly columns
+    "gistemp": {"layout": "gistemp", "metric": "temperature_anomaly", "unit": "°C", "source": "nasa"},
+    # Any table with a timestamp column and a value column
+    "generic": {"layout": "generic"},
+}
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+MISSING_MARKERS = {"", "NA", "NaN", "nan", "***", "****", "-99.99", "-999.99", "-9.99"}
+
+
+def _epoch(year: int, month: int = 1, day: int = 1) -> int:
+    return int(datetime(year, month, day, tzinfo=timezone.utc).timestamp())
+
+
+def _parse_timestamp(raw: str) -> int:
+    """Parse ISO 8601 dates/datetimes or epoch seconds into epoch seconds (UTC)"""
+    raw = raw.strip()
+    try:
+        return int(float(raw))
+    except ValueError:
+        pass
+    parsed = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def _parse_value(raw: Any) -> Optional[float]:
+    if raw is None:
+        return None
+    if isinstance(raw, (int, float)):
+        return float(raw)
+    raw = raw.strip()
+    if raw in MISSING_MARKERS:
+        return None
+    try:
+        return float(raw)
+    except ValueError:
+        return None
+
+
+def normalize_records(records: List[Dict[str, Any]], spec: Dict[str, Any]) -> List[SampleRow]:
+    """Turn parsed records into store rows in the Point shape (runs in worker processes)"""
+    metric, unit, source = spec["metric"], spec["unit"], spec["source"]
+    confidence = spec.get("confidence")
+    layout = spec["layout"]
+    rows: List[SampleRow] = []
+
+    for record in records:
+        if layout == "mauna_loa":
+            value = _parse_value(record.get("average", record.get("value")))
+            if value is None:
+                continue
+            year, month = int(float(record["year"])), int(float(record["month"]))
+            day = int(float(record["day"])) if record.get("day") else 1
+            rows.append((metric, _epoch(year, month, day), value, unit, source, confidence, None))
+
+        elif layout == "gistemp":
+            try:
+                year = int(record["Year"])
+            except (KeyError, ValueError):
+                continue
+            for index, month in enumerate(MONTHS, start=1):
+                value = _parse_value(record.get(month))
+                if value is not None:
+                    rows.append((metric, _epoch(year, index), value, unit, source, confidence, None))
+
+        else:
+            value = _parse_value(record.get(spec["value_column"]))
+            raw_timestamp = record.get(spec["timestamp_column"])
+            if value is None or raw_timestamp in (None, ""):
+                continue
+            if isinstance(raw_timestamp, datetime):
+                ts = int(raw_timestamp.replace(tzinfo=raw_timestamp.tzinfo or timezone.utc).timestamp())
+            else:
+                ts = _parse_timestamp(str(raw_timestamp))
+            row_confidence = confidence
+            if spec.get("confidence_column"):
+                row_confidence = _parse_value(record.get(spec["confidence_column"]))
+            metadata = None
+            if spec.get("metadata_columns"):
+                metadata = json.dumps({column: record.get(column) for column in spec["metadata_columns"]})
+            rows.append((metric, ts, value, unit, source, row_confidence, metadata))
+
+    return rows
+
+
+def parse_csv_rows(rows: List[List[str]], header: List[str], spec: Dict[str, Any]) -> List[SampleRow]:
+    """Normalise a chunk of CSV rows (runs in worker processes)"""
+    if spec["layout"] == "generic" and not spec.get("metadata_columns"):
+        return _parse_generic_columns(rows, header, spec)
+    records = [dict(zip(header, (field.strip() for field in row))) for row in rows]
+    return normalize_records(records, spec)
+
+
+def _parse_generic_columns(csv_rows: List[List[str]], header: List[str], spec: Dict[str, Any]) -> List[SampleRow]:
+    """Fast path for large flat tables: index columns directly instead of building dicts"""
+    metric, unit, source = spec["metric"], spec["unit"], spec["source"]
+    ts_index = header.index(spec["timestamp_column"])
+    value_index = header.index(spec["value_column"])
+    confidence_index = header.index(spec["confidence_column"]) if spec.get("confidence_column") else None
+    default_confidence = spec.get("confidence")
+    rows: List[SampleRow] = []
+    append = rows.append
+    for row in csv_rows:
+        if len(row) <= max(ts_index, value_index):
+            continue
+        value = _parse_value(row[value_index])
+        if value is None or not row[ts_index]:
+            continue
+        confidence = _parse_value(row[confidence_index]) if confidence_index is not None else default_confidence
+        append((metric, _parse_timestamp(row[ts_index]), value, unit, source, confidence, None))
+    return rows
+
+
+def validate_chunk(parse: Callable[..., List[SampleRow]], *parse_args: Any) -> Tuple[List[SampleRow], array, Any]:
+    """Parse a chunk and flag it with a fresh quality monitor (runs in worker processes)"""
+    rows = parse(*parse_args)
+    monitor = QualityMonitor(
+        window=settings.quality_window,
+        z_threshold=settings.quality_z_threshold,
+        gap_factor=settings.quality_gap_factor
+    )
+    flags = monitor.validate_rows(rows)
+    state = monitor.series_state(rows[0][0], rows[0][4]) if rows else None
+    return rows, flags, state
+
+
+def iter_csv_chunks(path: str, chunk_rows: int, layout: str) -> Iterator[Tuple[List[str], List[List[str]]]]:
+    """Yield (header, parsed row chunk) pairs, skipping comments and preamble lines.
+
+    Rows are parsed from the file object itself, so quoted fields may span
+    lines; chunks are cut between parsed rows.
+    """
+    header: Optional[List[str]] = None
+    chunk: List[List[str]] = []
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.reader(f):
+            if not row or not "".join(row).strip() or row[0].startswith("#"):
+                continue
+            if header is None:
+                fields = [field.strip() for field in row]
+                # GISTEMP tables start with a title line before the header
+                if layout == "gistemp" and fields[0] != "Year":
+                    continue
+                header = fields
+                continue
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                yield header, chunk
+                chunk = []
+    if chunk and header is not None:
+        yield header, chunk
+
+
+def iter_parquet_chunks(path: str, chunk_rows: int) -> Iterator[List[Dict[str, Any]]]:
+    """Yield record chunks from a Parquet file (requires pyarrow)"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Parquet input requires pyarrow: pip install pyarrow")
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+        yield batch.to_pylist()
+
+
+def build_spec(args: argparse.Namespace) -> Dict[str, Any]:
+    """Merge the preset with command line overrides"""
+    spec = dict(PRESETS[args.preset])
+    for key in ("metric", "unit", "source", "timestamp_column", "value_column", "confidence_column", "confidence"):
+        value = getattr(args, key)
+        if value is not None:
+            spec[key] = value
+    if args.metadata_columns:
+        spec["metadata_columns"] = args.metadata_columns.split(",")
+
+    missing = [key for key in ("metric", "unit", "source") if key not in spec]
+    if spec["layout"] == "generic":
+        missing += [key for key in ("timestamp_column", "value_column") if key not in spec]
+    if missing:
+        raise SystemExit(f"Missing required options for preset '{args.preset}': {', '.join('--' + m.replace('_', '-') for m in missing)}")
+    DataSource(spec["source"])  # Validate against the known sources
+    return spec
+
+
+def ingest_file(path: str, spec: Dict[str, Any], store: HistoryStore, executor: ProcessPoolExecutor, args: argparse.Namespace) -> Tuple[int, int, int]:
+    """Parse a file across the process pool and upsert rows in batches"""
+    def submit(parse: Callable[..., List[SampleRow]], *parse_args: Any):
+        if args.skip_validation:
+            return executor.submit(parse, *parse_args)
+        return executor.submit(validate_chunk, parse, *parse_args)
+
+    is_parquet = path.endswith((".parquet", ".pq"))
+    if is_parquet:
+        futures_iter = (submit(normalize_records, records, spec) for records in iter_parquet_chunks(path, args.chunk_size))
+    else:
+        futures_iter = (
+            submit(parse_csv_rows, rows, header, spec)
+            for header, rows in iter_csv_chunks(path, args.chunk_size, spec["layout"])
+        )
+
+    parsed = written = flagged = 0
+    pending = []
+    batch: List[SampleRow] = []
+    quality = array("B")
+
+    def drain(future) -> None:
+        nonlocal parsed, written, flagged, batch, quality
+        if args.skip_validation:
+            rows = future.result()
+        else:
+            # Chunks are drained in file order, so the monitor stitches each
+            # worker-validated chunk onto the end of the previous one
+            rows, flags, state = future.result()
+            flags = quality_monitor.merge_chunk(rows, flags, state)
+            flagged += len(flags) - flags.count(0)
+            quality.extend(flags)
+        parsed += len(rows)
+        batch.extend(rows)
+        while len(batch) >= args.batch_size:
+            written += store.upsert_many(batch[:args.batch_size], quality[:args.batch_size] if quality else None)
+            batch = batch[args.batch_size:]
+            quality = quality[args.batch_size:]
+
+    # Keep a bounded number of chunks in flight so memory stays flat on huge files
+    for future in futures_iter:
+        pending.append(future)
+        if len(pending) >= args.workers * 2:
+            drain(pending.pop(0))
+    for future in pending:
+        drain(future)
+    if batch:
+        written += store.upsert_many(batch, quality if quality else None)
+    return parsed, written, flagged
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk-load historical climate datasets into the history store")
+    parser.add_argument("files", nargs="+", help="CSV or Parquet files to ingest")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="generic", help="Dataset layout preset")
+    parser.add_argument("--metric", help="Metric name to store the series under")
+    parser.add_argument("--unit", help="Unit of measurement")
+    parser.add_argument("--source", help=f"Data source ({', '.join(s.value for s in DataSource)})")
+    parser.add_argument("--timestamp-column", help="Timestamp column (generic layout)")
+    parser.add_argument("--value-column", help="Value column (generic layout)")
+    parser.add_argument("--confidence-column", help="Optional per-row confidence column")
+    parser.add_argument("--confidence", type=float, help="Confidence assigned to every row")
+    parser.add_argument("--metadata-columns", help="Comma-separated columns kept as point metadata")
+    parser.add_argument("--db", default=settings.history_db_path, help="History store path")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parser processes")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Rows per parse chunk")
+    parser.add_argument("--batch-size", type=int, default=50000, help="Rows per upsert transaction")
+    parser.add_argument("--skip-validation", action="store_true", help="Store rows without data-quality flags")
+    args = parser.parse_args(argv)
+
+    spec = build_spec(args)
+    store = HistoryStore(args.db)
+    store.bulk_mode(True)
+
+    print(f"🌍 Ingesting {len(args.files)} file(s) into {args.db} as '{spec['metric']}' with {args.workers} workers")
+    started = time.perf_counter()
+    total_parsed = total_written = 0
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            for path in args.files:
+                file_started = time.perf_counter()
+                parsed, written, flagged = ingest_file(path, spec, store, executor, args)
+                elapsed = time.perf_counter() - file_started
+                total_parsed += parsed
+                total_written += written
+                print(f"  {path}: {written:,} rows in {elapsed:.2f}s ({written / max(elapsed, 1e-9):,.0f} rows/s), {flagged:,} flagged")
+    finally:
+        store.bulk_mode(False)
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {total_written:,} rows upserted in {elapsed:.2f}s ({total_written / max(elapsed, 1e-9):,.0f} rows/s)")
+    if not args.skip_validation:
+        for source, stats in quality_monitor.stats().items():
+            flags = ", ".join(f"{name}={count:,}" for name, count in stats["flags"].items()) or "none"
+            print(f"🔎 {source}: {stats['flagged']:,} of {stats['samples']:,} rows flagged ({flags})")
+    print(f"📁 {spec['metric']} now has {store.count(spec['metric']):,} samples")
+    if settings.history_backend != "store":
+        print("Set HISTORY_BACKEND=store (and HISTORY_METRIC) to serve ingested data from the API.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
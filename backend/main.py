@@ -2,11 +2,19 @@
 GaiaPulse Backend - Main Entry Point
 Environmental Monitoring & AI-Powered Insights
 """
-import uvicorn
-from app.core.app import app
-from app.config.settings import settings
+from app.core.startup import startup_profiler
+
+# Profile everything the application imports (STARTUP_PROFILE=true)
+startup_profiler.start()
+
+from app.core.app import app  # noqa: E402
+from app.config.settings import settings  # noqa: E402
+
+startup_profiler.imports_done()
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(
         "main:app",
         host=settings.host,
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Horizontal scaling harness for GaiaPulse against the local upstream simulator
+
+Starts upstream_sim.py, then for each worker count starts the backend with
+its upstream URLs pointed at the simulator, drives closed-loop load and
+reports throughput, latency percentiles and upstream call amplification
+(simulated upstream calls per served request) measured over the same window.
+
+`--server serve` runs serve.py: one ingestion leader publishing into shared
+memory for N read-only workers, so upstream calls stay flat as N grows.
+`--server uvicorn` runs N independent uvicorn workers that share no state;
+each one ingests on its own, so upstream calls grow with N.
+
+Examples:
+    python scale_harness.py --workers 1 2 4
+    python scale_harness.py --server uvicorn --workers 1 4 --preset slow_nasa --duration 30
+    python scale_harness.py --path /api/v1/mood/current_mood --path /api/v1/mood/pulse_history --json
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return None
+    return values[min(len(values) - 1, max(0, int(round(q * len(values) + 0.5)) - 1))]
+
+
+def start_process(args: List[str], env: Dict[str, str], log_path: str) -> subprocess.Popen:
+    log = open(log_path, "ab")
+    return subprocess.Popen([sys.executable, *args], cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+def stop_process(process: subprocess.Popen) -> None:
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+async def wait_ready(client: Any, url: str, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Process exited with code {process.returncode} before {url} was ready")
+        try:
+            if (await client.get(url)).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} not ready after {timeout:g}s")
+
+
+async def drive_load(client: Any, base_url: str, paths: List[str], concurrency: int, duration: float) -> Dict[str, Any]:
+    """Closed loop: `concurrency` clients each issue requests back to back"""
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    deadline = time.perf_counter() + duration
+
+    async def worker(offset: int) -> None:
+        index = offset
+        while time.perf_counter() < deadline:
+            path = paths[index % len(paths)]
+            index += 1
+            started = time.perf_counter()
+            try:
+                status = str((await client.get(base_url + path)).status_code)
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    ok = statuses.get("200", 0)
+    return {
+        "requests": len(latencies),
+        "ok": ok,
+        "statuses": statuses,
+        "elapsed": round(elapsed, 3),
+        "throughput": round(ok / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else None,
+    }
+
+
+async def run_scenario(args: argparse.Namespace, client: Any, sim_url: str, workers: int) -> Dict[str, Any]:
+    port = free_port()
+    env = {
+        **os.environ,
+        "ENABLE_MOCK_DATA": "false",
+        "NASA_API_KEY": "simulated",
+        "WEATHER_API_KEY": "simulated",
+        "AIR_QUALITY_API_KEY": "simulated",
+        "NASA_API_URL": sim_url,
+        "WEATHER_API_URL": sim_url,
+        "AIR_QUALITY_API_URL": sim_url,
+        "DATA_UPDATE_INTERVAL": str(args.interval),
+        "RATE_LIMIT_ENABLED": "false",
+        # serve.py requires shared or sticky chat sessions for several workers;
+        # the measured paths never create sessions, so declaring sticky is safe
+        "CHAT_SESSION_STICKY": "true",
+        "LOG_ACCESS": "false",
+        "LOG_LEVEL": "WARNING",
+    }
+    if args.server == "serve":
+        command = ["serve.py", "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--interval", str(args.interval)]
+    else:
+        command = ["-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    backend = start_process(command, env, args.log_file)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        await wait_ready(client, base_url + "/api/v1/ping", backend, args.startup_timeout)
+        # Let every worker come up and finish its first ingest before measuring
+        await drive_load(client, base_url, args.path, args.concurrency, args.warmup)
+        await client.post(sim_url + "/_sim/reset")
+        load = await drive_load(client, base_url, args.path, args.concurrency, args.duration)
+        upstreams = (await client.get(sim_url + "/_sim/stats")).json()["upstreams"]
+    finally:
+        stop_process(backend)
+
+    calls = sum(upstream["calls"] for upstream in upstreams.values())
+    return {
+        "server": args.server,
+        "workers": workers,
+        **load,
+        "upstream_calls": calls,
+        "upstream_errors": sum(upstream["errors"] for upstream in upstreams.values()),
+        "upstream_calls_per_s": round(calls / load["elapsed"], 2),
+        "amplification": round(calls / load["ok"], 4) if load["ok"] else None,
+        "upstreams": upstreams,
+    }
+
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    columns = ["server", "workers", "requests", "throughput", "p50_ms", "p95_ms", "p99_ms", "max_ms", "upstream_calls", "upstream_calls_per_s", "amplification"]
+    rows = [[str(result[column]) for column in columns] for result in results]
+    widths = [max(len(column), *(len(row[i]) for row in rows)) for i, column in enumerate(columns)]
+    print("  ".join(column.rjust(width) for column, width in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(cell.rjust(width) for cell, width in zip(row, widths)))
+    for result in results:
+        errors = {status: count for status, count in result["statuses"].items() if status != "200"}
+        if errors:
+            print(f"workers={result['workers']}: non-200 responses {errors}")
+
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    import httpx
+
+    sim_port = free_port()
+    sim_url = f"http://127.0.0.1:{sim_port}"
+    sim_args = ["upstream_sim.py", "--port", str(sim_port), "--preset", args.preset]
+    if args.profile_file:
+        sim_args += ["--profile-file", args.profile_file]
+    simulator = start_process(sim_args, {**os.environ, "LOG_LEVEL": "WARNING"}, args.log_file)
+    limits = httpx.Limits(max_connections=args.concurrency + 4, max_keepalive_connections=args.concurrency + 4)
+    results = []
+    try:
+        async with httpx.AsyncClient(limits=limits, timeout=args.request_timeout) as client:
+            await wait_ready(client, sim_url + "/_sim/stats", simulator, args.startup_timeout)
+            for workers in args.workers:
+                results.append(await run_scenario(args, client, sim_url, workers))
+    finally:
+        stop_process(simulator)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure GaiaPulse scaling against simulated upstreams")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts to run in turn")
+    parser.add_argument("--server", choices=["serve", "uvicorn"], default="serve", help="Shared-snapshot leader (serve) or independent workers (uvicorn)")
+    parser.add_argument("--path", action="append", help="Request path, repeatable (round-robin); default /api/v1/mood/current_mood")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent closed-loop clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per worker count")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds of load before each run")
+    parser.add_argument("--interval", type=int, default=5, help="Backend ingest interval in seconds")
+    parser.add_argument("--preset", default="healthy", help="upstream_sim.py preset")
+    parser.add_argument("--profile-file", help="upstream_sim.py profile overrides")
+    parser.add_argument("--request-timeout", type=float, default=30.0)
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--log-file", default=os.devnull, help="Where backend and simulator output goes")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+    args.path = args.path or ["/api/v1/mood/current_mood"]
+
+    try:
+        results = asyncio.run(run(args))
+    except RuntimeError as e:
+        print(f"Harness failed: {e}", file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
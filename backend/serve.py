@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Multi-process serving for GaiaPulse
+
+One leader process runs the ingestion pipeline and publishes each snapshot
+(current data, current mood and the common history windows, pre-encoded as
+JSON) into shared memory. N uvicorn workers attach read-only and serve those
+bytes directly, so adding workers adds read throughput without adding
+upstream fetches or repeated analysis.
+
+Example:
+    python serve.py --host 0.0.0.0 --port 8787 --workers 4
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import multiprocessing.synchronize
+import os
+import signal
+import sys
+from typing import List, Optional
+
+from app.config.settings import settings
+from app.core.shared_snapshot import SnapshotPublisher
+from app.core.structured_logging import logging_pipeline
+
+logger = logging.getLogger("gaiapulse.serve")
+
+
+def run_leader(shm_name: str, interval: float, ready: multiprocessing.synchronize.Event) -> None:
+    """Leader process: ingest on a schedule and publish into the shared region"""
+    from app.services.ingestion import IngestionPipeline
+
+    # Shutdown is driven by the parent terminating this process
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging_pipeline.start()
+    pipeline = IngestionPipeline(publisher=SnapshotPublisher(shm_name, create=False))
+
+    async def loop() -> None:
+        await pipeline.tick()
+        ready.set()
+        await asyncio.sleep(interval)
+        await pipeline.run_forever(interval)
+
+    asyncio.run(loop())
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run GaiaPulse with one ingestion leader and N serving workers")
+    parser.add_argument("--host", default=settings.host)
+    parser.add_argument("--port", type=int, default=settings.port)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")), help="Serving worker processes")
+    parser.add_argument("--interval", type=float, default=settings.data_update_interval, help="Seconds between ingest ticks")
+    parser.add_argument("--slot-size", type=int, default=settings.snapshot_slot_size, help="Bytes per snapshot slot")
+    parser.add_argument("--startup-timeout", type=float, default=30.0, help="Seconds to wait for the first snapshot")
+    args = parser.parse_args(argv)
+    # Chat sessions live in worker memory unless they are shared through Redis
+    sessions_shared = settings.chat_session_spill and settings.redis_configured
+    if args.workers > 1 and not (sessions_shared or settings.chat_session_sticky):
+        parser.error(
+            "chat sessions need CHAT_SESSION_SPILL=true with REDIS_URL, or sticky routing "
+            "(CHAT_SESSION_STICKY=true), to run more than one worker"
+        )
+
+    logging_pipeline.start()
+
+    # The parent owns the region so it is unlinked exactly once on shutdown
+    publisher = SnapshotPublisher(slot_size=args.slot_size)
+    ready = multiprocessing.Event()
+    leader = multiprocessing.Process(
+        target=run_leader,
+        args=(publisher.name, args.interval, ready),
+        name="gaiapulse-leader",
+        daemon=True
+    )
+    leader.start()
+
+    try:
+        if not ready.wait(args.startup_timeout):
+            logger.error("Ingestion leader did not publish a snapshot in time")
+            return 1
+        logger.info("Leader published the first snapshot into %s, starting %d workers", publisher.name, args.workers)
+
+        # Spawned workers read their role from the environment; a single
+        # worker runs in this process with the already-loaded settings
+        os.environ["SERVING_ROLE"] = settings.serving_role = "worker"
+        os.environ["SNAPSHOT_SHM_NAME"] = settings.snapshot_shm_name = publisher.name
+
+        import uvicorn
+        uvicorn.run(
+            "main:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            log_level=settings.log_level.lower()
+        )
+    finally:
+        leader.terminate()
+        leader.join(timeout=5)
+        publisher.close()
+        logging_pipeline.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
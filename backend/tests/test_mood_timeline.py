@@ -0,0 +1,104 @@
+"""
+Materialized mood timeline, versions and patches
+"""
+import json
+from datetime import datetime, timedelta, timezone
+
+from app.models.schemas import CurrentMood, MoodType
+from app.services.mood_timeline import MoodTimeline, _epoch_ms
+
+T0 = datetime(2024, 1, 1)
+
+
+def mood_at(minutes: int, mood: MoodType = MoodType.HEALING, score: float = 80.0, trend: str = "stable") -> CurrentMood:
+    timestamp = T0 + timedelta(minutes=minutes)
+    return CurrentMood(
+        mood=mood,
+        score=score,
+        timestamp=timestamp,
+        predictive_statement="Steady",
+        confidence=0.8,
+        factors=["co2"],
+        trend=trend,
+        next_update=timestamp + timedelta(minutes=30)
+    )
+
+
+def test_epoch_ms_treats_naive_as_utc():
+    assert _epoch_ms(datetime(1970, 1, 1, 0, 0, 1)) == 1000
+    assert _epoch_ms(datetime(1970, 1, 1, 1, tzinfo=timezone(timedelta(hours=1)))) == 0
+
+
+def test_first_record_has_body_and_no_patch():
+    timeline = MoodTimeline()
+    assert timeline.record(mood_at(0))
+    body = json.loads(timeline.latest_body)
+    assert body["success"] and body["data"]["mood"] == "healing"
+    assert timeline.latest_patch is None
+    assert timeline.meta == {
+        "version": _epoch_ms(T0),
+        "base_version": None,
+        "next_update": _epoch_ms(T0 + timedelta(minutes=30)) / 1000
+    }
+    assert set(timeline.delta_blobs()) == {"current_mood_meta"}
+
+
+def test_patch_holds_only_changed_fields():
+    timeline = MoodTimeline()
+    timeline.record(mood_at(0))
+    first = timeline.meta["version"]
+    assert not timeline.record(mood_at(30, score=75.0))
+    assert timeline.meta["base_version"] == first
+    patch = json.loads(timeline.latest_patch)["data"]
+    assert patch["version"] == timeline.meta["version"]
+    assert patch["base_version"] == first
+    assert set(patch["changes"]) == {"score", "timestamp", "next_update"}
+    assert patch["changes"]["score"] == 75.0
+
+    blobs = timeline.delta_blobs()
+    assert blobs["current_mood_patch"] == timeline.latest_patch
+    assert json.loads(blobs["current_mood_meta"]) == timeline.meta
+
+
+def test_versions_increase_when_timestamps_do_not():
+    timeline = MoodTimeline()
+    timeline.record(mood_at(10))
+    timeline.record(mood_at(10))
+    timeline.record(mood_at(5))
+    first = _epoch_ms(T0 + timedelta(minutes=10))
+    assert timeline.meta["version"] == first + 2
+    assert timeline.meta["base_version"] == first + 1
+
+
+def test_transitions_count_mood_changes():
+    timeline = MoodTimeline()
+    results = [
+        timeline.record(mood_at(0)),
+        timeline.record(mood_at(1, score=70.0)),
+        timeline.record(mood_at(2, MoodType.STRESSED, 60.0)),
+        timeline.record(mood_at(3, MoodType.HEALING, 75.0)),
+    ]
+    assert results == [True, False, True, True]
+    assert timeline.transitions == 3
+
+
+def test_entries_filters():
+    timeline = MoodTimeline(capacity=4)
+    moods = [MoodType.HEALING, MoodType.HEALING, MoodType.STRESSED, MoodType.STRESSED, MoodType.CRITICAL]
+    for minute, mood in enumerate(moods):
+        timeline.record(mood_at(minute, mood, 40.0))
+    # Capacity dropped the first entry
+    assert [entry.timestamp.minute for entry in timeline.entries()] == [1, 2, 3, 4]
+    assert [entry.timestamp.minute for entry in timeline.entries(changes_only=True)] == [1, 2, 4]
+    assert [entry.timestamp.minute for entry in timeline.entries(limit=2)] == [3, 4]
+    since = (T0 + timedelta(minutes=2)).replace(tzinfo=timezone.utc)
+    assert [entry.timestamp.minute for entry in timeline.entries(since=since)] == [3, 4]
+    assert [entry.timestamp.minute for entry in timeline.entries(since=since, changes_only=True)] == [4]
+
+
+def test_replace_mirrors_leader():
+    timeline = MoodTimeline(capacity=2)
+    timeline.replace([mood_at(0), mood_at(1), mood_at(2)], seq=7)
+    assert timeline.synced_seq == 7
+    assert [entry.timestamp.minute for entry in timeline.entries()] == [1, 2]
+    assert timeline.latest.timestamp.minute == 2
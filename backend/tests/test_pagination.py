@@ -0,0 +1,104 @@
+"""
+Signed cursors and pulse history window resolution
+"""
+import asyncio
+import base64
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.services.data_service import DataService, _epoch_seconds
+
+
+@pytest.fixture
+def service() -> DataService:
+    service = DataService(use_snapshot=False)
+    service.history_backend = "synthetic"
+    return service
+
+
+def unsigned(position) -> str:
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    position = {"t": 1.5, "id": "rule:global:1:1"}
+    assert decode_cursor(encode_cursor(position)) == position
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "abc.def"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_unsigned_or_tampered_cursor_is_rejected():
+    signature = encode_cursor({"a": 0, "e": 3600, "p": "7d"}).partition(".")[2]
+    with pytest.raises(ValueError):
+        decode_cursor(unsigned({"a": 0, "e": 3600, "p": "7d"}))
+    with pytest.raises(ValueError):
+        decode_cursor(unsigned({"a": 0, "e": 10 ** 9, "p": "7d"}) + "." + signature)
+
+
+def test_non_object_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor([1, 2, 3]))
+
+
+def test_days_window(service):
+    first, last, period = service.resolve_history_window(days=7, end=datetime(2024, 1, 10, 12, 30))
+    assert last == datetime(2024, 1, 10, 12)
+    assert first == last - timedelta(days=7) + timedelta(hours=1)
+    assert period == "7d"
+
+
+def test_since_trims_window(service):
+    first, _, _ = service.resolve_history_window(days=7, end=datetime(2024, 1, 10), since=datetime(2024, 1, 9, 22, 15))
+    assert first == datetime(2024, 1, 9, 23)
+
+
+def test_span_limit(service):
+    with pytest.raises(ValueError):
+        service.resolve_history_window(start=datetime(2020, 1, 1), end=datetime(2022, 1, 1))
+
+
+def test_cursor_resumes_after_last_point(service):
+    last = datetime(2024, 1, 10)
+    cursor = encode_cursor({"a": _epoch_seconds(datetime(2024, 1, 5)), "e": _epoch_seconds(last), "p": "7d"})
+    first, resolved_last, period = service.resolve_history_window(cursor=cursor)
+    assert first == datetime(2024, 1, 5, 1)
+    assert resolved_last == last
+    assert period == "7d"
+
+
+@pytest.mark.parametrize("position", [
+    {"a": 0, "e": 1e12, "p": "x"},
+    {"a": 0, "e": 3 * 365 * 86400, "p": "x"},
+    {"a": 0, "e": float("inf"), "p": "x"},
+    {"a": 7200, "e": 3600, "p": "x"},
+    {"a": "later", "e": 3600, "p": "x"},
+    {"e": 3600, "p": "x"},
+])
+def test_invalid_cursor_windows_are_rejected(service, position):
+    with pytest.raises(ValueError):
+        service.resolve_history_window(cursor=encode_cursor(position))
+
+
+def test_pulse_history_pages_with_cursor(service):
+    async def pages():
+        first = await service.get_pulse_history(start=datetime(2024, 1, 1), end=datetime(2024, 1, 2), limit=10)
+        second = await service.get_pulse_history(cursor=first.next_cursor, limit=10)
+        return first, second
+
+    first, second = asyncio.run(pages())
+    assert first.total_points == 10
+    assert first.next_cursor
+    assert second.data[0].timestamp == first.data[-1].timestamp + timedelta(hours=1)
+
+
+def test_cursor_requires_limit(service):
+    cursor = encode_cursor({"a": 0, "e": 36000, "p": "x"})
+    with pytest.raises(ValueError):
+        asyncio.run(service.get_pulse_history(cursor=cursor))
@@ -0,0 +1,121 @@
+"""
+Batch data-quality validation
+"""
+import math
+import random
+
+from app.services.quality_service import (
+    FLAG_DUPLICATE,
+    FLAG_GAP,
+    FLAG_NON_MONOTONIC,
+    FLAG_RANGE,
+    FLAG_SCHEMA,
+    FLAG_SPIKE,
+    QualityMonitor,
+    flag_names,
+)
+
+HOUR = 3600
+
+
+def hourly(count: int, start: int = 0):
+    return [start + index * HOUR for index in range(count)]
+
+
+def noisy(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [400.0 + rng.uniform(-1, 1) for _ in range(count)]
+
+
+def rows_of(timestamps, values, metric: str = "co2_levels", source: str = "satellite"):
+    return [(metric, ts, value, "ppm", source, None, None) for ts, value in zip(timestamps, values)]
+
+
+def test_flag_names():
+    assert flag_names(0) == []
+    assert flag_names(FLAG_SCHEMA | FLAG_SPIKE) == ["schema", "spike"]
+
+
+def test_clean_series_has_no_flags():
+    flags = QualityMonitor().validate_batch("co2_levels", "satellite", hourly(200), noisy(200))
+    assert flags.count(0) == 200
+
+
+def test_schema_and_range_flags():
+    values = [410.0, None, "abc", math.nan, 5000.0, 410.0]
+    flags = QualityMonitor().validate_batch("co2_levels", "satellite", hourly(len(values)), values)
+    assert list(flags) == [0, FLAG_SCHEMA, FLAG_SCHEMA, FLAG_SCHEMA, FLAG_RANGE, 0]
+
+
+def test_timestamp_flags():
+    timestamps = hourly(12)
+    timestamps[5] = timestamps[4]
+    timestamps[8] = timestamps[3]
+    timestamps[11] = timestamps[10] + 10 * HOUR
+    flags = QualityMonitor().validate_batch("co2_levels", "satellite", timestamps, noisy(12))
+    assert flags[5] & FLAG_DUPLICATE
+    assert flags[8] & FLAG_NON_MONOTONIC
+    assert flags[11] & FLAG_GAP
+    assert not flags[1]
+
+
+def test_spike_is_flagged():
+    values = noisy(100)
+    values[60] = 480.0
+    flags = QualityMonitor().validate_batch("co2_levels", "satellite", hourly(100), values)
+    assert [index for index, flag in enumerate(flags) if flag & FLAG_SPIKE] == [60]
+
+
+def test_spike_detection_skips_invalid_values():
+    values = noisy(100)
+    values[30] = None
+    values[60] = 480.0
+    flags = QualityMonitor().validate_batch("co2_levels", "satellite", hourly(100), values)
+    assert flags[30] == FLAG_SCHEMA
+    assert [index for index, flag in enumerate(flags) if flag & FLAG_SPIKE] == [60]
+
+
+def test_batches_carry_state():
+    timestamps, values = hourly(300), noisy(300)
+    values[150] = 480.0
+    whole = QualityMonitor().validate_batch("co2_levels", "satellite", timestamps, values)
+    monitor = QualityMonitor()
+    chunked = []
+    for start in range(0, 300, 70):
+        chunked.extend(monitor.validate_batch("co2_levels", "satellite", timestamps[start:start + 70], values[start:start + 70]))
+    assert chunked == list(whole)
+
+
+def test_merge_chunk_matches_sequential_validation():
+    timestamps, values = hourly(400), noisy(400)
+    values[250] = 480.0
+    rows = rows_of(timestamps, values)
+    expected = list(QualityMonitor().validate_rows(rows))
+
+    merged = QualityMonitor()
+    result = list(merged.validate_rows(rows[:200]))
+    worker = QualityMonitor()
+    flags = worker.validate_rows(rows[200:])
+    state = worker.series_state("co2_levels", "satellite")
+    result.extend(merged.merge_chunk(rows[200:], flags, state))
+    assert result == expected
+
+
+def test_validate_rows_groups_series():
+    rows = rows_of(hourly(3), [410.0, 411.0, 412.0]) + rows_of(hourly(3), [1.0, 2.0, -100.0], metric="forest_cover")
+    flags = QualityMonitor().validate_rows(rows)
+    assert list(flags) == [0, 0, 0, 0, 0, FLAG_RANGE]
+
+
+def test_validate_snapshot_and_stats():
+    monitor = QualityMonitor()
+    report = monitor.validate_snapshot(
+        {"temperature": 15.0, "co2_levels": 410.0, "forest_cover": 150.0, "sources": ["nasa"]},
+        timestamp=0
+    )
+    assert report["flags"] == {"forest_cover": ["range"], "ocean_health": ["schema"]}
+    assert report["quality_score"] == 0.5
+    stats = monitor.stats()["nasa"]
+    assert stats["samples"] == 4
+    assert stats["flagged"] == 2
+    assert stats["flags"] == {"schema": 1, "range": 1}
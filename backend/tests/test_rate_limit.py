@@ -0,0 +1,95 @@
+"""
+Token buckets, route costs and client keys of the rate limiter
+"""
+from urllib.parse import parse_qs
+
+from starlette.testclient import TestClient
+
+from app.core.rate_limit import MemoryBackend, RateLimitMiddleware, _export_cost, _history_cost
+
+HISTORY = "/api/v1/mood/pulse_history"
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def make_client(capacity: float = 2, api_keys=()) -> TestClient:
+    middleware = RateLimitMiddleware(
+        ok_app,
+        capacity=capacity,
+        refill_rate=0.001,
+        backend="memory",
+        trust_proxy=False,
+        api_keys=list(api_keys)
+    )
+    return TestClient(middleware)
+
+
+def statuses(client: TestClient, count: int, path: str = HISTORY, headers=None):
+    return [client.get(path, headers=headers).status_code for _ in range(count)]
+
+
+def cost(function, query: str) -> float:
+    return function(parse_qs(query))
+
+
+def test_memory_backend_refills_and_reports_wait():
+    backend = MemoryBackend(capacity=2, refill_rate=1.0)
+    assert backend.acquire("a", 2) == (True, 0.0)
+    allowed, retry_after = backend.acquire("a", 1)
+    assert not allowed
+    assert 0 < retry_after <= 1.0
+    assert backend.acquire("b", 1)[0]
+
+
+def test_memory_backend_evicts_when_full():
+    backend = MemoryBackend(capacity=1, refill_rate=0.001, max_clients=4)
+    for index in range(10):
+        backend.acquire(f"client-{index}", 1)
+    assert len(backend._buckets) <= 4
+
+
+def test_middleware_rejects_with_retry_after():
+    client = make_client()
+    assert statuses(client, 3) == [200, 200, 429]
+    response = client.get(HISTORY)
+    assert int(response.headers["retry-after"]) >= 1
+    assert response.json()["code"] == "RATE_LIMITED"
+
+
+def test_free_routes_are_not_limited():
+    client = make_client(capacity=1)
+    assert statuses(client, 5, path="/api/v1/ping") == [200] * 5
+
+
+def test_unknown_api_keys_share_the_ip_bucket():
+    client = make_client(api_keys=["known"])
+    codes = [client.get(HISTORY, headers={"X-Api-Key": f"random-{i}"}).status_code for i in range(4)]
+    assert codes == [200, 200, 429, 429]
+    assert statuses(client, 3, headers={"X-Api-Key": "known"}) == [200, 200, 429]
+
+
+def test_history_cost_scales_with_window():
+    assert cost(_history_cost, "") == 1.0
+    assert cost(_history_cost, "days=70") == 10.0
+    assert cost(_history_cost, "limit=1680") == 10.0
+    assert cost(_history_cost, "start=2024-01-01T00:00:00&end=2024-01-15T00:00:00") == 2.0
+
+
+def test_history_cost_ignores_since_discount():
+    assert cost(_history_cost, "days=365&since=1970-01-01T00:00:00") == cost(_history_cost, "days=365")
+
+
+def test_history_cost_mixed_timezones():
+    mixed = cost(_history_cost, "start=2024-01-01T00:00:00&end=2024-01-15T00:00:00%2B00:00")
+    assert mixed == 2.0
+
+
+def test_export_cost_depends_on_granularity():
+    hourly = cost(_export_cost, "days=70")
+    raw = cost(_export_cost, "days=70&granularity=raw")
+    assert hourly == 10.0
+    assert raw > hourly
+    assert cost(_export_cost, "start=not-a-date") == 1.0
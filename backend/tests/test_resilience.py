@@ -0,0 +1,138 @@
+"""
+Circuit breaker, adaptive timeout and upstream guard behaviour
+"""
+import asyncio
+
+import pytest
+
+from app.services.resilience import (
+    AdaptiveTimeout,
+    CircuitBreaker,
+    RetryBudget,
+    UpstreamGuard,
+    UpstreamUnavailableError,
+)
+
+
+def open_breaker(breaker: CircuitBreaker) -> None:
+    """Trip the breaker and backdate the trip so the next allow() probes"""
+    breaker._trip()
+    breaker._opened_at -= breaker.open_for + 1
+
+
+def make_guard() -> UpstreamGuard:
+    guard = UpstreamGuard("test")
+    guard.max_retries = 0
+    return guard
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=3)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_half_open_admits_limited_probes():
+    breaker = CircuitBreaker(half_open_max_calls=1)
+    open_breaker(breaker)
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+
+def test_probe_success_closes_and_failure_reopens():
+    breaker = CircuitBreaker()
+    open_breaker(breaker)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    open_breaker(breaker)
+    first_open_for = breaker.open_for
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.open_for == 2 * first_open_for
+
+
+def test_release_returns_probe_slot():
+    breaker = CircuitBreaker(half_open_max_calls=1)
+    open_breaker(breaker)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_adaptive_timeout_tracks_latency_within_bounds():
+    timeout = AdaptiveTimeout(initial=10.0, minimum=0.5, maximum=5.0, min_samples=3)
+    assert timeout.current() == 10.0
+    for latency in (0.1, 0.2, 0.3):
+        timeout.observe(latency)
+    assert timeout.current() == 0.5
+    for _ in range(3):
+        timeout.observe(20.0)
+    assert timeout.current() == 5.0
+
+
+def test_retry_budget_limits_withdrawals():
+    budget = RetryBudget(ratio=0.5, min_tokens=1.0, max_tokens=2.0)
+    assert budget.withdraw()
+    assert not budget.withdraw()
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+
+
+def test_guard_serves_last_good_value_on_failure():
+    guard = make_guard()
+
+    async def good():
+        return {"value": 1}
+
+    async def bad():
+        raise RuntimeError("boom")
+
+    async def scenario():
+        assert await guard.call(good) == {"value": 1}
+        assert await guard.call(bad) == {"value": 1}
+
+    asyncio.run(scenario())
+    assert guard.serving_stale
+    assert guard.health == "degraded"
+
+
+def test_guard_raises_without_last_good_value():
+    guard = make_guard()
+
+    async def bad():
+        raise RuntimeError("boom")
+
+    with pytest.raises(UpstreamUnavailableError):
+        asyncio.run(guard.call(bad))
+
+
+def test_cancelled_probe_does_not_wedge_breaker():
+    guard = make_guard()
+    open_breaker(guard.breaker)
+
+    async def slow():
+        await asyncio.sleep(10)
+        return {"value": 1}
+
+    async def fast():
+        return {"value": 2}
+
+    async def scenario():
+        task = asyncio.create_task(guard.call(slow))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert await guard.call(fast) == {"value": 2}
+
+    asyncio.run(scenario())
+    assert guard.breaker.state == CircuitBreaker.CLOSED
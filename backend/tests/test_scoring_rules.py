@@ -0,0 +1,122 @@
+"""
+Compiled mood scoring tables and hot reload
+"""
+import copy
+import json
+import random
+
+import pytest
+
+from app.models.schemas import MoodType
+from app.services.scoring_rules import DEFAULT_SCORING_RULES, ScoringRules, ScoringRuleSet
+
+
+def reference_score(definition, data):
+    """Direct reading of the rule definition: largest matching penalty per metric"""
+    score = definition["base_score"]
+    factors = []
+    for name, spec in definition["metrics"].items():
+        value = data.get(name)
+        value = spec["default"] if value is None else value
+        matched = [
+            band for band in spec["bands"]
+            if ("below" in band and value < band["below"]) or ("above" in band and value > band["above"])
+        ]
+        score -= max((band["penalty"] for band in matched), default=0)
+        if any(band.get("factor") for band in matched):
+            factors.append(spec["factor"])
+    return min(100.0, max(0.0, score)), factors
+
+
+def snapshots(count: int, seed: int = 3):
+    rng = random.Random(seed)
+    # Band edges themselves are the interesting values
+    edges = {
+        "temperature": [13, 14, 15, 16, 12.9, 16.1],
+        "co2_levels": [350, 400, 350.01, 400.01],
+        "forest_cover": [30, 32, 29.99],
+        "ocean_health": [70, 75, 74.99],
+    }
+    result = []
+    for _ in range(count):
+        snapshot = {}
+        for name, values in edges.items():
+            roll = rng.random()
+            if roll < 0.4:
+                snapshot[name] = rng.choice(values)
+            elif roll < 0.9:
+                snapshot[name] = rng.uniform(min(values) - 5, max(values) + 5)
+            else:
+                snapshot[name] = None
+        result.append(snapshot)
+    return result
+
+
+def test_score_matches_rule_definition():
+    rules = ScoringRules(DEFAULT_SCORING_RULES)
+    for snapshot in snapshots(500):
+        assert rules.score(snapshot) == reference_score(DEFAULT_SCORING_RULES, snapshot)
+
+
+def test_score_columns_matches_score():
+    rules = ScoringRules(DEFAULT_SCORING_RULES)
+    batch = snapshots(300)
+    columns = {metric.name: [snapshot.get(metric.name) for snapshot in batch] for metric in rules.metrics}
+    scores, factors = rules.score_columns(columns, len(batch))
+    for snapshot, score, labels in zip(batch, scores, factors):
+        assert (score, list(labels)) == rules.score(snapshot)
+
+
+def test_missing_column_uses_defaults():
+    rules = ScoringRules(DEFAULT_SCORING_RULES)
+    scores, _ = rules.score_columns({}, 2)
+    assert scores == [rules.score({})[0]] * 2
+
+
+def test_scores_are_clamped():
+    definition = copy.deepcopy(DEFAULT_SCORING_RULES)
+    definition["base_score"] = 10
+    rules = ScoringRules(definition)
+    scores, _ = rules.score_columns({"co2_levels": [500.0]}, 1)
+    assert scores == [0.0]
+    assert rules.score({"co2_levels": 500.0})[0] == 0.0
+
+
+@pytest.mark.parametrize("score, mood", [(100, MoodType.HEALING), (70, MoodType.HEALING), (69.9, MoodType.STRESSED), (50, MoodType.STRESSED), (0, MoodType.CRITICAL)])
+def test_mood_thresholds(score, mood):
+    assert ScoringRules(DEFAULT_SCORING_RULES).mood(score)[0] == mood
+
+
+@pytest.mark.parametrize("change", [
+    lambda d: d.update(metrics={}),
+    lambda d: d["metrics"]["co2_levels"]["bands"].append({"penalty": 5}),
+    lambda d: d["moods"].pop(),
+    lambda d: d["moods"][-1].update(mood="ecstatic"),
+])
+def test_invalid_definitions_are_rejected(change):
+    definition = copy.deepcopy(DEFAULT_SCORING_RULES)
+    change(definition)
+    with pytest.raises(ValueError):
+        ScoringRules(definition)
+
+
+def test_rule_set_reloads_and_keeps_rules_on_error(tmp_path):
+    path = tmp_path / "rules.json"
+    definition = copy.deepcopy(DEFAULT_SCORING_RULES)
+    path.write_text(json.dumps(definition))
+    rule_set = ScoringRuleSet(str(path), check_interval=0)
+    original = rule_set.current.version
+
+    definition["base_score"] = 90
+    path.write_text(json.dumps(definition))
+    assert rule_set.reload()
+    assert rule_set.current.version != original
+    assert rule_set.current.base_score == 90
+    # The first file matched the built-in defaults, so only this load swapped rules
+    assert rule_set.reloads == 1
+
+    path.write_text("{not json")
+    assert not rule_set.reload()
+    assert rule_set.current.base_score == 90
+    assert rule_set.errors == 1
+    assert rule_set.stats()["last_error"]
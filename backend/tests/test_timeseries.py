@@ -0,0 +1,121 @@
+"""
+Columnar TimeSeries container
+"""
+import pickle
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.schemas import DataSource
+from app.models.timeseries import FLOAT, INT, OBJECT, STRING, TimeSeries
+
+T0 = datetime(2024, 1, 1)
+
+
+def at(hours: int) -> datetime:
+    return T0 + timedelta(hours=hours)
+
+
+def series_of(values, unit: str = "°C", columns=None, start: int = 0, step: int = 1) -> TimeSeries:
+    series = TimeSeries(columns)
+    for index, (value, metadata) in enumerate(values):
+        series.append(at(start + index * step), value, unit, DataSource.SATELLITE, 0.9, metadata)
+    return series
+
+
+def kinds(series: TimeSeries):
+    return {name: kind for name, (kind, _) in series.columns.items()}
+
+
+def test_sample_round_trip():
+    series = series_of(
+        [(15.2, {"co2_levels": 421.5, "data_quality": "high"})],
+        columns={"co2_levels": FLOAT, "data_quality": STRING}
+    )
+    sample = series[0]
+    assert sample["timestamp"] == T0
+    assert sample["value"] == 15.2
+    assert sample["unit"] == "°C"
+    assert sample["source"] == DataSource.SATELLITE
+    assert sample["confidence"] == 0.9
+    assert sample["metadata"] == {"co2_levels": 421.5, "data_quality": "high"}
+
+
+def test_appends_must_be_chronological():
+    series = series_of([(1.0, None)], start=5)
+    with pytest.raises(ValueError):
+        series.append(T0, 1.0, "°C", DataSource.SATELLITE)
+
+
+def test_column_kinds_are_inferred():
+    series = series_of([(1.0, {"flags": 2, "score": 0.5, "label": "a", "ok": True, "nested": {"x": 1}})])
+    assert kinds(series) == {"flags": INT, "score": FLOAT, "label": STRING, "ok": OBJECT, "nested": OBJECT}
+
+
+def test_integers_are_exact():
+    big = 2 ** 40 + 1
+    series = series_of([(1.0, {"flags": 2, "big": big}), (1.0, {"flags": None})])
+    assert series[0]["metadata"] == {"flags": 2, "big": big}
+    assert series[1]["metadata"] is None
+
+
+def test_type_mismatch_widens_to_object():
+    series = series_of([
+        (1.0, {"co2": 410.5, "flags": 1, "label": "a"}),
+        (1.0, {"co2": "n/a", "flags": 2 ** 70, "label": 5}),
+    ])
+    assert kinds(series) == {"co2": OBJECT, "flags": OBJECT, "label": OBJECT}
+    assert series[0]["metadata"] == {"co2": 410.5, "flags": 1, "label": "a"}
+    assert series[1]["metadata"] == {"co2": "n/a", "flags": 2 ** 70, "label": 5}
+
+
+def test_string_tables_are_per_series():
+    for index in range(600):
+        series = series_of([(1.0, {"label": f"value-{index}"})])
+    assert series[0]["metadata"] == {"label": "value-599"}
+
+
+def test_full_string_table_widens_column():
+    series = series_of([(1.0, {"label": f"value-{index}"}) for index in range(300)])
+    assert kinds(series) == {"label": OBJECT}
+    assert series[0]["metadata"] == {"label": "value-0"}
+    assert series[299]["metadata"] == {"label": "value-299"}
+
+
+def test_slices_and_between():
+    series = series_of([(float(index), None) for index in range(10)])
+    assert [sample["value"] for sample in series[2:5].iter_samples()] == [2.0, 3.0, 4.0]
+    assert len(series.between(at(3), at(6))) == 4
+
+
+def test_extend_remaps_codes():
+    left = series_of([(1.0, {"label": "a"})], unit="ppm")
+    right = series_of([(2.0, {"label": "b"})], unit="°C", start=1)
+    left.extend(right)
+    assert [(sample["unit"], sample["metadata"]) for sample in left.iter_samples()] == [
+        ("ppm", {"label": "a"}),
+        ("°C", {"label": "b"}),
+    ]
+
+
+def test_extend_with_mismatched_kinds():
+    left = series_of([(1.0, {"x": 1.5})])
+    right = series_of([(2.0, {"x": "text"})], start=1)
+    left.extend(right)
+    assert kinds(left) == {"x": OBJECT}
+    assert [sample["metadata"] for sample in left.iter_samples()] == [{"x": 1.5}, {"x": "text"}]
+
+
+def test_merge_interleaves_and_other_wins_on_ties():
+    evens = series_of([(float(index), {"side": "left"}) for index in range(0, 6, 2)], step=2)
+    odds = series_of([(float(index), {"side": "right"}) for index in range(1, 6, 2)], start=1, step=2)
+    tie = series_of([(99.0, {"side": "tie"})], start=4)
+    merged = evens.merge(odds).merge(tie)
+    assert [sample["value"] for sample in merged.iter_samples()] == [0.0, 1.0, 2.0, 3.0, 99.0, 5.0]
+    assert merged[4]["metadata"] == {"side": "tie"}
+
+
+def test_pickle_keeps_tables():
+    series = series_of([(1.0, {"label": "a", "flags": 3}), (2.0, {"label": "b"})], unit="ppm")
+    restored = pickle.loads(pickle.dumps(series))
+    assert list(restored.iter_samples()) == list(series.iter_samples())
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Local upstream simulator for GaiaPulse
+
+An ASGI app standing in for the NASA, weather, air quality and LLM APIs with
+configurable latency distributions, error rates and periodic 5xx bursts.
+Point the backend at it with NASA_API_URL, WEATHER_API_URL and
+AIR_QUALITY_API_URL to reproduce slow or failing upstreams offline.
+`GET /_sim/stats` reports calls per upstream, `POST /_sim/reset` zeroes them.
+
+Examples:
+    python upstream_sim.py --port 9100
+    python upstream_sim.py --port 9100 --preset error_burst
+    python upstream_sim.py --port 9100 --profile-file profiles.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.config.settings import settings
+
+# Per-upstream behaviour. Latency specs: "fixed:<ms>", "uniform:<lo_ms>:<hi_ms>"
+# or "lognormal:<median_ms>:<sigma>". `spike` adds `spike_ms` with the given
+# probability; during the first `burst_for` seconds of every `burst_every`
+# seconds all calls fail with 503.
+DEFAULT_PROFILES: Dict[str, Dict[str, Any]] = {
+    "nasa": {"latency": "lognormal:250:0.5", "error_rate": 0.01},
+    "weather": {"latency": "lognormal:80:0.4", "error_rate": 0.005},
+    "air_quality": {"latency": "lognormal:100:0.4", "error_rate": 0.005},
+    "llm": {"latency": "lognormal:900:0.6", "error_rate": 0.02},
+}
+
+PRESETS: Dict[str, Dict[str, Dict[str, Any]]] = {
+    "healthy": DEFAULT_PROFILES,
+    "slow_nasa": {
+        **DEFAULT_PROFILES,
+        "nasa": {"latency": "lognormal:2500:0.8", "error_rate": 0.05, "spike": 0.05, "spike_ms": 12000},
+    },
+    "error_burst": {
+        name: {**profile, "burst_every": 60, "burst_for": 10}
+        for name, profile in DEFAULT_PROFILES.items()
+    },
+    "outage": {
+        **DEFAULT_PROFILES,
+        "nasa": {"latency": "fixed:50", "error_rate": 1.0},
+        "weather": {"latency": "fixed:50", "error_rate": 1.0},
+    },
+}
+
+
+class LatencyModel:
+    """Samples response delays in seconds from a parsed latency spec"""
+
+    def __init__(self, spec: str, spike: float = 0.0, spike_ms: float = 0.0):
+        kind, *params = spec.split(":")
+        values = [float(param) for param in params]
+        if kind == "fixed" and len(values) == 1:
+            self._sample = lambda: values[0]
+        elif kind == "uniform" and len(values) == 2:
+            self._sample = lambda: random.uniform(values[0], values[1])
+        elif kind == "lognormal" and len(values) == 2:
+            mu = math.log(values[0])
+            self._sample = lambda: random.lognormvariate(mu, values[1])
+        else:
+            raise ValueError(f"Invalid latency spec: {spec}")
+        self.spike = spike
+        self.spike_ms = spike_ms
+
+    def sample(self) -> float:
+        delay = self._sample()
+        if self.spike and random.random() < self.spike:
+            delay += self.spike_ms
+        return delay / 1000
+
+
+class Upstream:
+    """One simulated upstream: behaviour plus call counters"""
+
+    def __init__(self, name: str, profile: Dict[str, Any]):
+        self.name = name
+        self.latency = LatencyModel(profile.get("latency", "fixed:0"), profile.get("spike", 0.0), profile.get("spike_ms", 0.0))
+        self.error_rate = float(profile.get("error_rate", 0.0))
+        self.burst_every = float(profile.get("burst_every", 0))
+        self.burst_for = float(profile.get("burst_for", 0))
+        self._started = time.monotonic()
+        self.reset()
+
+    def reset(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.delay_total = 0.0
+
+    def in_burst(self) -> bool:
+        return self.burst_every > 0 and (time.monotonic() - self._started) % self.burst_every < self.burst_for
+
+    async def respond(self, body: Dict[str, Any]) -> JSONResponse:
+        self.calls += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        delay = self.latency.sample()
+        self.delay_total += delay
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.in_flight -= 1
+        if self.in_burst() or random.random() < self.error_rate:
+            self.errors += 1
+            return JSONResponse({"error": "simulated upstream failure"}, status_code=503)
+        return JSONResponse(body)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "mean_delay_ms": round(self.delay_total / self.calls * 1000, 1) if self.calls else None
+        }
+
+
+def create_app(profiles: Optional[Dict[str, Dict[str, Any]]] = None) -> FastAPI:
+    """Build the simulator app for a set of upstream profiles"""
+    profiles = profiles or DEFAULT_PROFILES
+    upstreams = {name: Upstream(name, profiles.get(name, {})) for name in DEFAULT_PROFILES}
+    app = FastAPI(title="GaiaPulse upstream simulator")
+    started = time.monotonic()
+
+    @app.get("/planetary/earth/assets")
+    async def nasa_assets(lat: float = 0.0, lon: float = 0.0) -> JSONResponse:
+        return await upstreams["nasa"].respond({
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "id": "LC8_L1T_TOA/LC81270592013135LGN00",
+            "resource": {"dataset": "LANDSAT/LC08/C01/T1_SR", "planet": "earth"},
+            "service_version": "v5000",
+            "url": "http://127.0.0.1/simulated.png"
+        })
+
+    @app.get("/data/2.5/weather")
+    async def weather(lat: float = 0.0, lon: float = 0.0) -> JSONResponse:
+        temperature = round(15.0 + random.uniform(-3, 3), 2)
+        return await upstreams["weather"].respond({
+            "coord": {"lat": lat, "lon": lon},
+            "main": {"temp": temperature, "feels_like": temperature, "humidity": random.randint(30, 90), "pressure": 1013},
+            "name": "Simulated"
+        })
+
+    @app.get("/data/2.5/air_pollution")
+    async def air_pollution(lat: float = 0.0, lon: float = 0.0) -> JSONResponse:
+        return await upstreams["air_quality"].respond({
+            "coord": {"lat": lat, "lon": lon},
+            "list": [{
+                "main": {"aqi": random.randint(1, 5)},
+                "components": {"pm2_5": round(random.uniform(2, 60), 2), "pm10": round(random.uniform(5, 90), 2), "o3": round(random.uniform(20, 120), 2)},
+                "dt": int(time.time())
+            }]
+        })
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request) -> JSONResponse:
+        payload = await request.json()
+        return await upstreams["llm"].respond({
+            "id": "chatcmpl-simulated",
+            "object": "chat.completion",
+            "model": payload.get("model", "simulated"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "Simulated response about Earth's environment."},
+                "finish_reason": "stop"
+            }]
+        })
+
+    @app.get("/_sim/stats")
+    async def sim_stats() -> Dict[str, Any]:
+        return {
+            "uptime": round(time.monotonic() - started, 3),
+            "upstreams": {name: upstream.stats() for name, upstream in upstreams.items()}
+        }
+
+    @app.post("/_sim/reset")
+    async def sim_reset() -> Dict[str, Any]:
+        for upstream in upstreams.values():
+            upstream.reset()
+        return {"reset": True}
+
+    return app
+
+
+def load_profiles(preset: str, profile_file: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Preset profiles, with per-upstream overrides from a JSON file"""
+    profiles = {name: dict(profile) for name, profile in PRESETS[preset].items()}
+    if profile_file:
+        with open(profile_file) as f:
+            overrides = json.load(f)
+        if not isinstance(overrides, dict):
+            raise ValueError("profile file must contain a JSON object keyed by upstream")
+        for name, profile in overrides.items():
+            if name not in DEFAULT_PROFILES:
+                raise ValueError(f"Unknown upstream: {name}")
+            profiles[name] = {**profiles[name], **profile}
+    # Fail at startup rather than on the first request
+    for name, profile in profiles.items():
+        Upstream(name, profile)
+    return profiles
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve simulated NASA, weather, air quality and LLM upstreams")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="healthy", help="Named set of upstream profiles")
+    parser.add_argument("--profile-file", help="JSON object of per-upstream profile overrides")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible latencies and failures")
+    args = parser.parse_args(argv)
+
+    try:
+        profiles = load_profiles(args.preset, args.profile_file)
+    except (OSError, ValueError) as e:
+        print(f"Invalid profiles: {e}", file=sys.stderr)
+        return 2
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    import uvicorn
+    uvicorn.run(create_app(profiles), host=args.host, port=args.port, log_level=settings.log_level.lower(), access_log=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
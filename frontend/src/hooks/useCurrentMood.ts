@@ -1,11 +1,20 @@
-import { useQuery } from '@tanstack/react-query'
-import { fetchCurrentMood } from '../lib/api'
+import { useQuery, useQueryClient } from '@tanstack/react-query'
+import { fetchCurrentMood, type CurrentMood, type Polled } from '../lib/api'
+
+const DEFAULT_POLL_INTERVAL = 20000 // Until the backend sends a poll hint
 
 export function useCurrentMood() {
+  const queryClient = useQueryClient()
   return useQuery({
     queryKey: ['currentMood'],
-    queryFn: fetchCurrentMood,
-    refetchInterval: 20000, // Poll every 20 seconds
+    // Poll with the cached version so unchanged moods come back as 204
+    queryFn: () => fetchCurrentMood(queryClient.getQueryData<Polled<CurrentMood>>(['currentMood'])),
+    select: (polled) => polled.data,
+    // Poll when the backend says the next update is due
+    refetchInterval: (query) => {
+      const seconds = query.state.data?.pollInterval
+      return seconds ? seconds * 1000 : DEFAULT_POLL_INTERVAL
+    },
     refetchIntervalInBackground: false,
     staleTime: 10000, // Consider data stale after 10 seconds
     retry: 2,
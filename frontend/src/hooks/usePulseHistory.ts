@@ -1,11 +1,20 @@
-import { useQuery } from '@tanstack/react-query'
-import { fetchPulseHistory } from '../lib/api'
+import { useQuery, useQueryClient } from '@tanstack/react-query'
+import { fetchPulseHistory, type Polled, type PulseHistory } from '../lib/api'
+
+const DEFAULT_POLL_INTERVAL = 20000 // Until the backend sends a poll hint
 
 export function usePulseHistory(days: number = 7) {
+  const queryClient = useQueryClient()
   return useQuery({
     queryKey: ['pulseHistory', days],
-    queryFn: () => fetchPulseHistory(days),
-    refetchInterval: 20000, // Poll every 20 seconds
+    // Only points newer than the cached ones are fetched
+    queryFn: () => fetchPulseHistory(days, queryClient.getQueryData<Polled<PulseHistory>>(['pulseHistory', days])),
+    select: (polled) => polled.data,
+    // New points appear hourly; poll when the backend says the next one is due
+    refetchInterval: (query) => {
+      const seconds = query.state.data?.pollInterval
+      return seconds ? seconds * 1000 : DEFAULT_POLL_INTERVAL
+    },
     refetchIntervalInBackground: false,
     staleTime: 10000, // Consider data stale after 10 seconds
     retry: 2,
@@ -39,6 +39,16 @@ export const PulseHistorySchema = z.object({
   message: z.string()
 })
 
+export const CurrentMoodPatchSchema = z.object({
+  success: z.boolean(),
+  data: z.object({
+    version: z.number(),
+    base_version: z.number(),
+    changes: CurrentMoodSchema.shape.data.partial()
+  }),
+  message: z.string()
+})
+
 export const ChatResponseSchema = z.object({
   success: z.boolean(),
   data: z.object({
@@ -57,23 +67,70 @@ export type Point = z.infer<typeof PointSchema>
 export type PulseHistory = z.infer<typeof PulseHistorySchema>['data']
 export type ChatResponse = z.infer<typeof ChatResponseSchema>['data']
 
+// Polled data plus the backend's hint for when to poll next
+export interface Polled<T> {
+  data: T
+  version?: number
+  pollInterval?: number // seconds
+}
+
+function readPollInterval(response: Response): number | undefined {
+  const seconds = Number(response.headers.get('X-Poll-Interval'))
+  return seconds > 0 ? seconds : undefined
+}
+
 // API functions
-export async function fetchCurrentMood(): Promise<CurrentMood> {
-  const response = await fetch(`${API_BASE_URL}/api/v1/mood/current_mood`)
+
+// Pass the previous result to poll incrementally: the backend answers 204
+// when the mood is unchanged and only the changed fields when it is one
+// version ahead.
+export async function fetchCurrentMood(previous?: Polled<CurrentMood>): Promise<Polled<CurrentMood>> {
+  const query = previous?.version !== undefined ? `?since_version=${previous.version}` : ''
+  const response = await fetch(`${API_BASE_URL}/api/v1/mood/current_mood${query}`)
   if (!response.ok) {
     throw new Error('Failed to fetch current mood')
   }
+  const pollInterval = readPollInterval(response)
+  if (response.status === 204 && previous) {
+    return { ...previous, pollInterval }
+  }
   const data = await response.json()
-  return CurrentMoodSchema.parse(data).data
+  const version = Number(response.headers.get('X-Mood-Version')) || undefined
+  const patch = CurrentMoodPatchSchema.safeParse(data)
+  if (patch.success && previous && patch.data.data.base_version === previous.version) {
+    return {
+      data: { ...previous.data, ...patch.data.data.changes },
+      version: patch.data.data.version,
+      pollInterval
+    }
+  }
+  return { data: CurrentMoodSchema.parse(data).data, version, pollInterval }
 }
 
-export async function fetchPulseHistory(days: number = 7): Promise<PulseHistory> {
-  const response = await fetch(`${API_BASE_URL}/api/v1/mood/pulse_history?days=${days}`)
+// Pass the previous result to fetch only points newer than its last one;
+// they are appended and points that fell out of the window are dropped.
+export async function fetchPulseHistory(days: number = 7, previous?: Polled<PulseHistory>): Promise<Polled<PulseHistory>> {
+  const last = previous?.data.data[previous.data.data.length - 1]
+  const query = last ? `&since=${encodeURIComponent(last.timestamp)}` : ''
+  const response = await fetch(`${API_BASE_URL}/api/v1/mood/pulse_history?days=${days}${query}`)
   if (!response.ok) {
     throw new Error('Failed to fetch pulse history')
   }
-  const data = await response.json()
-  return PulseHistorySchema.parse(data).data
+  const pollInterval = readPollInterval(response)
+  const history = PulseHistorySchema.parse(await response.json()).data
+  if (!previous || !last) {
+    return { data: history, pollInterval }
+  }
+  if (history.data.length === 0) {
+    return { ...previous, pollInterval }
+  }
+  const points = [...previous.data.data, ...history.data]
+  const cutoff = Date.parse(points[points.length - 1].timestamp) - days * 24 * 60 * 60 * 1000
+  const kept = points.filter((point) => Date.parse(point.timestamp) > cutoff)
+  return {
+    data: { ...previous.data, data: kept, total_points: kept.length },
+    pollInterval
+  }
 }
 
 export async function sendChatMessage(message: string): Promise<ChatResponse> {